@@ -3,14 +3,23 @@ import streamlit as st  # Biblioteca principal para criar aplicativos interativo
 import pandas as pd  # Manipulação de dados em tabelas DataFrame
 import locale  # Configuração de localidade (moeda, número, data, etc.)
 import matplotlib.pyplot as plt  # Biblioteca para visualização de gráficos
-import seaborn as sns  # Biblioteca para visualização de dados avançada
 from datetime import datetime, timedelta  # Manipulação de datas e períodos de tempo
 import numpy as np  # Cálculos matemáticos avançados e manipulação de arrays
 from scipy.interpolate import make_interp_spline  # Interpolação para suavizar gráficos
+from brent.fontes import criar_fonte  # Fonte dos dados: parquet local, Arrow mapeado em memória ou HTTP com ETag
+from brent.memoria_compartilhada import ler_serie  # Série imutável (brent/serie.py), anexada da memória compartilhada entre processos
+from brent.resumo_anual import desenhar_boxplot  # Boxplot a partir das estatísticas por ano
+from brent import rastreamento  # Tempo de cada etapa do rerun (spans), painel oculto de tempos e profiling
+
+# Rastro das etapas deste rerun (brent/rastreamento.py), iniciado antes de qualquer outra coisa
+rastro = rastreamento.iniciar()
 
 # Configuração do Streamlit
 # Definir a largura da página do app para 'auto' que Dinamicamente ajusta entre "centered" e "wide", dependendo do tamanho da tela do usuário.
 st.set_page_config(layout="wide")
+
+# Painel de tempos oculto: aparece só com ?rastro=1 na URL; o profiler roda no rerun pedido pelo painel
+painel_rastro = rastreamento.painel(st, rastro)
 # Definir estilo do app
 st.markdown(
     """
@@ -70,7 +79,17 @@ cor_destaque = "#FF7F0E"  # Cor quente para anos importantes
 
 
 # Criando DF a partir do parquet com dados do Brent do Ipea (https://www.ipeadata.gov.br/Default.aspx), usando r, raw string para evitar problemas com barras
-df = pd.read_parquet(r'C:\Users\17609633801\Downloads\git\Fiap-Postech-Tech-Challenge-Fase-4\ipea_brent_20250217.parquet')
+# A fonte é definida na seção [dados] do config.toml (padrão: o parquet do próprio repositório).
+# A série é imutável e ordenada por data (brent/serie.py), então uma única cópia atende todas as sessões
+# e, com memoria_compartilhada = true, todos os processos (brent/memoria_compartilhada.py).
+@st.cache_resource
+def carregar_dados():
+    serie = ler_serie(criar_fonte())
+    serie.resumo_anual  # Tabela de estatísticas por ano (boxplot e describe) calculada já na carga
+    return serie
+
+with rastreamento.etapa("carga dos dados"):
+    serie = carregar_dados()
 
 # Título da páginastrea
 st.title('Brent: Domine a Volatilidade e Converta Oscilações em Lucros')
@@ -141,8 +160,9 @@ with col2:
 ano_inicial = pd.to_datetime(f"{ano_inicial}-01-01")
 ano_final = pd.to_datetime(f"{ano_final}-12-31")
 
-# Filtrar o DataFrame pelo intervalo de anos
-df_filtrado = df[(df["data"] >= ano_inicial) & (df["data"] <= ano_final)]
+# Filtrar pelo intervalo de anos (busca binária nas datas ordenadas, sem máscara nem cópia)
+with rastreamento.etapa("filtro do intervalo"):
+    df_filtrado = serie.intervalo(ano_inicial, ano_final).para_dataframe()
 
 # Garantir que o DataFrame não está vazio antes de continuar
 if df_filtrado.empty:
@@ -155,9 +175,10 @@ else:
     # Resetando o índice para garantir que idxmax() e idxmin() são acessíveis com iloc[]
     df_filtrado = df_filtrado.reset_index(drop=True)
 
-# Criar coluna de ano para destaque
-df_filtrado['ano'] = df_filtrado['data'].dt.year
-destaque_anos = {1990, 1998, 1999, 2008, 2014, 2020, 2022} & set(df_filtrado['ano'].unique())
+# Anos para destaque (a coluna 'ano' já vem calculada da carga dos dados)
+with rastreamento.etapa("resumo anual"):
+    resumo_periodo = serie.resumo_anual.intervalo(ano_inicial.year, ano_final.year)
+destaque_anos = {1990, 1998, 1999, 2008, 2014, 2020, 2022} & set(resumo_periodo.index)
 
 # Verificação se há pelo menos um ano relevante no período selecionado
 if not destaque_anos:
@@ -247,15 +268,16 @@ O maior valor foi U$ 115,19 por barril em junho de 2014. O menor, U$ 53,27 em de
 
 
 st.markdown("<br><br>", unsafe_allow_html=True)  # Espaço 
-# Gráfico de Boxplot
-fig, ax = plt.subplots(figsize=(12, 6))
-cmap = [cor_destaque if ano in destaque_anos else cor_primaria for ano in df_filtrado['ano'].unique()]
-sns.boxplot(x='ano', y='preco', data=df_filtrado, ax=ax, width=0.6, fliersize=3, palette=cmap)
-plt.xticks(rotation=45)
-ax.set_xlabel(" ")
-ax.set_ylabel(" ")
-ax.set_title("Boxplot do preço do barril de Brent (US$)", fontsize=18, fontweight="bold")
-st.pyplot(fig)
+# Gráfico de Boxplot, desenhado a partir das estatísticas por ano já calculadas (sem percorrer os dados diários)
+with rastreamento.etapa("boxplot"):
+    fig, ax = plt.subplots(figsize=(12, 6))
+    cmap = [cor_destaque if ano in destaque_anos else cor_primaria for ano in resumo_periodo.index]
+    desenhar_boxplot(ax, serie.resumo_anual.estatisticas_boxplot(ano_inicial.year, ano_final.year), cmap)
+    plt.xticks(rotation=45)
+    ax.set_xlabel(" ")
+    ax.set_ylabel(" ")
+    ax.set_title("Boxplot do preço do barril de Brent (US$)", fontsize=18, fontweight="bold")
+    st.pyplot(fig)
 
 col1, col2, col3, col4 = st.columns([0.3, 0.5, 0.8, 1.5])
 
@@ -358,9 +380,10 @@ x_original = df_filtrado['data'].astype(np.int64) // 10**9  # Convertendo data p
 y_original = df_filtrado['preco']
 
 # Criando novos pontos mais densos para suavizar a curva
-x_smooth = np.linspace(x_original.min(), x_original.max(), 300)  # 300 pontos suavizados
-spline = make_interp_spline(x_original, y_original, k=3)  # k=3 para suavização cúbica
-y_smooth = spline(x_smooth)
+with rastreamento.etapa("spline", pontos=len(x_original)):
+    x_smooth = np.linspace(x_original.min(), x_original.max(), 300)  # 300 pontos suavizados
+    spline = make_interp_spline(x_original, y_original, k=3)  # k=3 para suavização cúbica
+    y_smooth = spline(x_smooth)
 
 # Plotando a linha suavizada
 ax.plot(pd.to_datetime(x_smooth, unit='s'), y_smooth, color=cor_primaria, linewidth=2, alpha=0.9)
@@ -380,7 +403,8 @@ ax.set_title('Série Temporal do Preço do Brent em US$', fontsize=18, fontweigh
 ax.legend()
 
 # Exibir no Streamlit
-st.pyplot(fig)
+with rastreamento.etapa("série temporal"):
+    st.pyplot(fig)
 st.markdown("<br><br>", unsafe_allow_html=True)  # Espaço 
 
 col1, col2, col3, col4, col5 = st.columns([1, 1.2, 1, 0.2, 1])
@@ -464,8 +488,8 @@ st.markdown("<br><br>", unsafe_allow_html=True)  # Espaço
 st.title("Previsão do Preço do Brent")
 st.write("Analisando a evolução do preço do petróleo Brent e aplicando modelos de previsão.")
 
-# Obtendo os anos únicos do DataFrame filtrado
-anos_filtrados = sorted(df_filtrado["ano"].unique())
+# Obtendo os anos do período a partir da tabela por ano
+anos_filtrados = list(resumo_periodo.index)
 
 # Verificar se há anos filtrados e formatar a exibição
 if len(anos_filtrados) > 1:
@@ -473,8 +497,9 @@ if len(anos_filtrados) > 1:
 else:
     anos_exibidos = f"{anos_filtrados[0]}" if anos_filtrados else "Nenhum ano disponível"
 
-# Gerar estatísticas descritivas
-desc = df_filtrado["preco"].describe()
+# Gerar estatísticas descritivas combinando as estatísticas por ano (sem percorrer os dados diários)
+with rastreamento.etapa("describe"):
+    desc = serie.resumo_anual.descrever(ano_inicial.year, ano_final.year)
 
 # Renomear os índices para português
 desc_traduzido = desc.rename(index={
@@ -488,20 +513,21 @@ desc_traduzido = desc.rename(index={
     "max": "Máximo"
 }).to_frame()
 
-# 🔹 Converter "Contagem" para inteiro SEM casas decimais
-desc_traduzido.loc["Contagem"] = int(desc_traduzido.loc["Contagem"])
-
-# 🔹 Converter os demais valores para float com apenas 2 casas decimais e formatar no padrão brasileiro
-for indice in desc_traduzido.index:
-    if indice != "Contagem":  # Garantir que apenas floats são arredondados
-        valor = round(float(desc_traduzido.loc[indice]), 2)
-        desc_traduzido.loc[indice] = locale.format_string("%.2f", valor, grouping=True)
+# 🔹 Converter "Contagem" para inteiro SEM casas decimais e os demais valores para 2 casas decimais no padrão brasileiro
+# (a coluna passa a ser de texto, já formatado para exibição)
+with rastreamento.etapa("formatação (locale)"):
+    desc_traduzido = desc_traduzido.astype(object)
+    for indice in desc_traduzido.index:
+        valor = desc_traduzido.iloc[:, 0][indice]
+        if indice == "Contagem":
+            desc_traduzido.loc[indice] = str(int(valor))
+        else:  # Garantir que apenas floats são arredondados
+            desc_traduzido.loc[indice] = locale.format_string("%.2f", round(float(valor), 2), grouping=True)
 
 # 🔹 Remover o nome da coluna ("preco")
 desc_traduzido.columns = [""]
 
 # 🔹 Obter o período selecionado corretamente
-anos_filtrados = sorted(df_filtrado["ano"].unique())
 periodo = f"{anos_filtrados[0]} - {anos_filtrados[-1]}" if len(anos_filtrados) > 1 else f"{anos_filtrados[0]}"
 
 # 🔹 Exibir título corretamente com o período selecionado
@@ -527,3 +553,6 @@ st.markdown(
 # 🔹 Exibir a tabela corretamente formatada
 st.table(desc_traduzido)
 
+# Painel oculto de tempos (?rastro=1): tempo de cada etapa deste rerun, profiling do próximo rerun e exportação
+# do rastro (formato Trace Event do Chrome, para chrome://tracing ou Perfetto)
+painel_rastro.exibir()
@@ -3,26 +3,36 @@ import streamlit as st  # Biblioteca principal para criar aplicativos interativo
 import pandas as pd  # Manipulação de dados em tabelas DataFrame
 import plotly.express as px  # Importação da biblioteca Plotly Express para gráficos interativos
 import locale  # Configuração de localidade (moeda, número, data, etc.)
-import matplotlib.pyplot as plt  # Biblioteca para visualização de gráficos
-import seaborn as sns  # Biblioteca para visualização de dados avançada
 import numpy as np  # Cálculos matemáticos avançados e manipulação de arrays
 import plotly.graph_objects as go  # Biblioteca para criação de visualizações interativas, como gráficos de linha, barras e dispersão
-import requests # para fazer requisições comom baixar um arquivo por ex.
-import io
 from datetime import datetime, timedelta  # Manipulação de datas e períodos de tempo
-from scipy.interpolate import make_interp_spline  # Interpolação para suavizar gráficos, útil para visualizações mais suaves
-from statsmodels.tsa.stattools import adfuller  # Teste de Dickey-Fuller aumentado (ADF) para verificar estacionariedade de séries temporais
-from statsmodels.tsa.seasonal import seasonal_decompose  # Decomposição de séries temporais em tendência, sazonalidade e resíduo
-from statsmodels.tsa.arima.model import ARIMA  # Modelo ARIMA (AutoRegressive Integrated Moving Average) para previsão de séries temporais
-from statsmodels.tsa.statespace.sarimax import SARIMAX  # Modelo SARIMAX (ARIMA sazonal) para séries temporais com sazonalidade e variáveis exógenas
-from sklearn.metrics import mean_squared_error, mean_absolute_error  # Métricas para avaliação de modelos: erro médio absoluto (MAE) e erro médio quadrático (MSE)
-from prophet import Prophet  # Modelo de previsão de séries temporais desenvolvido pelo Facebook, baseado em decomposição aditiva
-from tensorflow.keras.models import Sequential  # API para construção de modelos de deep learning sequenciais no TensorFlow/Keras
-from tensorflow.keras.layers import LSTM, Dense  # LSTM: camada de rede neural recorrente para séries temporais; Dense: camada totalmente conectada
-from sklearn.preprocessing import MinMaxScaler  # Normalização de dados para modelos de machine learning, escalando valores para um intervalo específico
+from brent.fontes import criar_fonte  # Fonte dos dados: parquet local, Arrow mapeado em memória ou HTTP com ETag
+from brent import memoria_compartilhada  # Série imutável (brent/serie.py) publicada uma vez em /dev/shm e anexada sem cópia por todos os workers
+from brent.reducao import indices_para_grafico, reduzir_xy  # Redução de pontos (LTTB) dos gráficos de séries longas
+from brent.suavizacao import ROTULOS as ROTULOS_SUAVIZADORES  # Suavizadores da linha do preço (Histórico)
+from brent import diagnosticos  # Testes de estacionariedade em cache (ADF, KPSS, Phillips-Perron, janela móvel)
+from brent.decomposicao import ROTULOS as ROTULOS_DECOMPOSICAO, PERIODOS as PERIODOS_DECOMPOSICAO, decompor  # Decomposição STL/MSTL em pregões
+from brent.backtest import carregar_ultimo as carregar_ultimo_backtest, resumir as resumir_backtest  # Resultados do backtest walk-forward
+from brent import snapshot as snapshot_previsoes  # Previsões pré-calculadas em lote (python -m brent.snapshot)
+from brent.modelo_arima import ajustar_arima, formatar_ordem as formatar_ordem_arima  # SARIMA com busca de ordens em paralelo
+from brent.figuras import ESTILO_GRAFICOS, png_boxplot, png_serie_temporal  # Gráficos da página Histórico renderizados uma vez (PNG em cache)
+from brent.dependencias import carregar_pagina  # Importa matplotlib, statsmodels, Prophet, TensorFlow etc. só na página que os usa
+from brent.cache import hash_dataframe  # Impressão digital dos dados para invalidar o cache de modelos
+from brent.modelo_prophet import (ajustar_prophet, chave_modelo as chave_prophet, intervalos as intervalos_prophet,
+                                  COLUNAS_INTERVALO as COLUNAS_INTERVALO_PROPHET, ROTULOS_AMOSTRAS)  # Prophet com cache em disco dos modelos e dos intervalos
+from brent.tarefas import CONCLUIDA, FALHOU, FilaTarefas  # Treinos em segundo plano, sem duplicatas entre sessões
+from brent import rastreamento  # Tempo de cada etapa do rerun (spans), painel oculto de tempos e profiling
+from brent.modelo_lstm import (carregar_artefato, versao_atual as versao_atual_lstm, preparar_dados as preparar_dados_lstm,
+                               salvar_artefato, treinar as treinar_lstm)  # Artefatos versionados do LSTM treinado offline
+from brent.modelo_lstm import (HORIZONTES as HORIZONTES_LSTM, prever_recursivo as prever_recursivo_lstm,
+                               erros_por_horizonte as erros_por_horizonte_lstm)  # Previsão de vários dias, todas as origens em lote
+from brent.lstm_numpy import ModeloNumPy  # Inferência do LSTM em NumPy, sem importar o TensorFlow
 
 
 ####### CONFIGURAÇÕES ########
+# Rastro das etapas deste rerun (brent/rastreamento.py), iniciado antes de qualquer outra coisa
+rastro = rastreamento.iniciar()
+
 # Configuração do Streamlit
 # Definir a largura da página do app para 'auto' que Dinamicamente ajusta entre "centered" e "wide", dependendo do tamanho da tela do usuário.
 st.set_page_config(layout="wide")
@@ -30,7 +40,14 @@ st.set_page_config(layout="wide")
 # Sidebar com menu de navegação
 st.sidebar.title("Menu")
 pagina_selecionada = st.sidebar.radio('Aventure-se:',["Brent: Histórico", "Estacionariedade, Tendências e Sazonalidades", 
-                                                        "Prophet", "LSTM", "Video Explicativo", "Sobre o Desafio", "Sobre o Desenvolvedor"])
+                                                        "ARIMA", "Prophet", "LSTM", "Video Explicativo", "Sobre o Desafio", "Sobre o Desenvolvedor"],
+                                      key="pagina")  # Chave permite abrir o app direto em uma página (benchmarks/paginas.py)
+
+# Painel de tempos oculto: aparece só com ?rastro=1 na URL; o profiler roda no rerun pedido pelo painel
+painel_rastro = rastreamento.painel(st, rastro)
+
+# Dependências pesadas apenas da página selecionada, importadas no primeiro uso (ex.: dep.Prophet, dep.adfuller)
+dep = carregar_pagina(pagina_selecionada)
 
 # Definir estilo do app
 st.markdown(
@@ -70,19 +87,9 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-# Configuração do estilo dos gráficos
-plt.rcParams.update({
-    "font.size": 14,
-    "axes.labelsize": 16,
-    "axes.titlesize": 18,
-    "xtick.labelsize": 14,
-    "ytick.labelsize": 14,
-    "legend.fontsize": 14,
-    "axes.spines.top": False,
-    "axes.spines.right": False,
-    "axes.grid": False,
-    "grid.alpha": 0.3
-})
+# Configuração do estilo dos gráficos (apenas nas páginas que usam matplotlib)
+if "plt" in dep:
+    dep.plt.rcParams.update(ESTILO_GRAFICOS)
 
 # Cores 
 cor_primaria = "#3366CC"  # Azul refinado
@@ -92,31 +99,160 @@ cor_destaque = "#FF7F0E"  # Cor quente para anos importantes
 
 ####### CARREGAR DADOS ########
 # Criando DF a partir do parquet com dados do Brent do Ipea (https://www.ipeadata.gov.br/Default.aspx), usando r, raw string para evitar problemas com barras
-# Função para carregar dados
-@st.cache_data
+# Função para carregar dados: devolve uma série imutável ordenada por data (brent/serie.py), com ano/mês/dia da
+# semana já calculados. Como ninguém a altera, uma única cópia é compartilhada por todas as sessões (cache_resource)
+# e, com memoria_compartilhada = true no config.toml, também por todos os processos (arquivo Arrow em /dev/shm).
+@st.cache_resource
 def carregar_dados():
-    # URL do arquivo Parquet no GitHub usando link RAW
-    url = "https://raw.githubusercontent.com/Rabramo/Fiap-Postech-Tech-Challenge-Fase-4/main/ipea_brent_20250217.parquet"
     try:
-        # Baixar o arquivo como stream de bytes
-        response = requests.get(url)
-        response.raise_for_status()  # Verifica se o download foi bem-sucedido
-
-        # Carregar o arquivo Parquet a partir dos bytes
-        df = pd.read_parquet(io.BytesIO(response.content), engine="pyarrow")
-
-        # Criar a coluna 'ano' extraindo do campo de data
-        df['ano'] = pd.to_datetime(df['data']).dt.year
-
-        return df
+        # Fonte definida na seção [dados] do config.toml; por padrão o parquet do próprio repositório, sem rede
+        serie = memoria_compartilhada.ler_serie(criar_fonte())
+        serie.resumo_anual  # Tabela de estatísticas por ano (boxplot e describe) calculada já na carga
+        return serie
     except Exception as e:
         st.error(f"❌ Erro ao carregar os dados: {e}")
         return None
 
+# Fila de treinos compartilhada por todas as sessões: o script não fica bloqueado durante o ajuste, e
+# visitantes que pedem o mesmo modelo ao mesmo tempo acompanham um único treino (brent/tarefas.py)
+@st.cache_resource
+def fila_treinos():
+    return FilaTarefas()
+
+# Progresso do treino, atualizado a cada segundo; quando o treino termina, a página é refeita com o resultado
+@st.fragment(run_every=1.0)
+def acompanhar_treino(chave):
+    tarefa = fila_treinos().obter(chave)
+    if tarefa is None or tarefa.terminada:
+        st.rerun()
+    situacao = tarefa.situacao()
+    st.progress(situacao['progresso'], text=f"{tarefa.nome}: {situacao['mensagem']} ({situacao['segundos']:.0f} s)")
+    perdas = [registro for registro in situacao['historico'] if 'loss' in registro]
+    if perdas:  # Resultado parcial: curva de loss das épocas já concluídas
+        st.line_chart(pd.DataFrame(perdas).set_index('epoca')['loss'], height=200)
+
+# Resultado do treino se ele já terminou; senão mostra o progresso (ou o erro) e os resultados já calculados
+# (backtest) e encerra a página até o próximo rerun
+def aguardar_treino(tarefa, modelo, espera=2.0):
+    with rastreamento.etapa(f"{modelo}: treino na fila"):
+        terminou = tarefa.aguardar(espera)
+    if terminou:  # Cache em disco ou treino curto: exibe direto, sem barra de progresso
+        if tarefa.estado == CONCLUIDA:
+            return tarefa.resultado()
+    if tarefa.estado == FALHOU:
+        st.error(f"O treino falhou: {tarefa.erro}")
+        if st.button("Tentar novamente", key=f"repetir_{modelo}"):
+            fila_treinos().descartar(tarefa.chave)
+            st.rerun()
+    else:
+        st.info("O modelo está sendo treinado em segundo plano; a página é atualizada quando o treino terminar.")
+        acompanhar_treino(tarefa.chave)
+    exibir_backtest(modelo)
+    painel_rastro.exibir()
+    st.stop()
+
+# Artefato do LSTM treinado offline, compartilhado entre as sessões; a versão entra na chave para
+# que um novo treino seja usado sem reiniciar o app
+@st.cache_resource(show_spinner=False, max_entries=2)
+def carregar_artefato_lstm(versao):
+    return carregar_artefato(versao) if versao is not None else None
+
+# Plano B: treino no servidor quando não existe artefato (o resultado é salvo como nova versão)
+def treinar_e_salvar_lstm(df_periodo, progresso=None):
+    artefato = treinar_lstm(df_periodo['preco'].values, progresso=progresso)
+    salvar_artefato(artefato, {"periodo": [str(df_periodo['data'].iloc[0].date()), str(df_periodo['data'].iloc[-1].date())],
+                               "hash_dados": hash_dataframe(df_periodo)})
+    return artefato
+
+# Última execução do backtest walk-forward (python -m brent.backtest), relida a cada 5 minutos
+@st.cache_data(ttl=300, show_spinner=False)
+def carregar_backtest():
+    return carregar_ultimo_backtest()
+
+# Distribuição dos erros por dobra do backtest, com o modelo da página em destaque
+def exibir_backtest(modelo):
+    st.subheader('Backtest walk-forward')
+    resultado = carregar_backtest()
+    if resultado is None or modelo not in set(resultado[0]['modelo']):
+        st.info(f"Nenhum backtest do modelo {modelo} encontrado. Gere um com `python -m brent.backtest --modelos {modelo}`.")
+        return
+    df_dobras, info = resultado
+    config = info['configuracao']
+    st.markdown(f'''
+    Em vez de um único corte 80/20, o modelo é reajustado em {int((df_dobras['modelo'] == modelo).sum())} origens
+    sucessivas (janela {config['modo']}) e prevê {config['horizonte']} pregões à frente em cada uma.
+    ''')
+    resumo = resumir_backtest(df_dobras, info['wall_time'])
+    colunas = {'dobras': 'Dobras', 'rmse_media': 'RMSE médio', 'rmse_p10': 'RMSE p10', 'rmse_p90': 'RMSE p90',
+               'mae_media': 'MAE médio', 'mape_media': 'MAPE médio (%)', 'wall_time': 'Tempo total (s)'}
+    st.dataframe(resumo[list(colunas)].rename(columns=colunas).style.format(precision=2), use_container_width=True)
+    fig_dobras = px.box(df_dobras, x='modelo', y='rmse', points='all', color='modelo',
+                        title='RMSE por dobra', labels={'modelo': 'Modelo', 'rmse': 'RMSE'})
+    st.plotly_chart(fig_dobras, use_container_width=True)
+
+# Snapshot das previsões gerado em lote; a data de modificação do arquivo entra na chave para reler um snapshot novo
+@st.cache_data(show_spinner=False, max_entries=2)
+def carregar_snapshot(modificado_em):
+    return snapshot_previsoes.carregar() if modificado_em is not None else None
+
+# Linhas, métricas e data de criação do snapshot de um modelo, se ele foi gerado com os dados e o período atuais
+def snapshot_do_modelo(modelo, periodo):
+    with rastreamento.etapa("leitura do snapshot"):
+        resultado = carregar_snapshot(snapshot_previsoes.modificado_em())
+    if resultado is None:
+        return None
+    tabela, info = resultado
+    periodo_atual = [str(pd.Timestamp(periodo.datas[0]).date()), str(pd.Timestamp(periodo.datas[-1]).date())]
+    if info['impressao_digital'] != serie.impressao_digital or info['periodo'] != periodo_atual or modelo not in info['modelos']:
+        return None
+    return snapshot_previsoes.fatiar(tabela, modelo), info['modelos'][modelo], info['criado_em']
+
+# Opção de recalcular o modelo na sessão; sem snapshot válido, o modelo é sempre calculado na página
+def usar_snapshot(modelo, snapshot):
+    if snapshot is None:
+        st.caption(f"Sem snapshot das previsões para os dados atuais: o modelo é calculado nesta página. "
+                   f"Gere um com `python -m brent.snapshot --modelos {modelo}`.")
+        return False
+    return not st.checkbox("Recalcular o modelo nesta sessão (ignora o snapshot)", key=f"recalcular_{modelo}")
+
+# Métricas, previsões do teste e dos próximos pregões lidas do snapshot, sem ajustar o modelo
+def exibir_snapshot(nome, snapshot):
+    linhas, metricas, criado_em = snapshot
+    st.caption(f"Previsões pré-calculadas em {criado_em.replace('T', ' ')} (`python -m brent.snapshot`).")
+    st.write(f"**RMSE:** {metricas['rmse']:.2f}")
+    st.write(f"**MAE:** {metricas['mae']:.2f}")
+
+    teste = linhas[linhas['tipo'] == 'teste']
+    st.write("**Previsões vs Valores Reais**")
+    fig_previsoes = go.Figure()
+    x_real, y_real = reduzir_xy(teste['data'], teste['real'])  # Pontos limitados à largura do gráfico
+    x_prev, y_prev = reduzir_xy(teste['data'], teste['previsto'])
+    fig_previsoes.add_trace(go.Scatter(x=x_real, y=y_real, mode='lines', name='Valores Reais'))
+    fig_previsoes.add_trace(go.Scatter(x=x_prev, y=y_prev, mode='lines', name='Previsões'))
+    fig_previsoes.update_layout(title=f'Previsões do Preço do Brent com {nome}', xaxis_title='Data', yaxis_title='Preço (US$)')
+    st.plotly_chart(fig_previsoes, use_container_width=True)
+
+    futuro = linhas[linhas['tipo'] == 'futuro']
+    st.write(f"**Previsão para os próximos {len(futuro)} pregões**")
+    fig_futuro = go.Figure()
+    fig_futuro.add_trace(go.Scatter(x=teste['data'].iloc[-120:], y=teste['real'].iloc[-120:], mode='lines', name='Valores Reais'))
+    if futuro['inferior'].notna().any():
+        # O nível vem do modelo (Prophet: 80%, ARIMA: 95%); snapshots antigos não o registravam
+        nivel = metricas.get('nivel_intervalo')
+        rotulo_intervalo = f"Intervalo de {nivel:.0%}" if nivel else "Intervalo de previsão"
+        fig_futuro.add_trace(go.Scatter(x=futuro['data'], y=futuro['superior'], mode='lines', line=dict(width=0), showlegend=False))
+        fig_futuro.add_trace(go.Scatter(x=futuro['data'], y=futuro['inferior'], mode='lines', line=dict(width=0),
+                                        fill='tonexty', name=rotulo_intervalo))
+    fig_futuro.add_trace(go.Scatter(x=futuro['data'], y=futuro['previsto'], mode='lines', name='Previsão'))
+    fig_futuro.update_layout(title=f'Previsão do Preço do Brent com {nome}', xaxis_title='Data', yaxis_title='Preço (US$)')
+    st.plotly_chart(fig_futuro, use_container_width=True)
+    return metricas
+
 # Chamar a função para carregar os dados
-df = carregar_dados()
+with rastreamento.etapa("carga dos dados"):
+    serie = carregar_dados()
 # Exibir os dados no Streamlit
-# if df is not None:
+# if serie is not None:
 st.success("✅ Dados carregados com sucesso!")
 #   st.dataframe(df)
 # Recuperando datas selecionadas na página Brent
@@ -202,9 +338,9 @@ if pagina_selecionada == "Brent: Histórico":
     ano_inicial = pd.to_datetime(f"{ano_inicial}-01-01")
     ano_final = pd.to_datetime(f"{ano_final}-12-31")
 
-    df["data"] = pd.to_datetime(df["data"], errors='coerce')  
-    # Filtrar o DataFrame pelo intervalo de anos
-    df_filtrado = df[(df["data"] >= ano_inicial) & (df["data"] <= ano_final)]
+    # Filtrar pelo intervalo de anos (busca binária nas datas ordenadas, sem máscara nem cópia)
+    with rastreamento.etapa("filtro do intervalo"):
+        df_filtrado = serie.intervalo(ano_inicial, ano_final).para_dataframe()
 
     # Garantir que o DataFrame não está vazio antes de continuar
     if df_filtrado.empty:
@@ -217,9 +353,10 @@ if pagina_selecionada == "Brent: Histórico":
         # Resetando o índice para garantir que idxmax() e idxmin() são acessíveis com iloc[]
         df_filtrado = df_filtrado.reset_index(drop=True)
 
-    # Criar coluna de ano para destaque
-    df_filtrado['ano'] = df_filtrado['data'].dt.year
-    destaque_anos = {1990, 1998, 1999, 2008, 2014, 2020, 2022} & set(df_filtrado['ano'].unique())
+    # Anos para destaque (a coluna 'ano' já vem calculada da carga dos dados)
+    with rastreamento.etapa("resumo anual"):
+        resumo_periodo = serie.resumo_anual.intervalo(ano_inicial.year, ano_final.year)
+    destaque_anos = {1990, 1998, 1999, 2008, 2014, 2020, 2022} & set(resumo_periodo.index)
 
     # Verificação se há pelo menos um ano relevante no período selecionado
     if not destaque_anos:
@@ -308,15 +445,12 @@ if pagina_selecionada == "Brent: Histórico":
                 st.button("❌ Fechar", key=f"fechar_{ano}")
 
     st.markdown("<br><br>", unsafe_allow_html=True)  # Espaço 
-    # Gráfico de Boxplot
-    fig, ax = plt.subplots(figsize=(12, 6))
-    cmap = [cor_destaque if ano in destaque_anos else cor_primaria for ano in df_filtrado['ano'].unique()]
-    sns.boxplot(x='ano', y='preco', data=df_filtrado, ax=ax, width=0.6, fliersize=3, palette=cmap)
-    plt.xticks(rotation=45)
-    ax.set_xlabel(" ")
-    ax.set_ylabel(" ")
-    ax.set_title("Boxplot do preço do barril de Brent (US$)", fontsize=18, fontweight="bold")
-    st.pyplot(fig)
+    # Gráfico de Boxplot, desenhado a partir das estatísticas por ano e guardado como PNG (brent/figuras.py):
+    # o mesmo intervalo de anos não é redesenhado em reruns nem em outras sessões
+    if not df_filtrado.empty:
+        with rastreamento.etapa("boxplot"):
+            st.image(png_boxplot(serie, ano_inicial.year, ano_final.year, destaque_anos, cor_primaria, cor_destaque),
+                     use_container_width=True)
 
     col1, col2, col3, col4 = st.columns([0.3, 0.5, 0.8, 1.5])
 
@@ -405,43 +539,15 @@ if pagina_selecionada == "Brent: Histórico":
 
     st.markdown("<br><br>", unsafe_allow_html=True)  # Espaço 
 
-    # Gráfico de Linha - Evolução do preço
-    fig, ax = plt.subplots(figsize=(12, 6))
-
-    # Pegando os valores máximo e mínimo
-    max_idx = df_filtrado['preco'].idxmax()
-    min_idx = df_filtrado['preco'].idxmin()
-    max_val = df_filtrado['preco'].max()
-    min_val = df_filtrado['preco'].min()
-
-    # Criando pontos suavizados para interpolação cúbica
-    x_original = df_filtrado['data'].astype(np.int64) // 10**9  # Convertendo data para timestamp (segundos)
-    y_original = df_filtrado['preco']
-
-    # Criando novos pontos mais densos para suavizar a curva
-    x_smooth = np.linspace(x_original.min(), x_original.max(), 300)  # 300 pontos suavizados
-    spline = make_interp_spline(x_original, y_original, k=3)  # k=3 para suavização cúbica
-    y_smooth = spline(x_smooth)
-
-    # Plotando a linha suavizada
-    ax.plot(pd.to_datetime(x_smooth, unit='s'), y_smooth, color=cor_primaria, linewidth=2, alpha=0.9)
-
-    # Adicionando os pontos de máximo e mínimo
-    ax.scatter(df_filtrado['data'].iloc[max_idx], max_val, color=cor_max, s=100, label="Máximo")
-    ax.scatter(df_filtrado['data'].iloc[min_idx], min_val, color=cor_min, s=100, label="Mínimo")
-
-    # Adicionando os rótulos com os valores ao lado dos pontos
-    ax.text(df_filtrado['data'].iloc[max_idx], max_val, f"{max_val:.2f}", fontsize=12, verticalalignment='bottom', horizontalalignment='left', color=cor_max, fontweight='bold')
-    ax.text(df_filtrado['data'].iloc[min_idx], min_val, f"{min_val:.2f}", fontsize=12, verticalalignment='top', horizontalalignment='left', color=cor_min, fontweight='bold')
-
-    # Configuração do gráfico
-    ax.set_xlabel("")
-    ax.set_ylabel("")
-    ax.set_title('Série Temporal do Preço do Brent em US$', fontsize=18, fontweight="bold")
-    ax.legend()
-
-    # Exibir no Streamlit
-    st.pyplot(fig)
+    # Gráfico de Linha - Evolução do preço, com máximo e mínimo do período (PNG em cache, brent/figuras.py)
+    if not df_filtrado.empty:
+        col1, col2 = st.columns([1, 4])
+        with col1:
+            rotulo_suavizador = st.selectbox("Suavização", list(ROTULOS_SUAVIZADORES), key="suavizador")
+        with rastreamento.etapa("série temporal e suavização", suavizador=ROTULOS_SUAVIZADORES[rotulo_suavizador]):
+            st.image(png_serie_temporal(serie, ano_inicial.year, ano_final.year, cor_primaria, cor_max, cor_min,
+                                        ROTULOS_SUAVIZADORES[rotulo_suavizador]),
+                     use_container_width=True)
     st.markdown("<br><br>", unsafe_allow_html=True)  # Espaço 
 
     col1, col2, col3, col4, col5 = st.columns([1, 1.2, 1, 0.2, 1])
@@ -535,10 +641,13 @@ if pagina_selecionada == "Estacionariedade, Tendências e Sazonalidades":
         # Filtrar dados para o período de 10/02/2015 a 10/02/2025
         data_inicio = pd.to_datetime("2015-02-10")
         data_fim = pd.to_datetime("2025-02-10")
-        df_periodo = df[(df['data'] >= data_inicio) & (df['data'] <= data_fim)]
+        with rastreamento.etapa("filtro do intervalo"):
+            df_periodo = serie.intervalo(data_inicio, data_fim).para_dataframe()
             
         st.subheader('Série Temporal do Preço do Brent (10/02/2015 - 10/02/2025)')
-        fig_serie = px.line(df_periodo, x='data', y='preco', title='Preço do Brent ao Longo do Tempo',
+        # Apenas os pontos que cabem na largura do gráfico (LTTB, mantendo máximo e mínimo; brent/reducao.py)
+        df_grafico = df_periodo.iloc[indices_para_grafico(serie, data_inicio, data_fim)]
+        fig_serie = px.line(df_grafico, x='data', y='preco', title='Preço do Brent ao Longo do Tempo',
                                     labels={'data': 'Data', 'preco': 'Preço (US$)'})
         fig_serie.update_layout(xaxis_title='Data', yaxis_title='Preço (US$)', hovermode='x unified')
         st.plotly_chart(fig_serie, use_container_width=True)
@@ -552,17 +661,43 @@ if pagina_selecionada == "Estacionariedade, Tendências e Sazonalidades":
                 Se o **p-valor** for menor que 0.05, rejeitamos H0 e consideramos a série estacionária.
                 ''')
         
-        # Aplicar o teste ADF
-        resultado_adf = adfuller(df_periodo['preco'])
-        p_valor = resultado_adf[1]
+        # Transformação da série antes dos testes
+        rotulo_transformacao = st.selectbox("Transformação da série", list(diagnosticos.ROTULOS), key="transformacao_estacionariedade")
+        transformacao = diagnosticos.ROTULOS[rotulo_transformacao]
+
+        # Aplicar o teste ADF (memoizado por intervalo e transformação, brent/diagnosticos.py)
+        with rastreamento.etapa("adf", transformacao=transformacao):
+            resultado_adf = diagnosticos.adf(serie, data_inicio, data_fim, transformacao)
+        p_valor = resultado_adf["p_valor"]
             
-        st.write(f"**Estatística ADF:** {resultado_adf[0]:.4f}")
+        st.write(f"**Estatística ADF:** {resultado_adf['estatistica']:.4f}")
         st.write(f"**p-valor:** {p_valor:.4f}")
             
         if p_valor < 0.05:
             st.success("A série é **estacionária** (p-valor < 0.05).")
         else:
             st.warning("A série **não é estacionária** (p-valor ≥ 0.05).")
+
+        # Outros testes: KPSS (H0 invertida) e Phillips-Perron
+        st.markdown('''
+                Para confirmar, comparamos com o **KPSS**, cuja hipótese nula é a oposta (a série é estacionária),
+                e com o **Phillips-Perron**, que corrige a autocorrelação dos resíduos sem incluir defasagens na regressão.
+                ''')
+        with rastreamento.etapa("kpss e phillips-perron", transformacao=transformacao):
+            tabela_testes = diagnosticos.tabela_testes(serie, data_inicio, data_fim, transformacao)
+        st.dataframe(tabela_testes.style.format({"Estatística": "{:.4f}", "p-valor": "{:.4f}"}), use_container_width=True)
+
+        # ADF em janela móvel: a estacionariedade muda ao longo do tempo?
+        st.write("**ADF em janela móvel**")
+        anos_janela = st.slider("Tamanho da janela (anos de pregão)", 1, 3, 1, key="janela_adf")
+        with rastreamento.etapa("adf em janela móvel", janela=252 * anos_janela):
+            df_adf_movel = diagnosticos.adf_movel(serie, data_inicio, data_fim, janela=252 * anos_janela,
+                                                  transformacao=transformacao)
+        fig_adf_movel = px.line(df_adf_movel, x='data', y='p_valor', title='p-valor do ADF por janela',
+                                labels={'data': 'Fim da janela', 'p_valor': 'p-valor'})
+        fig_adf_movel.add_hline(y=0.05, line_dash='dash', line_color='red')
+        fig_adf_movel.update_layout(xaxis_title='Fim da janela', yaxis_title='p-valor')
+        st.plotly_chart(fig_adf_movel, use_container_width=True)
             
         # Análise de Tendências
         st.subheader('Análise de Tendências')
@@ -575,26 +710,36 @@ if pagina_selecionada == "Estacionariedade, Tendências e Sazonalidades":
                 ''')
             
 
-                # Decomposição da série temporal
-        decomposicao = seasonal_decompose(df_periodo.set_index('data')['preco'], model='additive', period=365)
+                # Decomposição da série temporal no calendário de pregões (em cache por intervalo e opções, brent/decomposicao.py)
+        col1, col2, col3 = st.columns([1, 1, 1])
+        with col1:
+            rotulo_decomposicao = st.selectbox("Método de decomposição", list(ROTULOS_DECOMPOSICAO), key="metodo_decomposicao")
+        with col2:
+            rotulo_periodo = st.selectbox("Período sazonal", list(PERIODOS_DECOMPOSICAO), key="periodo_decomposicao")
+        with col3:
+            robusto = st.checkbox("Ajuste robusto (menos sensível a choques)", key="decomposicao_robusta",
+                                  disabled=ROTULOS_DECOMPOSICAO[rotulo_decomposicao] == "classica")
+        with rastreamento.etapa("decomposição", metodo=ROTULOS_DECOMPOSICAO[rotulo_decomposicao]):
+            decomposicao = decompor(serie, data_inicio, data_fim, ROTULOS_DECOMPOSICAO[rotulo_decomposicao],
+                                    PERIODOS_DECOMPOSICAO[rotulo_periodo], robusto)
             
                 # Gráfico da Tendência
         st.write("**Tendência**")
-        fig_tendencia = px.line(x=decomposicao.trend.index, y=decomposicao.trend, title='Tendência do Preço do Brent',
+        fig_tendencia = px.line(x=decomposicao.index, y=decomposicao['tendencia'], title='Tendência do Preço do Brent',
                                         labels={'x': 'Data', 'y': 'Preço (US$)'})
         fig_tendencia.update_layout(xaxis_title='Data', yaxis_title='Preço (US$)')
         st.plotly_chart(fig_tendencia, use_container_width=True)
             
                 # Gráfico da Sazonalidade
         st.write("**Sazonalidade**")
-        fig_sazonalidade = px.line(x=decomposicao.seasonal.index, y=decomposicao.seasonal, title='Sazonalidade do Preço do Brent',
+        fig_sazonalidade = px.line(x=decomposicao.index, y=decomposicao['sazonalidade'], title='Sazonalidade do Preço do Brent',
                                         labels={'x': 'Data', 'y': 'Preço (US$)'})
         fig_sazonalidade.update_layout(xaxis_title='Data', yaxis_title='Preço (US$)')
         st.plotly_chart(fig_sazonalidade, use_container_width=True)
             
                 # Gráfico dos Resíduos
         st.write("**Resíduos**")
-        fig_residuos = px.line(x=decomposicao.resid.index, y=decomposicao.resid, title='Resíduos do Preço do Brent',
+        fig_residuos = px.line(x=decomposicao.index, y=decomposicao['residuo'], title='Resíduos do Preço do Brent',
                                     labels={'x': 'Data', 'y': 'Preço (US$)'})
         fig_residuos.update_layout(xaxis_title='Data', yaxis_title='Preço (US$)')
         st.plotly_chart(fig_residuos, use_container_width=True)
@@ -603,10 +748,111 @@ if pagina_selecionada == "Estacionariedade, Tendências e Sazonalidades":
         st.subheader('Conclusão')
         st.markdown(f'''
                 - **Estacionariedade**: A série é estacionária? {"Sim" if p_valor < 0.05 else "Não"}.
-                - **Tendência**: A tendência mostra um padrão de {"crescimento" if decomposicao.trend.mean() > 0 else "declínio"} ao longo do tempo.
-                - **Sazonalidade**: Padrões sazonais são {"evidentes" if decomposicao.seasonal.std() > 0 else "fracos ou inexistentes"}.
+                - **Tendência**: A tendência mostra um padrão de {"crescimento" if decomposicao["tendencia"].mean() > 0 else "declínio"} ao longo do tempo.
+                - **Sazonalidade**: Padrões sazonais são {"evidentes" if decomposicao["sazonalidade"].std() > 0 else "fracos ou inexistentes"}.
                 ''')
  
+#%% ARIMA
+if pagina_selecionada == "ARIMA":
+    st.title("Modelagem com ARIMA/SARIMA")
+    st.markdown('''
+    O **ARIMA** modela o preço a partir dos seus próprios valores passados (parte autorregressiva, **p**),
+    dos erros de previsão passados (média móvel, **q**) e de quantas diferenças são necessárias para tornar
+    a série estacionária (**d**). O **SARIMA** acrescenta os mesmos termos na frequência sazonal, aqui a semana
+    de 5 pregões: (P, D, Q, s).
+
+    A ordem não é escolhida à mão: uma busca **stepwise** ajusta modelos candidatos em paralelo e fica com o
+    de menor **AIC**, podando cedo os candidatos que já estão muito atrás e descartando os que não convergem.
+    ''')
+
+    # Filtrar dados para o período de 10/02/2015 a 10/02/2025
+    data_inicio = pd.to_datetime("2015-02-10")
+    data_fim = pd.to_datetime("2025-02-10")
+    periodo = serie.intervalo(data_inicio, data_fim)
+
+    if periodo.vazia:
+        st.warning("Nenhum dado disponível para o período selecionado.")
+    else:
+        # Dividir dados em treino e teste
+        train_size = int(len(periodo) * 0.8)
+        test_precos = periodo.precos[train_size:]
+
+        # Previsões do snapshot gerado em lote, se houver; senão a busca de ordens roda (ou é lida do cache) aqui
+        snapshot = snapshot_do_modelo('arima', periodo)
+        if usar_snapshot('arima', snapshot):
+            st.write(f"**Ordem escolhida:** SARIMA{snapshot[1]['ordem']}")
+            metricas_snapshot = exibir_snapshot('SARIMA', snapshot)
+            rmse, mae = metricas_snapshot['rmse'], metricas_snapshot['mae']
+        else:
+            # Busca de ordens na fila de treinos; o cache em disco (brent/modelo_arima.py) é consultado primeiro
+            tarefa = fila_treinos().submeter(('arima', serie.impressao_digital, train_size), ajustar_arima,
+                                             periodo.datas[:train_size], periodo.precos[:train_size],
+                                             nome="Busca de ordens SARIMA")
+            resultado_arima, busca, info_ajuste = aguardar_treino(tarefa, 'arima')
+            if info_ajuste["origem"] == "busca":
+                st.caption(f"Busca de ordens concluída em {info_ajuste['segundos']:.1f} s e salva no cache.")
+            elif info_ajuste["origem"] == "append":
+                st.caption(f"Modelo do cache atualizado com os novos dias, sem reajuste, em {info_ajuste['segundos']:.2f} s.")
+            else:
+                st.caption(f"Modelo carregado do cache em {info_ajuste['segundos']:.2f} s.")
+
+            st.write(f"**Ordem escolhida:** SARIMA{formatar_ordem_arima(busca['ordem'])} ({busca['criterio'].upper()} = {busca['valor']:.1f})")
+
+            # Previsão um passo à frente no teste: o filtro de Kalman avança dia a dia com os parâmetros do treino
+            with rastreamento.etapa("arima: predict"):
+                resultado_teste = resultado_arima.extend(test_precos)
+                previsoes = np.asarray(resultado_teste.fittedvalues)
+
+            # Calcular métricas de desempenho
+            rmse = np.sqrt(dep.mean_squared_error(test_precos, previsoes))
+            mae = dep.mean_absolute_error(test_precos, previsoes)
+
+            st.write(f"**RMSE:** {rmse:.2f}")
+            st.write(f"**MAE:** {mae:.2f}")
+
+            # Gráfico das Previsões
+            st.write("**Previsões (um passo à frente) vs Valores Reais**")
+            fig_previsoes = go.Figure()
+            x_real, y_real = reduzir_xy(periodo.datas[train_size:], test_precos)  # Pontos limitados à largura do gráfico
+            x_prev, y_prev = reduzir_xy(periodo.datas[train_size:], previsoes)
+            fig_previsoes.add_trace(go.Scatter(x=x_real, y=y_real, mode='lines', name='Valores Reais'))
+            fig_previsoes.add_trace(go.Scatter(x=x_prev, y=y_prev, mode='lines', name='Previsões'))
+            fig_previsoes.update_layout(title='Previsões do Preço do Brent com SARIMA', xaxis_title='Data', yaxis_title='Preço (US$)')
+            st.plotly_chart(fig_previsoes, use_container_width=True)
+
+            # Próximos pregões: o período de teste entra no modelo com append, sem reestimar os parâmetros
+            st.write("**Previsão para os próximos 21 pregões**")
+            with rastreamento.etapa("arima: previsão futura", passos=21):
+                previsao_futura = resultado_arima.append(test_precos, refit=False).get_forecast(21).summary_frame()
+            datas_futuras = pd.bdate_range(pd.Timestamp(periodo.datas[-1]) + pd.offsets.BDay(1), periods=21)
+            fig_futuro = go.Figure()
+            fig_futuro.add_trace(go.Scatter(x=periodo.datas[-120:], y=periodo.precos[-120:], mode='lines', name='Valores Reais'))
+            fig_futuro.add_trace(go.Scatter(x=datas_futuras, y=previsao_futura['mean_ci_upper'], mode='lines', line=dict(width=0), showlegend=False))
+            fig_futuro.add_trace(go.Scatter(x=datas_futuras, y=previsao_futura['mean_ci_lower'], mode='lines', line=dict(width=0),
+                                            fill='tonexty', name='Intervalo de 95%'))
+            fig_futuro.add_trace(go.Scatter(x=datas_futuras, y=previsao_futura['mean'], mode='lines', name='Previsão'))
+            fig_futuro.update_layout(title='Previsão do Preço do Brent com SARIMA', xaxis_title='Data', yaxis_title='Preço (US$)')
+            st.plotly_chart(fig_futuro, use_container_width=True)
+
+            # Modelos avaliados na busca
+            with st.expander("Modelos avaliados na busca de ordens"):
+                tentativas = pd.DataFrame(busca['tentativas'])
+                st.write(f"{len(tentativas)} modelos: {int((tentativas['status'] == 'ok').sum())} ajustados, "
+                         f"{int((tentativas['status'] == 'podado').sum())} podados, "
+                         f"{int(tentativas['status'].isin(['nao_convergiu', 'erro']).sum())} sem convergência.")
+                st.dataframe(tentativas[['ordem', 'status', 'aic', 'bic', 'segundos']], use_container_width=True)
+
+
+        exibir_backtest('arima')
+
+        # Conclusão
+        st.subheader('Conclusão')
+        st.markdown(f'''
+        - **RMSE**: {rmse:.2f} (Raiz do Erro Quadrático Médio): Mede a diferença média entre os valores reais e as previsões.
+        - **MAE**: {mae:.2f} (Erro Absoluto Médio): Mede a diferença absoluta média entre os valores reais e as previsões.
+        - **Horizonte**: As previsões um passo à frente acompanham bem o preço; para horizontes longos, o intervalo de confiança se abre rapidamente.
+        ''')
+
 #%  Prophet
 if pagina_selecionada == "Prophet":
     st.title("Modelagem com Prophet")
@@ -621,54 +867,95 @@ if pagina_selecionada == "Prophet":
     # Filtrar dados para o período de 10/02/2015 a 10/02/2025
     data_inicio = pd.to_datetime("2015-02-10")
     data_fim = pd.to_datetime("2025-02-10")
-    df_periodo = df[(df['data'] >= data_inicio) & (df['data'] <= data_fim)]
+    periodo = serie.intervalo(data_inicio, data_fim)
+    df_periodo = periodo.para_dataframe()
 
     if df_periodo.empty:
         st.warning("Nenhum dado disponível para o período selecionado.")
     else:
-        # Preparar dados para o Prophet
-        df_prophet = df_periodo[['data', 'preco']].rename(columns={'data': 'ds', 'preco': 'y'})
-
-        # Dividir dados em treino e teste
-        train_size = int(len(df_prophet) * 0.8)
-        train, test = df_prophet.iloc[:train_size], df_prophet.iloc[train_size:]
-
-        # Treinar o modelo Prophet
-        st.write("**Treinando o modelo Prophet...aguarde, por favor.**")
-        modelo_prophet = Prophet()
-        modelo_prophet.fit(train)
-
-        # Fazer previsões
-        futuro = modelo_prophet.make_future_dataframe(periods=len(test))
-        previsoes = modelo_prophet.predict(futuro)
-
-        # Calcular métricas de desempenho
-        rmse = np.sqrt(mean_squared_error(test['y'], previsoes['yhat'].iloc[train_size:]))
-        mae = mean_absolute_error(test['y'], previsoes['yhat'].iloc[train_size:])
-
-        st.write(f"**RMSE:** {rmse:.2f}")
-        st.write(f"**MAE:** {mae:.2f}")
-
-        # Gráfico das Previsões
-        st.write("**Previsões vs Valores Reais**")
-        fig_previsoes = go.Figure()
-        fig_previsoes.add_trace(go.Scatter(x=test['ds'], y=test['y'], mode='lines', name='Valores Reais'))
-        fig_previsoes.add_trace(go.Scatter(x=test['ds'], y=previsoes['yhat'].iloc[train_size:], mode='lines', name='Previsões'))
-        fig_previsoes.update_layout(title='Previsões do Preço do Brent com Prophet', xaxis_title='Data', yaxis_title='Preço (US$)')
-        st.plotly_chart(fig_previsoes, use_container_width=True)
-
-        # Componentes do Modelo
-        st.write("**Componentes do Modelo Prophet**")
-        fig_componentes = modelo_prophet.plot_components(previsoes)
-        st.pyplot(fig_componentes)
+        # Previsões do snapshot gerado em lote, se houver; senão o modelo é ajustado (ou lido do cache) aqui
+        snapshot = snapshot_do_modelo('prophet', periodo)
+        if usar_snapshot('prophet', snapshot):
+            metricas_snapshot = exibir_snapshot('Prophet', snapshot)
+            rmse, mae = metricas_snapshot['rmse'], metricas_snapshot['mae']
+            tendencia_media, anual_desvio = metricas_snapshot['tendencia_media'], metricas_snapshot['anual_desvio']
+        else:
+            # Preparar dados para o Prophet
+            df_prophet = df_periodo[['data', 'preco']].rename(columns={'data': 'ds', 'preco': 'y'})
+
+            # Dividir dados em treino e teste
+            train_size = int(len(df_prophet) * 0.8)
+            train, test = df_prophet.iloc[:train_size], df_prophet.iloc[train_size:]
+
+            # Treinar o modelo Prophet em segundo plano, ou carregá-lo do cache em disco se já foi ajustado com os mesmos dados
+            # A previsão é feita nas datas reais do teste (pregões), a mesma do snapshot, e fica no cache com o modelo
+            chave_modelo_prophet = chave_prophet(train, len(test), {}, test['ds'])
+            tarefa = fila_treinos().submeter(('prophet', chave_modelo_prophet), ajustar_prophet,
+                                             train, len(test), origem=serie.impressao_digital, datas=test['ds'],
+                                             nome="Treino do Prophet")
+            modelo_prophet, previsoes, info_ajuste = aguardar_treino(tarefa, 'prophet')
+            if info_ajuste["modo"] == "cache":
+                st.caption(f"Modelo carregado do cache em {info_ajuste['segundos']:.2f} s.")
+            elif info_ajuste["modo"] == "aquecido":
+                st.caption(f"Modelo reajustado a partir do ajuste anterior em {info_ajuste['segundos_ajuste']:.1f} s "
+                           f"(ajuste completo: {info_ajuste['segundos_frio'] or float('nan'):.1f} s).")
+            elif info_ajuste["modo"] == "reaproveitado":
+                st.caption(f"Poucos dias novos: modelo anterior reaproveitado, previsão refeita em "
+                           f"{info_ajuste['segundos']:.1f} s.")
+            else:
+                st.caption(f"Modelo treinado em {info_ajuste['segundos']:.1f} s e salvo no cache.")
+
+            # Calcular métricas de desempenho
+            rmse = np.sqrt(dep.mean_squared_error(test['y'], previsoes['yhat'].iloc[train_size:]))
+            mae = dep.mean_absolute_error(test['y'], previsoes['yhat'].iloc[train_size:])
+
+            st.write(f"**RMSE:** {rmse:.2f}")
+            st.write(f"**MAE:** {mae:.2f}")
+
+            # Intervalos de incerteza sob demanda: as simulações da tendência custam mais que o ajuste, então a
+            # previsão pontual é o padrão; com simulações, os intervalos ficam em cache por modelo e número de amostras
+            rotulo_amostras = st.selectbox("Intervalo de incerteza", list(ROTULOS_AMOSTRAS), key="amostras_prophet")
+            amostras = ROTULOS_AMOSTRAS[rotulo_amostras]
+            previsoes = previsoes.drop(columns=COLUNAS_INTERVALO_PROPHET, errors='ignore')
+            if amostras:
+                # Simulações só nas datas do teste, as únicas com faixa no gráfico; no treino as colunas ficam vazias
+                faixas = intervalos_prophet(modelo_prophet, chave_modelo_prophet, test['ds'], amostras)
+                previsoes = previsoes.assign(**{coluna: np.concatenate([np.full(train_size, np.nan), faixas[coluna].to_numpy()])
+                                                for coluna in COLUNAS_INTERVALO_PROPHET})
+
+            # Gráfico das Previsões
+            st.write("**Previsões vs Valores Reais**")
+            fig_previsoes = go.Figure()
+            if amostras:
+                fig_previsoes.add_trace(go.Scatter(x=test['ds'], y=previsoes['yhat_upper'].iloc[train_size:], mode='lines',
+                                                   line=dict(width=0), showlegend=False))
+                fig_previsoes.add_trace(go.Scatter(x=test['ds'], y=previsoes['yhat_lower'].iloc[train_size:], mode='lines',
+                                                   line=dict(width=0), fill='tonexty', name='Intervalo de 80%'))
+            x_real, y_real = reduzir_xy(test['ds'], test['y'])  # Pontos limitados à largura do gráfico
+            x_prev, y_prev = reduzir_xy(test['ds'], previsoes['yhat'].iloc[train_size:])
+            fig_previsoes.add_trace(go.Scatter(x=x_real, y=y_real, mode='lines', name='Valores Reais'))
+            fig_previsoes.add_trace(go.Scatter(x=x_prev, y=y_prev, mode='lines', name='Previsões'))
+            fig_previsoes.update_layout(title='Previsões do Preço do Brent com Prophet', xaxis_title='Data', yaxis_title='Preço (US$)')
+            st.plotly_chart(fig_previsoes, use_container_width=True)
+
+            # Componentes do Modelo
+            st.write("**Componentes do Modelo Prophet**")
+            with rastreamento.etapa("prophet: componentes"):
+                fig_componentes = modelo_prophet.plot_components(previsoes, uncertainty=bool(amostras))
+                st.pyplot(fig_componentes)
+            dep.plt.close(fig_componentes)  # Libera a figura do registro do pyplot (senão ela acumula a cada rerun)
+
+            tendencia_media, anual_desvio = previsoes['trend'].mean(), previsoes['yearly'].std()
+
+        exibir_backtest('prophet')
 
         # Conclusão
         st.subheader('Conclusão')
         st.markdown(f'''
         - **RMSE**: {rmse:.2f} (Raiz do Erro Quadrático Médio): Mede a diferença média entre os valores reais e as previsões.
         - **MAE**: {mae:.2f} (Erro Absoluto Médio): Mede a diferença absoluta média entre os valores reais e as previsões.
-        - **Tendência**: O modelo capturou a tendência de {"crescimento" if previsoes['trend'].mean() > 0 else "declínio"}.
-        - **Sazonalidade**: Padrões sazonais foram {"evidentes" if previsoes['yearly'].std() > 0 else "fracos ou inexistentes"}.
+        - **Tendência**: O modelo capturou a tendência de {"crescimento" if tendencia_media > 0 else "declínio"}.
+        - **Sazonalidade**: Padrões sazonais foram {"evidentes" if anual_desvio > 0 else "fracos ou inexistentes"}.
         ''')
 
 #%% LSTM
@@ -682,63 +969,98 @@ if pagina_selecionada == "LSTM":
     # Filtrar dados para o período de 10/02/2015 a 10/02/2025
     data_inicio = pd.to_datetime("2015-02-10")
     data_fim = pd.to_datetime("2025-02-10")
-    df_periodo = df[(df['data'] >= data_inicio) & (df['data'] <= data_fim)]
+    periodo = serie.intervalo(data_inicio, data_fim)
+    df_periodo = periodo.para_dataframe()
 
     if df_periodo.empty:
         st.warning("Nenhum dado disponível para o período selecionado.")
     else:
-        # Preparar dados para o LSTM
-        dados = df_periodo['preco'].values.reshape(-1, 1)
-        scaler = MinMaxScaler(feature_range=(0, 1))
-        dados_escalados = scaler.fit_transform(dados)
-
-        # Criar sequências temporais
-        def criar_sequencias(dados, janela_temporal):
-            X, y = [], []
-            for i in range(janela_temporal, len(dados)):
-                X.append(dados[i-janela_temporal:i, 0])
-                y.append(dados[i, 0])
-            return np.array(X), np.array(y)
-
-        janela_temporal = 60
-        X, y = criar_sequencias(dados_escalados, janela_temporal)
-        X = X.reshape((X.shape[0], X.shape[1], 1))
+        # Previsões do snapshot gerado em lote, se houver; senão o artefato é carregado e a inferência roda aqui
+        snapshot = snapshot_do_modelo('lstm', periodo)
+        if usar_snapshot('lstm', snapshot):
+            metricas_snapshot = exibir_snapshot('LSTM', snapshot)
+            rmse, mae = metricas_snapshot['rmse'], metricas_snapshot['mae']
+            st.caption(f"Modelo LSTM: artefato v{metricas_snapshot['versao']}.")
+            with rastreamento.etapa("lstm: carregar artefato"):
+                artefato = carregar_artefato_lstm(versao_atual_lstm())  # Só para a previsão de vários dias abaixo
+        else:
+            # Carregar o modelo treinado offline (python -m brent.modelo_lstm); treinar aqui só se ainda não houver artefato
+            with rastreamento.etapa("lstm: carregar artefato"):
+                artefato = carregar_artefato_lstm(versao_atual_lstm())
+            if artefato is None:
+                st.warning("Nenhum artefato do LSTM encontrado: o modelo será treinado no servidor. "
+                           "Para evitar isso, rode `python -m brent.modelo_lstm` antes de publicar o app.")
+                dados_treino = df_periodo[['data', 'preco']]
+                tarefa = fila_treinos().submeter(('lstm', hash_dataframe(dados_treino)), treinar_e_salvar_lstm,
+                                                 dados_treino, nome="Treino do LSTM")
+                artefato = aguardar_treino(tarefa, 'lstm')
+            motor = "NumPy, sem TensorFlow" if isinstance(artefato.modelo, ModeloNumPy) else "Keras"
+            busca = artefato.metadados.get("busca")  # Artefato promovido pela busca de hiperparâmetros (python -m brent.busca_lstm)
+            origem = f", melhor tentativa do estudo '{busca['estudo']}'" if busca else ""
+            st.caption(f"Modelo LSTM: artefato v{artefato.versao} (janela de {artefato.janela_temporal} dias, inferência em {motor}{origem}).")
+
+            # Criar sequências temporais com a escala e a janela do artefato
+            janela_temporal = artefato.janela_temporal
+            scaler = artefato.scaler
+            X, y = preparar_dados_lstm(df_periodo['preco'].values, scaler, janela_temporal)
+
+            # Dividir dados em treino e teste
+            train_size = int(len(X) * 0.8)
+            X_test, y_test = X[train_size:], y[train_size:]
+
+            # Fazer previsões
+            with rastreamento.etapa("lstm: predict", janelas=len(X_test)):
+                previsoes = artefato.modelo.predict(X_test, verbose=0)
+            previsoes = scaler.inverse_transform(previsoes)
+            y_test = scaler.inverse_transform(y_test.reshape(-1, 1))
+
+            # Calcular métricas de desempenho
+            rmse = np.sqrt(dep.mean_squared_error(y_test, previsoes))
+            mae = dep.mean_absolute_error(y_test, previsoes)
+
+            st.write(f"**RMSE:** {rmse:.2f}")
+            st.write(f"**MAE:** {mae:.2f}")
+
+            # Gráfico das Previsões
+            st.write("**Previsões vs Valores Reais**")
+            fig_previsoes = go.Figure()
+            x_real, y_real = reduzir_xy(df_periodo['data'].iloc[train_size+janela_temporal:], y_test.flatten())  # Pontos limitados à largura do gráfico
+            x_prev, y_prev = reduzir_xy(df_periodo['data'].iloc[train_size+janela_temporal:], previsoes.flatten())
+            fig_previsoes.add_trace(go.Scatter(x=x_real, y=y_real, mode='lines', name='Valores Reais'))
+            fig_previsoes.add_trace(go.Scatter(x=x_prev, y=y_prev, mode='lines', name='Previsões'))
+            fig_previsoes.update_layout(title='Previsões do Preço do Brent com LSTM', xaxis_title='Data', yaxis_title='Preço (US$)')
+            st.plotly_chart(fig_previsoes, use_container_width=True)
+
+        # Previsão de vários dias: todas as origens do teste em cada chamada ao modelo (brent.modelo_lstm.prever_trajetorias)
+        if artefato is not None:
+            st.subheader('Previsão de vários dias')
+            horizonte = st.select_slider("Horizonte (pregões)", options=list(HORIZONTES_LSTM), value=21, key="horizonte_lstm")
+            with rastreamento.etapa("lstm: previsão futura", passos=horizonte):
+                previsao_futura = prever_recursivo_lstm(artefato, periodo.precos, horizonte)
+            datas_futuras = pd.bdate_range(pd.Timestamp(periodo.datas[-1]) + pd.offsets.BDay(1), periods=horizonte)
+            fig_futuro = go.Figure()
+            fig_futuro.add_trace(go.Scatter(x=periodo.datas[-120:], y=periodo.precos[-120:], mode='lines', name='Valores Reais'))
+            fig_futuro.add_trace(go.Scatter(x=datas_futuras, y=previsao_futura, mode='lines', name='Previsão'))
+            fig_futuro.update_layout(title=f'Previsão do Preço do Brent com LSTM para os próximos {horizonte} pregões',
+                                     xaxis_title='Data', yaxis_title='Preço (US$)')
+            st.plotly_chart(fig_futuro, use_container_width=True)
+
+            # Erro por horizonte: trajetórias a partir de uma origem por semana de pregão do teste
+            erros = erros_por_horizonte_lstm(artefato, periodo.precos, horizonte, passo_origens=5)
+            if erros['origens']:
+                fig_erros = go.Figure()
+                fig_erros.add_trace(go.Scatter(x=erros['horizonte'], y=erros['rmse'], mode='lines+markers', name='RMSE'))
+                fig_erros.add_trace(go.Scatter(x=erros['horizonte'], y=erros['mae'], mode='lines+markers', name='MAE'))
+                fig_erros.update_layout(title='Erro da previsão recursiva por horizonte no período de teste',
+                                        xaxis_title='Pregões à frente', yaxis_title='Erro (US$)')
+                st.plotly_chart(fig_erros, use_container_width=True)
+                st.caption(f"{erros['origens']} trajetórias de {horizonte} pregões, uma a cada 5 pregões do teste, "
+                           f"previstas em lote. Erro no último pregão: RMSE {erros['rmse'][-1]:.2f}, MAE {erros['mae'][-1]:.2f}.")
+            else:
+                st.info(f"O período de teste é curto demais para avaliar trajetórias de {horizonte} pregões.")
 
-        # Dividir dados em treino e teste
-        train_size = int(len(X) * 0.8)
-        X_train, X_test = X[:train_size], X[train_size:]
-        y_train, y_test = y[:train_size], y[train_size:]
-
-        # Construir o modelo LSTM
-        st.write("**Construindo e treinando o modelo LSTM...aguarde, por favor**")
-        modelo_lstm = Sequential()
-        modelo_lstm.add(LSTM(units=50, return_sequences=True, input_shape=(X_train.shape[1], 1)))
-        modelo_lstm.add(LSTM(units=50, return_sequences=False))
-        modelo_lstm.add(Dense(units=25))
-        modelo_lstm.add(Dense(units=1))
-
-        modelo_lstm.compile(optimizer='adam', loss='mean_squared_error')
-        modelo_lstm.fit(X_train, y_train, batch_size=32, epochs=20)
-
-        # Fazer previsões
-        previsoes = modelo_lstm.predict(X_test)
-        previsoes = scaler.inverse_transform(previsoes)
-        y_test = scaler.inverse_transform(y_test.reshape(-1, 1))
-
-        # Calcular métricas de desempenho
-        rmse = np.sqrt(mean_squared_error(y_test, previsoes))
-        mae = mean_absolute_error(y_test, previsoes)
-
-        st.write(f"**RMSE:** {rmse:.2f}")
-        st.write(f"**MAE:** {mae:.2f}")
-
-        # Gráfico das Previsões
-        st.write("**Previsões vs Valores Reais**")
-        fig_previsoes = go.Figure()
-        fig_previsoes.add_trace(go.Scatter(x=df_periodo['data'].iloc[train_size+janela_temporal:], y=y_test.flatten(), mode='lines', name='Valores Reais'))
-        fig_previsoes.add_trace(go.Scatter(x=df_periodo['data'].iloc[train_size+janela_temporal:], y=previsoes.flatten(), mode='lines', name='Previsões'))
-        fig_previsoes.update_layout(title='Previsões do Preço do Brent com LSTM', xaxis_title='Data', yaxis_title='Preço (US$)')
-        st.plotly_chart(fig_previsoes, use_container_width=True)
+
+        exibir_backtest('lstm')
 
         # Conclusão
         st.subheader('Conclusão')
@@ -770,3 +1092,5 @@ if pagina_selecionada == "Sobre o Desenvolvedor":
 
     ''')
 
+# Painel oculto de tempos (?rastro=1): fecha o rastro deste rerun
+painel_rastro.exibir()
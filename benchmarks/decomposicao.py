@@ -0,0 +1,57 @@
+"""Escala da decomposição com o tamanho do intervalo (período de 252 pregões).
+
+Para intervalos crescentes terminando em 2025 mede o STL do statsmodels com os
+parâmetros padrão (LOESS avaliado em todos os pontos), o STL de
+``brent.decomposicao`` (com saltos), o MSTL e a decomposição clássica, e
+mostra o tempo por mil observações, que deve ficar aproximadamente constante.
+
+Uso:
+    python benchmarks/decomposicao.py [--robusto]
+"""
+import argparse
+import os
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from brent import decomposicao  # noqa: E402
+from brent.fontes import criar_fonte  # noqa: E402
+from brent.serie import SerieBrent  # noqa: E402
+
+INICIOS = ["2020-01-01", "2015-01-01", "2005-01-01", "1987-01-01"]
+
+
+def stl_padrao(x, periodo, robusto):
+    from statsmodels.tsa.seasonal import STL
+
+    STL(x, period=periodo, robust=robusto).fit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--robusto", action="store_true")
+    args = parser.parse_args()
+
+    serie = SerieBrent.de_dataframe(criar_fonte().ler())
+    periodo = decomposicao.PERIODO_PREGAO
+    medicoes = {"STL padrão": lambda p: stl_padrao(p.precos, periodo, args.robusto)}
+    for metodo in decomposicao.METODOS:
+        medicoes[metodo] = lambda p, metodo=metodo: decomposicao.decompor_arrays(p.datas, p.precos, metodo, periodo, args.robusto)
+    decomposicao.decompor_arrays(serie.datas[:600], serie.precos[:600])  # Importa o statsmodels fora da medição
+
+    print(f"{'Início':<12}{'pregões':>9}" + "".join(f"{nome + ' (ms)':>20}" for nome in medicoes) + f"{'stl ms/mil obs.':>18}")
+    for inicio in INICIOS:
+        periodo_serie = serie.intervalo(inicio, None)
+        tempos = []
+        for medir in medicoes.values():
+            t = time.perf_counter()
+            medir(periodo_serie)
+            tempos.append((time.perf_counter() - t) * 1000)
+        por_mil = tempos[1] / len(periodo_serie) * 1000
+        print(f"{inicio:<12}{len(periodo_serie):>9}" + "".join(f"{t:>20.1f}" for t in tempos) + f"{por_mil:>18.2f}")
+
+
+if __name__ == "__main__":
+    main()
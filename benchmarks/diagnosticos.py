@@ -0,0 +1,58 @@
+"""ADF em janela móvel: um ``adfuller`` por janela x somas acumuladas de ``brent.diagnosticos``.
+
+Para cada tamanho de janela mede o laço de ``adfuller`` (com a mesma ordem de
+defasagem fixa) e ``adf_janelas``, e confere a maior diferença entre as
+estatísticas das duas abordagens.
+
+Uso:
+    python benchmarks/diagnosticos.py [--passo 5] [--lags 17]
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from brent import diagnosticos  # noqa: E402
+from brent.fontes import criar_fonte  # noqa: E402
+from brent.serie import SerieBrent  # noqa: E402
+
+JANELAS = [252, 504, 756]
+
+
+def laco_adfuller(x, janela, passo, lags):
+    from statsmodels.tsa.stattools import adfuller
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", FutureWarning)
+        return np.array([adfuller(x[fim - janela + 1:fim + 1], maxlag=lags, autolag=None)[0]
+                         for fim in range(janela - 1, len(x), passo)])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--passo", type=int, default=5)
+    parser.add_argument("--lags", type=int, default=17)
+    args = parser.parse_args()
+
+    serie = SerieBrent.de_dataframe(criar_fonte().ler())
+    x = serie.intervalo("2015-02-10", "2025-02-10").precos.astype(np.float64)
+
+    print(f"{'Janela':<8}{'janelas':>9}{'adfuller (ms)':>15}{'acumulado (ms)':>16}{'maior diferença':>17}")
+    for janela in JANELAS:
+        inicio = time.perf_counter()
+        antes = laco_adfuller(x, janela, args.passo, args.lags)
+        t_antes = (time.perf_counter() - inicio) * 1000
+        inicio = time.perf_counter()
+        _, depois, _ = diagnosticos.adf_janelas(x, janela, args.passo, args.lags)
+        t_depois = (time.perf_counter() - inicio) * 1000
+        print(f"{janela:<8}{len(depois):>9}{t_antes:>15.1f}{t_depois:>16.1f}{np.abs(antes - depois).max():>17.2e}")
+
+
+if __name__ == "__main__":
+    main()
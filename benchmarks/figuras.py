@@ -0,0 +1,106 @@
+"""Latência dos gráficos da página Histórico: pipeline antigo x figuras em cache.
+
+Para cada gráfico (boxplot e série temporal) e cada intervalo de anos mede:
+
+- "antes": o código original da página (``plt.subplots`` + ``sns.boxplot`` /
+  spline) rasterizado em PNG, como faz o ``st.pyplot``;
+- "depois (frio)": ``brent.figuras`` com o cache vazio;
+- "depois (cache)": a mesma chamada repetida, servida do cache.
+
+Ao final informa quantas figuras o pipeline antigo deixou abertas no pyplot.
+
+Uso:
+    python benchmarks/figuras.py [--repeticoes 3]
+"""
+import argparse
+import io
+import os
+import statistics
+import sys
+import time
+
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from brent import figuras, suavizacao  # noqa: E402
+from brent.fontes import criar_fonte  # noqa: E402
+from brent.serie import SerieBrent  # noqa: E402
+
+INTERVALOS = [(1988, 2025), (2000, 2010), (2020, 2022)]
+DESTAQUE = {1990, 1998, 1999, 2008, 2014, 2020, 2022}
+
+
+def boxplot_antigo(df_filtrado):
+    import seaborn as sns
+
+    fig, ax = plt.subplots(figsize=(12, 6))
+    cmap = ["#FF7F0E" if ano in DESTAQUE else "#3366CC" for ano in df_filtrado['ano'].unique()]
+    sns.boxplot(x='ano', y='preco', data=df_filtrado, ax=ax, width=0.6, fliersize=3, palette=cmap, hue='ano', legend=False)
+    plt.xticks(rotation=45)
+    ax.set_title("Boxplot do preço do barril de Brent (US$)", fontsize=18, fontweight="bold")
+    fig.savefig(io.BytesIO(), format="png", bbox_inches="tight")
+
+
+def serie_antiga(df_filtrado):
+    from scipy.interpolate import make_interp_spline
+
+    fig, ax = plt.subplots(figsize=(12, 6))
+    x_original = df_filtrado['data'].astype(np.int64) // 10**9
+    x_smooth = np.linspace(x_original.min(), x_original.max(), 300)
+    y_smooth = make_interp_spline(x_original, df_filtrado['preco'], k=3)(x_smooth)
+    ax.plot(pd.to_datetime(x_smooth, unit='s'), y_smooth, linewidth=2, alpha=0.9)
+    max_idx, min_idx = df_filtrado['preco'].idxmax(), df_filtrado['preco'].idxmin()
+    ax.scatter(df_filtrado['data'].iloc[max_idx], df_filtrado['preco'].max(), s=100, label="Máximo")
+    ax.scatter(df_filtrado['data'].iloc[min_idx], df_filtrado['preco'].min(), s=100, label="Mínimo")
+    ax.legend()
+    fig.savefig(io.BytesIO(), format="png", bbox_inches="tight")
+
+
+def cronometrar(funcao, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    df = criar_fonte().ler()
+    df['ano'] = df['data'].dt.year
+    serie = SerieBrent.de_dataframe(df)
+    serie.resumo_anual
+
+    graficos = {
+        "boxplot": (boxplot_antigo, figuras.png_boxplot),
+        "série temporal": (serie_antiga, figuras.png_serie_temporal),
+    }
+    print(f"{'Gráfico':<16}{'Anos':<12}{'antes (ms)':>12}{'depois frio (ms)':>18}{'depois cache (ms)':>19}")
+    for nome, (antigo, novo) in graficos.items():
+        for ano_inicial, ano_final in INTERVALOS:
+            df_filtrado = df[(df["data"] >= f"{ano_inicial}-01-01") & (df["data"] <= f"{ano_final}-12-31")].reset_index(drop=True)
+            antes = cronometrar(lambda: antigo(df_filtrado), args.repeticoes)
+            frio = []
+            for _ in range(args.repeticoes):
+                figuras.cache_figuras.limpar()
+                suavizacao.cache_suavizacao.limpar()
+                frio.append(cronometrar(lambda: novo(serie, ano_inicial, ano_final), 1))
+            cache = cronometrar(lambda: novo(serie, ano_inicial, ano_final), args.repeticoes)
+            print(f"{nome:<16}{f'{ano_inicial}-{ano_final}':<12}{antes:>12.1f}{statistics.median(frio):>18.1f}{cache:>19.3f}")
+
+    print(f"\nFiguras deixadas abertas no pyplot pelo pipeline antigo: {len(plt.get_fignums())}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Benchmark de inicialização a frio (cold start) por página do app1844.py.
+
+Cada medição roda em um processo Python novo, que importa as bibliotecas
+comuns a todas as páginas (streamlit, pandas, numpy, plotly) e depois apenas
+as dependências da página, via ``brent.dependencias.carregar_pagina``. A linha
+"(todas as dependências)" reproduz o comportamento antigo, em que tudo era
+importado no topo do script.
+
+Uso:
+    python benchmarks/inicializacao.py [--repeticoes 3] [--json resultado.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from brent.dependencias import PAGINAS, SIMBOLOS  # noqa: E402
+
+TODAS = "(todas as dependências)"
+
+# Código executado no processo filho: mede tempo de importação e pico de memória (RSS)
+SCRIPT_FILHO = """
+import json, resource, sys, time
+sys.path.insert(0, {raiz!r})
+inicio = time.perf_counter()
+import streamlit, pandas, numpy, plotly.express, plotly.graph_objects
+from brent.dependencias import importar
+for nome in {simbolos!r}:
+    importar(nome)
+segundos = time.perf_counter() - inicio
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if sys.platform == "darwin":  # no macOS ru_maxrss vem em bytes
+    rss_kb //= 1024
+print(json.dumps({{"segundos": segundos, "rss_mb": rss_kb / 1024}}))
+"""
+
+
+def medir(simbolos):
+    """Roda um processo novo que importa ``simbolos`` e devolve tempo e RSS."""
+    codigo = SCRIPT_FILHO.format(raiz=RAIZ, simbolos=list(simbolos))
+    saida = subprocess.run([sys.executable, "-c", codigo], capture_output=True, text=True, check=True)
+    return json.loads(saida.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticoes", type=int, default=3, help="medições por página (usa a mediana)")
+    parser.add_argument("--json", help="arquivo para gravar os resultados")
+    args = parser.parse_args()
+
+    cenarios = dict(PAGINAS)
+    cenarios[TODAS] = list(SIMBOLOS)
+
+    resultados = {}
+    print(f"{'Página':<48}{'tempo (s)':>12}{'RSS (MB)':>12}")
+    for pagina, simbolos in cenarios.items():
+        medidas = [medir(simbolos) for _ in range(args.repeticoes)]
+        resultados[pagina] = {
+            "segundos": statistics.median(m["segundos"] for m in medidas),
+            "rss_mb": statistics.median(m["rss_mb"] for m in medidas),
+            "simbolos": simbolos,
+        }
+        print(f"{pagina:<48}{resultados[pagina]['segundos']:>12.2f}{resultados[pagina]['rss_mb']:>12.0f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as arquivo:
+            json.dump(resultados, arquivo, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Compara o laço antigo de ``criar_sequencias`` com ``brent.janelas`` na série completa.
+
+Usa todo o histórico do parquet (1987–2025) escalado para [0, 1] e mede, para
+cada implementação, o tempo mediano e o pico de memória alocada (tracemalloc).
+
+Uso:
+    python benchmarks/janelas.py [--janela 60] [--repeticoes 5]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from brent.janelas import criar_janelas, criar_sequencias  # noqa: E402
+
+
+def criar_sequencias_laco(dados, janela_temporal):
+    """Implementação original da página LSTM."""
+    X, y = [], []
+    for i in range(janela_temporal, len(dados)):
+        X.append(dados[i-janela_temporal:i, 0])
+        y.append(dados[i, 0])
+    return np.array(X), np.array(y)
+
+
+def medir(funcao, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    tracemalloc.start()
+    funcao()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(tempos), pico
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--janela", type=int, default=60)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    precos = pd.read_parquet(os.path.join(RAIZ, "ipea_brent_20250217.parquet"))["preco"].to_numpy()
+    dados = ((precos - precos.min()) / (precos.max() - precos.min())).reshape(-1, 1)
+    print(f"Série completa: {len(dados)} pontos, janela {args.janela}")
+
+    X_laco, y_laco = criar_sequencias_laco(dados, args.janela)
+    X_view, y_view = criar_sequencias(dados, args.janela)
+    assert np.array_equal(X_laco, X_view[:, :, 0]) and np.array_equal(y_laco, y_view)
+
+    cenarios = {
+        "laço (original) + reshape": lambda: criar_sequencias_laco(dados, args.janela)[0].reshape(-1, args.janela, 1),
+        "sliding_window_view": lambda: criar_sequencias(dados, args.janela),
+        "sliding_window_view, horizontes 1..5": lambda: criar_janelas(dados, args.janela, horizontes=range(1, 6)),
+    }
+    print(f"{'Implementação':<40}{'tempo (ms)':>12}{'pico (MB)':>12}")
+    for nome, funcao in cenarios.items():
+        segundos, pico = medir(funcao, args.repeticoes)
+        print(f"{nome:<40}{segundos * 1000:>12.2f}{pico / 1024 ** 2:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
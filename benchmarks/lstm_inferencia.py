@@ -0,0 +1,101 @@
+"""Inferência do LSTM da página: modelo do Keras (TensorFlow) x forward pass em NumPy (``brent.lstm_numpy``).
+
+Cada motor roda em um processo Python novo, que carrega o artefato mais
+recente com ``carregar_artefato(motor=...)`` e prevê as janelas de teste da
+página (últimos 20% de 2015 a 2025). Mede o tempo de carga (imports mais
+leitura do artefato), a mediana de ``--repeticoes`` chamadas de ``predict``,
+os 21 passos da previsão recursiva e o pico de memória (RSS). As previsões
+dos dois motores são comparadas no fim.
+
+Uso:
+    python benchmarks/lstm_inferencia.py [--repeticoes 5] [--diretorio artefatos/lstm] [--json resultado.json]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from brent.lstm_numpy import ARQUIVO_PESOS, TOLERANCIA  # noqa: E402
+from brent.modelo_lstm import DIRETORIO_ARTEFATOS, MOTORES, versao_atual  # noqa: E402
+
+# Código executado no processo filho: carrega o artefato com um motor, prevê e mede
+SCRIPT_FILHO = """
+import json, os, resource, statistics, sys, time
+os.environ["TF_CPP_MIN_LOG_LEVEL"] = "3"
+sys.path.insert(0, {raiz!r})
+inicio = time.perf_counter()
+import numpy as np, pandas as pd
+from brent.modelo_lstm import PROPORCAO_TREINO, carregar_artefato, preparar_dados, prever_recursivo
+artefato = carregar_artefato(diretorio={diretorio!r}, motor={motor!r})
+carga = time.perf_counter() - inicio
+df = pd.read_parquet({parquet!r})
+precos = df[(df["data"] >= "2015-02-10") & (df["data"] <= "2025-02-10")].sort_values("data")["preco"].to_numpy()
+X, _ = preparar_dados(precos, artefato.scaler, artefato.janela_temporal)
+X_test = X[int(len(X) * PROPORCAO_TREINO):]
+tempos = []
+for _ in range({repeticoes}):
+    t = time.perf_counter()
+    previsoes = artefato.modelo.predict(X_test, verbose=0)
+    tempos.append(time.perf_counter() - t)
+t = time.perf_counter()
+prever_recursivo(artefato, precos, 21)
+recursivo = time.perf_counter() - t
+np.save({saida!r}, np.asarray(previsoes, dtype=np.float32))
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if sys.platform == "darwin":  # no macOS ru_maxrss vem em bytes
+    rss_kb //= 1024
+print(json.dumps({{"carga_s": carga, "predict_s": statistics.median(tempos), "recursivo_s": recursivo,
+                  "rss_mb": rss_kb / 1024, "janelas": len(X_test), "modelo": type(artefato.modelo).__name__}}))
+"""
+
+
+def medir(motor, diretorio, repeticoes, saida):
+    codigo = SCRIPT_FILHO.format(raiz=RAIZ, diretorio=diretorio, motor=motor, repeticoes=repeticoes, saida=saida,
+                                 parquet=os.path.join(RAIZ, "ipea_brent_20250217.parquet"))
+    resultado = subprocess.run([sys.executable, "-c", codigo], capture_output=True, text=True, check=True)
+    return json.loads(resultado.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticoes", type=int, default=5, help="chamadas de predict por motor (usa a mediana)")
+    parser.add_argument("--diretorio", default=DIRETORIO_ARTEFATOS, help="diretório dos artefatos do LSTM")
+    parser.add_argument("--json", help="arquivo para gravar os resultados")
+    args = parser.parse_args()
+
+    versao = versao_atual(args.diretorio)
+    if versao is None or not os.path.exists(os.path.join(args.diretorio, f"v{versao:04d}", ARQUIVO_PESOS)):
+        sys.exit("O artefato mais recente não tem pesos.npz: treine com `python -m brent.modelo_lstm` "
+                 "ou exporte com `python -m brent.lstm_numpy`.")
+
+    resultados, previsoes = {}, {}
+    with tempfile.TemporaryDirectory(prefix="brent-lstm-") as temporario:
+        print(f"{'Motor':<8}{'carga (s)':>11}{'predict (ms)':>14}{'recursivo (ms)':>16}{'RSS (MB)':>10}")
+        for motor in MOTORES:
+            saida = os.path.join(temporario, f"{motor}.npy")
+            resultados[motor] = medir(motor, args.diretorio, args.repeticoes, saida)
+            previsoes[motor] = np.load(saida)
+            r = resultados[motor]
+            print(f"{motor:<8}{r['carga_s']:>11.2f}{r['predict_s'] * 1000:>14.1f}{r['recursivo_s'] * 1000:>16.1f}"
+                  f"{r['rss_mb']:>10.0f}")
+
+    diferenca = float(np.max(np.abs(previsoes["numpy"] - previsoes["keras"])))
+    situacao = "dentro" if diferenca <= TOLERANCIA else "FORA"
+    print(f"\n{resultados['numpy']['janelas']} janelas; diferença máxima entre os motores: {diferenca:.2e} "
+          f"({situacao} da tolerância de {TOLERANCIA:.0e}, escala 0-1)")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as arquivo:
+            json.dump({"versao": versao, "motores": resultados, "diferenca_maxima": diferenca},
+                      arquivo, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Trajetórias de vários dias do LSTM: uma previsão recursiva por origem x todas as origens em lote.
+
+Carrega o artefato mais recente com o motor escolhido e prevê ``--passos``
+dias à frente a partir de cada origem do teste da página (janelas após os
+primeiros 80% de 2015 a 2025):
+
+- ``laço``: a previsão recursiva original, uma janela ``[1, janela, 1]`` por
+  chamada ao modelo, ``origens x passos`` chamadas;
+- ``lote``: ``modelo_lstm.prever_trajetorias``, todas as origens em cada
+  chamada, ``passos`` chamadas.
+
+Mede a mediana do tempo de ``--repeticoes`` execuções (o laço roda uma vez só
+com ``--origens`` limitando as origens, por ser lento) e confere que as
+trajetórias são iguais.
+
+Uso:
+    python benchmarks/lstm_trajetorias.py [--passos 21] [--motor numpy] [--origens 100] [--repeticoes 3]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "3")
+
+import pandas as pd  # noqa: E402
+
+from brent.janelas import criar_janelas  # noqa: E402
+from brent.modelo_lstm import MOTORES, PROPORCAO_TREINO, carregar_artefato, prever_trajetorias  # noqa: E402
+
+
+def prever_laco(artefato, janelas, passos):
+    """Previsão recursiva original, uma origem e um passo por chamada ao modelo."""
+    trajetorias = []
+    for janela in janelas:
+        janela = janela.reshape(1, -1, 1).astype(np.float32)
+        previsoes = []
+        for _ in range(passos):
+            proximo = float(artefato.modelo(janela, training=False)[0, 0])
+            previsoes.append(proximo)
+            janela = np.concatenate([janela[:, 1:, :], [[[proximo]]]], axis=1).astype(np.float32)
+        trajetorias.append(previsoes)
+    return artefato.scaler.inverse_transform(np.array(trajetorias).reshape(-1, 1)).reshape(len(janelas), passos)
+
+
+def cronometrar(funcao, repeticoes):
+    tempos, resultado = [], None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos), resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--passos", type=int, default=21, help="dias à frente de cada trajetória")
+    parser.add_argument("--motor", choices=MOTORES, default="numpy")
+    parser.add_argument("--origens", type=int, default=100, help="origens usadas no laço (o lote usa todas)")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    artefato = carregar_artefato(motor=args.motor)
+    if artefato is None:
+        sys.exit("Nenhum artefato do LSTM: treine com `python -m brent.modelo_lstm`.")
+    df = pd.read_parquet(os.path.join(RAIZ, "ipea_brent_20250217.parquet"))
+    precos = df[(df["data"] >= "2015-02-10") & (df["data"] <= "2025-02-10")].sort_values("data")["preco"].to_numpy()
+    janela_temporal = artefato.janela_temporal
+    inicio = int((len(precos) - janela_temporal) * PROPORCAO_TREINO)
+    X, _ = criar_janelas(artefato.scaler.transform(precos.reshape(-1, 1)), janela_temporal,
+                         horizontes=range(1, args.passos + 1))
+    janelas = X[inicio:]
+
+    origens_laco = min(args.origens, len(janelas))
+    segundos_lote, lote = cronometrar(lambda: prever_trajetorias(artefato, janelas, args.passos), args.repeticoes)
+    segundos_laco, laco = cronometrar(lambda: prever_laco(artefato, janelas[:origens_laco], args.passos), 1)
+    diferenca = float(np.max(np.abs(lote[:origens_laco] - laco)))
+
+    print(f"Motor {args.motor}, {args.passos} passos, {len(janelas)} origens no teste")
+    print(f"{'Modo':<7}{'origens':>9}{'chamadas':>10}{'tempo (s)':>11}{'ms por origem':>15}")
+    for modo, origens, chamadas, segundos in (("laço", origens_laco, origens_laco * args.passos, segundos_laco),
+                                              ("lote", len(janelas), args.passos, segundos_lote)):
+        print(f"{modo:<7}{origens:>9}{chamadas:>10}{segundos:>11.2f}{segundos / origens * 1000:>15.2f}")
+    print(f"\nDiferença máxima entre as trajetórias: {diferenca:.2e} US$")
+
+
+if __name__ == "__main__":
+    main()
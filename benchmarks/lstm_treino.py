@@ -0,0 +1,95 @@
+"""Treino do LSTM da página: arrays densos e 20 épocas fixas x pipeline ``tf.data`` com parada antecipada.
+
+Cada modo roda em um processo Python novo, no período da página (2015 a
+2025), e mede o tempo de treino, as épocas executadas, as amostras por
+segundo, o pico de memória (RSS) e o RMSE (US$) nas janelas de teste da
+página (últimos 20%), que nenhum dos dois modos vê no treino:
+
+- ``arrays``: o treino original, ``modelo.fit(X, y)`` com todas as janelas
+  materializadas e ``--epochs`` épocas;
+- ``tf.data``: ``modelo_lstm.treinar``, com as janelas montadas sob demanda,
+  validação nas últimas janelas do treino e no máximo ``--epochs`` épocas.
+
+Uso:
+    python benchmarks/lstm_treino.py [--epochs 20] [--threads-intra 1] [--threads-inter 1] [--json resultado.json]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+MODOS = ("arrays", "tf.data")
+
+# Código executado no processo filho: treina em um modo e avalia nas janelas de teste da página
+SCRIPT_FILHO = """
+import json, os, resource, sys, time
+os.environ["TF_CPP_MIN_LOG_LEVEL"] = "3"
+sys.path.insert(0, {raiz!r})
+import numpy as np, pandas as pd
+from brent import modelo_lstm
+from brent.pipeline_lstm import configurar_threads
+configurar_threads({intra!r}, {inter!r})
+df = pd.read_parquet({parquet!r})
+precos = df[(df["data"] >= "2015-02-10") & (df["data"] <= "2025-02-10")].sort_values("data")["preco"].to_numpy()
+inicio = time.perf_counter()
+if {modo!r} == "arrays":
+    from sklearn.preprocessing import MinMaxScaler
+    scaler = MinMaxScaler().fit(precos.reshape(-1, 1))
+    X, y = modelo_lstm.preparar_dados(precos, scaler, modelo_lstm.JANELA_TEMPORAL)
+    n = int(len(X) * modelo_lstm.PROPORCAO_TREINO)
+    modelo = modelo_lstm.construir_modelo(modelo_lstm.JANELA_TEMPORAL)
+    historico = modelo.fit(np.array(X[:n]), np.array(y[:n]), batch_size=32, epochs={epochs}, verbose=0)
+    epocas, janelas = len(historico.history["loss"]), n
+    segundos = time.perf_counter() - inicio
+    vazao = janelas * epocas / segundos
+else:
+    artefato = modelo_lstm.treinar(precos, epochs={epochs})
+    modelo, scaler = artefato.modelo, artefato.scaler
+    epocas, janelas = artefato.metadados["epocas_treinadas"], artefato.metadados["janelas_treino"]
+    segundos = time.perf_counter() - inicio
+    vazao = artefato.metadados["amostras_por_segundo"]
+X, y = modelo_lstm.preparar_dados(precos, scaler, modelo_lstm.JANELA_TEMPORAL)
+n = int(len(X) * modelo_lstm.PROPORCAO_TREINO)
+previsoes = scaler.inverse_transform(modelo.predict(np.array(X[n:]), verbose=0)).ravel()
+reais = scaler.inverse_transform(np.asarray(y[n:]).reshape(-1, 1)).ravel()
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if sys.platform == "darwin":  # no macOS ru_maxrss vem em bytes
+    rss_kb //= 1024
+print(json.dumps({{"segundos": segundos, "epocas": epocas, "janelas_treino": janelas, "amostras_s": vazao,
+                  "rmse": float(np.sqrt(np.mean((previsoes - reais) ** 2))), "rss_mb": rss_kb / 1024}}))
+"""
+
+
+def medir(modo, epochs, intra, inter):
+    codigo = SCRIPT_FILHO.format(raiz=RAIZ, modo=modo, epochs=epochs, intra=intra, inter=inter,
+                                 parquet=os.path.join(RAIZ, "ipea_brent_20250217.parquet"))
+    resultado = subprocess.run([sys.executable, "-c", codigo], capture_output=True, text=True, check=True)
+    return json.loads(resultado.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--epochs", type=int, default=20, help="épocas (no tf.data, o máximo)")
+    parser.add_argument("--threads-intra", type=int, help="threads de cada operação do TensorFlow")
+    parser.add_argument("--threads-inter", type=int, help="threads para operações independentes do TensorFlow")
+    parser.add_argument("--json", help="arquivo para gravar os resultados")
+    args = parser.parse_args()
+
+    resultados = {}
+    print(f"{'Modo':<9}{'treino (s)':>12}{'épocas':>8}{'janelas':>9}{'amostras/s':>12}{'RMSE (US$)':>12}{'RSS (MB)':>10}")
+    for modo in MODOS:
+        r = resultados[modo] = medir(modo, args.epochs, args.threads_intra, args.threads_inter)
+        print(f"{modo:<9}{r['segundos']:>12.1f}{r['epocas']:>8}{r['janelas_treino']:>9}{r['amostras_s']:>12,.0f}"
+              f"{r['rmse']:>12.2f}{r['rss_mb']:>10.0f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as arquivo:
+            json.dump({"epochs": args.epochs, "modos": resultados}, arquivo, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
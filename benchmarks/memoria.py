@@ -0,0 +1,149 @@
+"""Memória por worker e por sessão: cópias por sessão x série por processo x série em memória compartilhada.
+
+Sobe ``--workers`` processos ao mesmo tempo (como workers do Streamlit) e,
+em cada um, carrega a série e simula ``--sessoes`` sessões que filtram o
+período das páginas de modelos. Três modos:
+
+- ``cache_data``: o comportamento antigo, um DataFrame lido do parquet e uma
+  cópia por sessão (pickle, como o ``st.cache_data``) mais a cópia filtrada;
+- ``por_processo``: uma ``SerieBrent`` por processo (``st.cache_resource``),
+  sessões com views;
+- ``compartilhada``: a série anexada de ``/dev/shm`` (``brent.memoria_compartilhada``),
+  sessões com views.
+
+A memória vem de ``/proc/self/smaps_rollup`` (Linux): memória privada (só
+daquele processo) e PSS (páginas compartilhadas divididas entre os processos
+que as usam), medidas depois dos imports. ``--escala`` repete a série N vezes
+para o efeito aparecer acima do ruído do alocador. No modo ``compartilhada``
+a série é publicada antes de subir os workers, como depois do primeiro
+worker no app; o custo da publicação é o mesmo do modo ``por_processo``.
+
+Uso:
+    python benchmarks/memoria.py [--workers 4] [--sessoes 8] [--escala 200]
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+MODOS = ("cache_data", "por_processo", "compartilhada")
+
+# Código executado em cada worker: carrega, simula as sessões, mede e espera o pai liberar
+SCRIPT_FILHO = """
+import json, pickle, sys
+sys.path.insert(0, {raiz!r})
+import numpy as np, pandas as pd, pyarrow, pyarrow.ipc, pyarrow.parquet
+from brent import memoria_compartilhada
+from brent.fontes import FonteArquivoLocal
+from brent.serie import SerieBrent
+
+def memoria():
+    campos = {{}}
+    with open("/proc/self/smaps_rollup") as arquivo:
+        for linha in arquivo:
+            partes = linha.split()
+            if len(partes) >= 2 and partes[1].isdigit():
+                campos[partes[0].rstrip(":")] = int(partes[1]) / 1024
+    return {{"privada": campos["Private_Clean"] + campos["Private_Dirty"], "pss": campos["Pss"]}}
+
+fonte = FonteArquivoLocal({parquet!r})
+antes = memoria()
+if {modo!r} == "cache_data":
+    base = fonte.ler()
+    base["preco"].sum()
+else:
+    base = (memoria_compartilhada.carregar_serie(fonte, {shm!r}) if {modo!r} == "compartilhada"
+            else SerieBrent.de_dataframe(fonte.ler()))
+    base.precos.sum(), base.datas[-1]  # Toca as páginas, como o primeiro gráfico faria
+carga = memoria()
+sessoes = []
+for _ in range({sessoes}):
+    if {modo!r} == "cache_data":
+        df = pickle.loads(pickle.dumps(base))
+        sessoes.append(df[(df["data"] >= "2015-02-10") & (df["data"] <= "2025-02-10")])
+    else:
+        sessoes.append(base.intervalo("2015-02-10", "2025-02-10").para_dataframe())
+depois = memoria()
+print(json.dumps({{"carga": carga["privada"] - antes["privada"], "sessoes": depois["privada"] - carga["privada"],
+                  "pss": depois["pss"] - antes["pss"], "linhas": len(base)}}), flush=True)
+sys.stdin.read()
+"""
+
+
+def gerar_parquet(destino, escala):
+    """Parquet com os preços repetidos ``escala`` vezes; acima de 1, as datas viram horas consecutivas até 2025."""
+    import numpy as np
+    import pandas as pd
+
+    df = pd.read_parquet(os.path.join(RAIZ, "ipea_brent_20250217.parquet"))[["data", "preco"]].sort_values("data")
+    if escala > 1:
+        precos = np.tile(df["preco"].to_numpy(), escala)
+        df = pd.DataFrame({"data": pd.date_range(end="2025-02-10", periods=len(precos), freq="h"), "preco": precos})
+    df.to_parquet(destino, index=False)
+    return destino
+
+
+def medir(modo, workers, sessoes, parquet, shm):
+    """Sobe os workers juntos e devolve as medições de cada um."""
+    codigo = SCRIPT_FILHO.format(raiz=RAIZ, parquet=parquet, shm=shm, modo=modo, sessoes=sessoes)
+    processos = [subprocess.Popen([sys.executable, "-c", codigo], stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+                 for _ in range(workers)]
+    try:
+        # Cada worker só sai depois que todos mediram: as páginas compartilhadas entram no PSS de todos
+        return [json.loads(processo.stdout.readline()) for processo in processos]
+    finally:
+        for processo in processos:
+            processo.stdin.close()
+            processo.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--sessoes", type=int, default=8, help="sessões simuladas por worker")
+    parser.add_argument("--escala", type=int, default=200, help="repetições da série (1 = dados reais)")
+    parser.add_argument("--json", help="arquivo para gravar os resultados")
+    args = parser.parse_args()
+    if not os.path.exists("/proc/self/smaps_rollup"):
+        sys.exit("Este benchmark precisa do /proc/self/smaps_rollup (Linux).")
+
+    temporario = tempfile.mkdtemp(prefix="brent-memoria-")
+    shm = tempfile.mkdtemp(prefix="brent-memoria-", dir="/dev/shm" if os.path.isdir("/dev/shm") else None)
+    try:
+        parquet = gerar_parquet(os.path.join(temporario, "serie.parquet"), args.escala)
+        resultados = {}
+        print(f"{'Modo':<16}{'linhas':>10}{'carga/worker (MB)':>20}{'por sessão (MB)':>18}{'PSS total (MB)':>17}")
+        for modo in MODOS:
+            if modo == "compartilhada":
+                # Como no app em produção, o primeiro worker já publicou a série: os medidos só anexam
+                from brent import memoria_compartilhada
+                from brent.fontes import FonteArquivoLocal
+
+                memoria_compartilhada.carregar_serie(FonteArquivoLocal(parquet), shm)
+            medidas = medir(modo, args.workers, args.sessoes, parquet, shm)
+            resultados[modo] = {
+                "carga_mb": sum(m["carga"] for m in medidas) / len(medidas),
+                "sessao_mb": sum(m["sessoes"] for m in medidas) / len(medidas) / max(1, args.sessoes),
+                "pss_total_mb": sum(m["pss"] for m in medidas),
+                "linhas": medidas[0]["linhas"],
+            }
+            r = resultados[modo]
+            print(f"{modo:<16}{r['linhas']:>10}{r['carga_mb']:>20.1f}{r['sessao_mb']:>18.2f}{r['pss_total_mb']:>17.1f}")
+    finally:
+        shutil.rmtree(temporario, ignore_errors=True)
+        shutil.rmtree(shm, ignore_errors=True)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as arquivo:
+            json.dump({"workers": args.workers, "sessoes": args.sessoes, "escala": args.escala, "modos": resultados},
+                      arquivo, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""Renderização de cada página do app1844.py e do app.py com o AppTest do Streamlit, sem navegador.
+
+Cada cenário (app, página, intervalo de anos) roda em um processo Python
+novo, com cache de modelos e memória compartilhada em diretórios temporários
+próprios, e mede:
+
+- ``frio_s``: primeira execução do script já na página (dados, imports e
+  caches da página a frio);
+- ``rerun_s``: mediana de ``--reruns`` execuções seguintes (caches quentes);
+- ``rss_pico_mb``: pico de memória residente do processo (``ru_maxrss``);
+- ``etapas``: tempo acumulado e número de chamadas das funções de
+  ``brent/`` usadas pelas páginas (carga, filtro, figuras, testes,
+  decomposição, ajustes e previsões), na execução a frio e no rerun. As
+  etapas podem se sobrepor (ex.: ``tabela_testes`` chama ``adf``).
+
+O intervalo de anos só muda a página Histórico (app1844.py e app.py); as
+demais usam o período fixo de 2015 a 2025 e rodam uma vez. Quando a página
+precisa treinar um modelo (sem snapshot nem cache), o script é reexecutado
+até o treino em segundo plano terminar, e ``frio_s`` inclui a espera.
+
+Com ``--json`` os resultados são gravados em um arquivo; com ``--base`` são
+comparados com um arquivo gravado antes (ex.: ``benchmarks/base_paginas.json``
+na máquina de referência): tempos e memória acima da base mais
+``--tolerancia`` são listados como regressão e o script termina com código 1.
+
+Uso:
+    python benchmarks/paginas.py [--paginas Prophet LSTM] [--intervalos 1988-2025 2015-2025 2020-2022]
+                                 [--reruns 3] [--repeticoes 1] [--json resultado.json]
+                                 [--base base.json] [--tolerancia 0.25]
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+PAGINAS_APP1844 = ["Brent: Histórico", "Estacionariedade, Tendências e Sazonalidades", "ARIMA", "Prophet", "LSTM",
+                   "Video Explicativo", "Sobre o Desafio", "Sobre o Desenvolvedor"]
+# Página única do app.py
+PAGINA_APP = "Brent: Histórico"
+# (app, página) em que o intervalo de anos escolhido muda o conteúdo
+COM_INTERVALO = {("app1844.py", "Brent: Histórico"), ("app.py", PAGINA_APP)}
+INTERVALOS_PADRAO = ["1988-2025", "2015-2025", "2020-2022"]
+
+# Funções cronometradas: (módulo, atributo); ``Classe.metodo`` troca o método na classe
+ETAPAS = [
+    ("brent.memoria_compartilhada", "ler_serie"),
+    ("brent.dependencias", "importar"),
+    ("brent.serie", "SerieBrent.intervalo"),
+    ("brent.serie", "SerieBrent.para_dataframe"),
+    ("brent.figuras", "png_boxplot"),
+    ("brent.figuras", "png_serie_temporal"),
+    ("brent.resumo_anual", "desenhar_boxplot"),
+    ("brent.diagnosticos", "tabela_testes"),
+    ("brent.diagnosticos", "adf"),
+    ("brent.diagnosticos", "adf_movel"),
+    ("brent.decomposicao", "decompor"),
+    ("brent.snapshot", "carregar"),
+    ("brent.backtest", "carregar_ultimo"),
+    ("brent.modelo_arima", "ajustar_arima"),
+    ("brent.modelo_prophet", "ajustar_prophet"),
+    ("brent.modelo_lstm", "carregar_artefato"),
+    ("brent.modelo_lstm", "prever_trajetorias"),
+    ("brent.modelo_lstm", "treinar"),
+]
+
+# Código executado no processo filho: instala os cronômetros, roda o AppTest e mede tempo e RSS
+SCRIPT_FILHO = """
+import functools, importlib, json, resource, statistics, sys, threading, time
+sys.path.insert(0, {raiz!r})
+from streamlit.testing.v1 import AppTest
+
+tempos, trava = {{}}, threading.Lock()
+
+def cronometrar(nome, funcao):
+    @functools.wraps(funcao)
+    def cronometrada(*args, **kwargs):
+        inicio = time.perf_counter()
+        try:
+            return funcao(*args, **kwargs)
+        finally:
+            with trava:  # Treinos rodam em threads da fila (brent/tarefas.py)
+                segundos, chamadas = tempos.get(nome, (0.0, 0))
+                tempos[nome] = (segundos + time.perf_counter() - inicio, chamadas + 1)
+    return cronometrada
+
+for modulo, atributo in {etapas!r}:
+    alvo = importlib.import_module(modulo)
+    *classe, nome = atributo.split(".")
+    if classe:
+        alvo = getattr(alvo, classe[0])
+    setattr(alvo, nome, cronometrar(atributo, getattr(alvo, nome)))
+
+def coletar():
+    with trava:
+        etapas = {{nome: {{"segundos": s, "chamadas": c}} for nome, (s, c) in tempos.items()}}
+        tempos.clear()
+    return etapas
+
+def executar(at):
+    inicio = time.perf_counter()
+    at.run()
+    # Treino em segundo plano: a página mostra o progresso e encerra; repete até o resultado aparecer
+    while any("treinado em segundo plano" in str(info.value) for info in at.info):
+        time.sleep(1.0)
+        at.run()
+    return time.perf_counter() - inicio
+
+at = AppTest.from_file({app!r}, default_timeout={timeout})
+at.session_state["pagina"] = {pagina!r}
+if {intervalo!r} is not None:
+    at.session_state["ano_inicial"], at.session_state["ano_final"] = {intervalo!r}
+frio = executar(at)
+etapas_frio = coletar()
+reruns = [executar(at) for _ in range({reruns})]
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if sys.platform == "darwin":  # no macOS ru_maxrss vem em bytes
+    rss_kb //= 1024
+print(json.dumps({{
+    "frio_s": frio, "rerun_s": statistics.median(reruns) if reruns else None, "rss_pico_mb": rss_kb / 1024,
+    "etapas": {{"frio": etapas_frio, "rerun": coletar()}},
+    "titulos": [titulo.value for titulo in at.title],
+    "excecoes": [str(excecao.value) for excecao in at.exception] + [str(erro.value) for erro in at.error],
+}}))
+"""
+
+
+def cenarios(paginas, intervalos):
+    """(app, página, intervalo) a medir; ``intervalo`` é None nas páginas de período fixo."""
+    todos = [("app1844.py", pagina) for pagina in PAGINAS_APP1844] + [("app.py", PAGINA_APP)]
+    for app, pagina in todos:
+        if paginas and not any(filtro.lower() in f"{app} {pagina}".lower() for filtro in paginas):
+            continue
+        for intervalo in (intervalos if (app, pagina) in COM_INTERVALO else [None]):
+            yield app, pagina, intervalo
+
+
+def chave(resultado):
+    intervalo = resultado["intervalo"]
+    return resultado["app"], resultado["pagina"], f"{intervalo[0]}-{intervalo[1]}" if intervalo else "-"
+
+
+def medir(app, pagina, intervalo, reruns, timeout):
+    """Roda o cenário em um processo novo, com caches isolados, e devolve as medições."""
+    temporario = tempfile.mkdtemp(prefix="brent-paginas-")
+    ambiente = dict(os.environ, BRENT_CACHE_DIR=os.path.join(temporario, "cache"),
+                    BRENT_SHM_DIR=os.path.join(temporario, "shm"), TF_CPP_MIN_LOG_LEVEL="3")
+    codigo = SCRIPT_FILHO.format(raiz=RAIZ, etapas=ETAPAS, app=os.path.join(RAIZ, app), pagina=pagina,
+                                 intervalo=intervalo, reruns=reruns, timeout=timeout)
+    try:
+        saida = subprocess.run([sys.executable, "-c", codigo], capture_output=True, text=True, check=True,
+                               cwd=RAIZ, env=ambiente)
+    finally:
+        shutil.rmtree(temporario, ignore_errors=True)
+    return json.loads(saida.stdout.strip().splitlines()[-1])
+
+
+def mediana_das_etapas(medidas, fase):
+    nomes = sorted({nome for medida in medidas for nome in medida["etapas"][fase]})
+    vazio = {"segundos": 0.0, "chamadas": 0}
+    return {nome: {"segundos": statistics.median(m["etapas"][fase].get(nome, vazio)["segundos"] for m in medidas),
+                   "chamadas": max(m["etapas"][fase].get(nome, vazio)["chamadas"] for m in medidas)}
+            for nome in nomes}
+
+
+def comparar(resultados, base, tolerancia, minimo_s=0.05, minimo_mb=10.0):
+    """Regressões em relação à base: (cenário, métrica, base, atual) acima da tolerância e do ruído mínimo."""
+    anteriores = {chave(resultado): resultado for resultado in base["resultados"]}
+    regressoes = []
+    for resultado in resultados:
+        anterior = anteriores.get(chave(resultado))
+        if anterior is None:
+            continue
+        for metrica, minimo in (("frio_s", minimo_s), ("rerun_s", minimo_s), ("rss_pico_mb", minimo_mb)):
+            antes, agora = anterior.get(metrica), resultado.get(metrica)
+            if antes is not None and agora is not None and agora > antes * (1 + tolerancia) and agora - antes > minimo:
+                regressoes.append((chave(resultado), metrica, antes, agora))
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--paginas", nargs="*", help="filtra cenários pelo nome do app ou da página")
+    parser.add_argument("--intervalos", nargs="*", default=INTERVALOS_PADRAO, help="anos inicial-final da página Histórico")
+    parser.add_argument("--reruns", type=int, default=3, help="execuções com cache quente depois da primeira")
+    parser.add_argument("--repeticoes", type=int, default=1, help="processos por cenário (usa a mediana)")
+    parser.add_argument("--timeout", type=float, default=900, help="limite de cada execução do script (s)")
+    parser.add_argument("--json", help="arquivo para gravar os resultados")
+    parser.add_argument("--base", help="resultados anteriores (--json) para comparar")
+    parser.add_argument("--tolerancia", type=float, default=0.25, help="aumento relativo aceito antes de acusar regressão")
+    args = parser.parse_args()
+
+    intervalos = [tuple(int(ano) for ano in intervalo.split("-")) for intervalo in args.intervalos]
+    resultados = []
+    print(f"{'App':<12}{'Página':<48}{'anos':>11}{'frio (s)':>10}{'rerun (s)':>11}{'RSS (MB)':>10}  etapa mais lenta")
+    for app, pagina, intervalo in cenarios(args.paginas, intervalos):
+        medidas = [medir(app, pagina, intervalo, args.reruns, args.timeout) for _ in range(args.repeticoes)]
+        resultado = {
+            "app": app, "pagina": pagina, "intervalo": intervalo,
+            "frio_s": statistics.median(m["frio_s"] for m in medidas),
+            "rerun_s": statistics.median(m["rerun_s"] for m in medidas) if args.reruns else None,
+            "rss_pico_mb": statistics.median(m["rss_pico_mb"] for m in medidas),
+            "etapas": {fase: mediana_das_etapas(medidas, fase) for fase in ("frio", "rerun")},
+            "excecoes": medidas[-1]["excecoes"],
+        }
+        resultados.append(resultado)
+        etapas = resultado["etapas"]["frio"]
+        lenta = max(etapas, key=lambda nome: etapas[nome]["segundos"], default=None)
+        descricao = f"{lenta} ({etapas[lenta]['segundos']:.2f} s)" if lenta else "-"
+        rerun = f"{resultado['rerun_s']:>11.2f}" if resultado["rerun_s"] is not None else f"{'-':>11}"
+        print(f"{app:<12}{pagina[:46]:<48}{chave(resultado)[2]:>11}{resultado['frio_s']:>10.2f}{rerun}"
+              f"{resultado['rss_pico_mb']:>10.0f}  {descricao}")
+        for excecao in resultado["excecoes"]:
+            print(f"    erro na página: {excecao.splitlines()[0][:120]}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as arquivo:
+            json.dump({"python": sys.version.split()[0], "reruns": args.reruns, "repeticoes": args.repeticoes,
+                       "resultados": resultados}, arquivo, ensure_ascii=False, indent=2)
+
+    falhas = [resultado for resultado in resultados if resultado["excecoes"]]
+    regressoes = []
+    if args.base:
+        with open(args.base, encoding="utf-8") as arquivo:
+            regressoes = comparar(resultados, json.load(arquivo), args.tolerancia)
+        print(f"\n{len(regressoes)} regressão(ões) acima de {args.tolerancia:.0%} em relação a {args.base}")
+        for (app, pagina, anos), metrica, antes, agora in regressoes:
+            print(f"  {app} | {pagina} | {anos} | {metrica}: {antes:.2f} -> {agora:.2f} ({agora / antes - 1:+.0%})")
+    if falhas or regressoes:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
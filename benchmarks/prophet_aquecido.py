@@ -0,0 +1,64 @@
+"""Atualização diária do Prophet: ajuste a frio x reajuste aquecido a partir do modelo anterior.
+
+Simula a série crescendo um pregão por vez: o primeiro treino é ajustado a
+frio e cada dia seguinte é ajustado de novo, a frio e a partir dos parâmetros
+do dia anterior (``brent.modelo_prophet``). Mostra o tempo de cada ajuste e a
+maior diferença entre as previsões (yhat) dos dois.
+
+Uso:
+    python benchmarks/prophet_aquecido.py [--dias 5] [--inicio 2015-02-10] [--fim 2025-02-10]
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+# Cache em um diretório temporário, para não misturar com o cache do app
+os.environ["BRENT_CACHE_DIR"] = tempfile.mkdtemp(prefix="brent-prophet-")
+
+import pandas as pd  # noqa: E402
+
+from brent import modelo_prophet  # noqa: E402
+from brent.fontes import criar_fonte  # noqa: E402
+from brent.serie import SerieBrent  # noqa: E402
+
+HORIZONTE = 21
+
+
+def ajuste_frio(train):
+    from prophet import Prophet
+
+    t = time.perf_counter()
+    modelo = Prophet()
+    modelo.fit(train)
+    segundos = time.perf_counter() - t
+    return segundos, modelo.predict(modelo.make_future_dataframe(periods=HORIZONTE))["yhat"].to_numpy()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dias", type=int, default=5, help="pregões acrescentados, um por vez")
+    parser.add_argument("--inicio", default="2015-02-10")
+    parser.add_argument("--fim", default="2025-02-10")
+    args = parser.parse_args()
+    logging.getLogger("cmdstanpy").setLevel(logging.WARNING)
+
+    periodo = SerieBrent.de_dataframe(criar_fonte().ler()).intervalo(args.inicio, args.fim)
+    df = pd.DataFrame({"ds": periodo.datas, "y": periodo.precos})
+    n = len(df) - args.dias
+
+    print(f"{'treino':>8}{'modo':>10}{'frio (s)':>10}{'aquecido (s)':>14}{'max |Δyhat|':>13}")
+    for tamanho in range(n, len(df) + 1):
+        train = df.iloc[:tamanho]
+        segundos_frio, yhat_frio = ajuste_frio(train)
+        _, previsoes, info = modelo_prophet.ajustar_prophet(train, HORIZONTE)
+        diferenca = abs(previsoes["yhat"].to_numpy() - yhat_frio).max()
+        print(f"{tamanho:>8}{info['modo']:>10}{segundos_frio:>10.2f}{info['segundos_ajuste']:>14.2f}{diferenca:>13.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Previsão do Prophet: ``predict`` padrão (1000 simulações de uma vez) x previsão pontual x simulações em lotes.
+
+Ajusta o Prophet uma vez no treino da página (80% de 2015 a 2025) e, para
+cada horizonte (datas após o fim do treino, somadas às do histórico como no
+``make_future_dataframe``), mede o tempo e o pico de memória alocada
+(``tracemalloc``, que acompanha os arrays do NumPy) de:
+
+- ``padrao``: ``modelo.predict`` com o ``uncertainty_samples`` padrão;
+- ``pontual``: ``modelo_prophet.prever(..., amostras=0)``;
+- ``lotes``: ``modelo_prophet.prever`` com as mesmas simulações em lotes de
+  ``--linhas-por-lote`` datas;
+- ``cache``: ``modelo_prophet.intervalos`` já calculados (segunda chamada).
+
+Uso:
+    python benchmarks/prophet_incerteza.py [--horizontes 21 365 3650] [--amostras 1000] [--linhas-por-lote 1000]
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+# Cache em um diretório temporário, para não misturar com o cache do app
+os.environ["BRENT_CACHE_DIR"] = tempfile.mkdtemp(prefix="brent-prophet-")
+
+import pandas as pd  # noqa: E402
+
+from brent import modelo_prophet  # noqa: E402
+from brent.fontes import criar_fonte  # noqa: E402
+from brent.serie import SerieBrent  # noqa: E402
+
+
+def medir(funcao):
+    """Tempo (s) e pico de memória alocada (MB) de ``funcao()``, em execuções separadas (o tracemalloc atrasa)."""
+    inicio = time.perf_counter()
+    funcao()
+    segundos = time.perf_counter() - inicio
+    tracemalloc.start()
+    funcao()
+    pico = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+    tracemalloc.stop()
+    return segundos, pico
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--horizontes", type=int, nargs="+", default=[21, 365, 3650])
+    parser.add_argument("--amostras", type=int, default=modelo_prophet.AMOSTRAS_PADRAO)
+    parser.add_argument("--linhas-por-lote", type=int, default=modelo_prophet.LINHAS_POR_LOTE)
+    args = parser.parse_args()
+    logging.getLogger("cmdstanpy").setLevel(logging.WARNING)
+
+    from prophet import Prophet
+
+    periodo = SerieBrent.de_dataframe(criar_fonte().ler()).intervalo("2015-02-10", "2025-02-10")
+    df = pd.DataFrame({"ds": periodo.datas, "y": periodo.precos})
+    train = df.iloc[:int(len(df) * 0.8)]
+    modelo = Prophet(uncertainty_samples=args.amostras)
+    modelo.fit(train)
+    chave = modelo_prophet.chave_modelo(train, 0, {})
+
+    print(f"{'horizonte':>10}{'linhas':>8}{'modo':>10}{'tempo (s)':>11}{'pico (MB)':>11}")
+    for horizonte in args.horizontes:
+        futuro = modelo.make_future_dataframe(periods=horizonte)
+        cenarios = {
+            "padrao": lambda: modelo.predict(futuro),
+            "pontual": lambda: modelo_prophet.prever(modelo, futuro, 0),
+            "lotes": lambda: modelo_prophet.prever(modelo, futuro, args.amostras, args.linhas_por_lote),
+        }
+        modelo_prophet.intervalos(modelo, chave, futuro["ds"], args.amostras, args.linhas_por_lote)
+        cenarios["cache"] = lambda: modelo_prophet.intervalos(modelo, chave, futuro["ds"], args.amostras)
+        for modo, funcao in cenarios.items():
+            segundos, pico = medir(funcao)
+            print(f"{horizonte:>10}{len(futuro):>8}{modo:>10}{segundos:>11.2f}{pico:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
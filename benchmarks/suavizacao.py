@@ -0,0 +1,74 @@
+"""Custo da suavização da linha do preço: spline sobre os dados diários x ``brent.suavizacao``.
+
+Para cada intervalo de anos mede a spline cúbica original (ajustada sobre
+todas as observações diárias e avaliada em 300 pontos) e cada suavizador de
+``brent.suavizacao`` com o cache vazio, informando também quantos pontos
+agregados entraram no ajuste.
+
+Uso:
+    python benchmarks/suavizacao.py [--repeticoes 5]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from brent import suavizacao  # noqa: E402
+from brent.fontes import criar_fonte  # noqa: E402
+from brent.serie import SerieBrent  # noqa: E402
+
+INTERVALOS = [(1988, 2025), (2000, 2010), (2020, 2022), (2024, 2024)]
+
+
+def spline_diaria(periodo):
+    from scipy.interpolate import make_interp_spline
+
+    x_original = periodo.datas.astype(np.int64) // 10**9
+    x_smooth = np.linspace(x_original.min(), x_original.max(), 300)
+    return make_interp_spline(x_original, periodo.precos, k=3)(x_smooth)
+
+
+def cronometrar(funcao, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        suavizacao.cache_suavizacao.limpar()
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    serie = SerieBrent.de_dataframe(criar_fonte().ler())
+    metodos = list(suavizacao.SUAVIZADORES)
+    # Importações (scipy/statsmodels) fora da medição
+    for metodo in metodos:
+        suavizacao.suavizar(serie, "2024-01-01", "2024-12-31", metodo)
+
+    print(f"{'Anos':<12}{'diários':>9}{'agregados':>11}{'spline diária (ms)':>20}" + "".join(f"{m + ' (ms)':>18}" for m in metodos))
+    for ano_inicial, ano_final in INTERVALOS:
+        inicio, fim = f"{ano_inicial}-01-01", f"{ano_final}-12-31"
+        periodo = serie.intervalo(inicio, fim)
+        resolucao = suavizacao.escolher_resolucao(periodo.datas)
+        agregados = len(suavizacao.agregar(periodo.datas, periodo.precos, resolucao)[0])
+        try:
+            antes = f"{cronometrar(lambda: spline_diaria(periodo), args.repeticoes):.1f}"
+        except ValueError:
+            antes = "falhou"  # Datas repetidas ou fora de ordem
+        tempos = [cronometrar(lambda: suavizacao.suavizar(serie, inicio, fim, metodo), args.repeticoes) for metodo in metodos]
+        print(f"{f'{ano_inicial}-{ano_final}':<12}{len(periodo):>9}{f'{agregados} ({resolucao})':>11}{antes:>20}"
+              + "".join(f"{t:>18.1f}" for t in tempos))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+"""Módulos de apoio ao app de análise e previsão do preço do Brent.
+
+Os submódulos são importados sob demanda pelas páginas de ``app1844.py``;
+este pacote não importa nada pesado ao ser carregado.
+"""
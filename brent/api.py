@@ -0,0 +1,158 @@
+"""API HTTP local, somente leitura, sobre o snapshot de previsões (``brent.snapshot``).
+
+Usa apenas o ``http.server`` da biblioteca padrão, sem serviços externos.
+O snapshot fica em memória e é relido quando o arquivo muda (``mtime``),
+então um novo ``python -m brent.snapshot`` é servido sem reiniciar a API.
+
+Rotas (GET):
+
+- ``/saude``: data de criação do snapshot e modelos disponíveis;
+- ``/metricas``: RMSE, MAE, MAPE e tempo de cada modelo;
+- ``/previsoes?modelo=prophet&tipo=futuro&inicio=AAAA-MM-DD&fim=AAAA-MM-DD&formato=json``:
+  fatia do snapshot (todos os filtros são opcionais; ``formato`` é ``json``
+  ou ``csv``).
+
+As respostas levam um ``ETag`` derivado da versão do snapshot; clientes que
+repetem a consulta com ``If-None-Match`` recebem ``304`` enquanto o snapshot
+não muda.
+
+Uso:
+    python -m brent.api [--host 127.0.0.1] [--porta 8502] [--snapshot artefatos/snapshot/previsoes.parquet]
+"""
+import argparse
+import json
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from brent import snapshot
+
+PORTA_PADRAO = 8502
+
+
+class SnapshotEmMemoria:
+    """Snapshot carregado uma vez e recarregado quando o arquivo é substituído."""
+
+    def __init__(self, caminho=None):
+        self.caminho = caminho or snapshot.caminho_padrao()
+        self._trava = threading.Lock()
+        self._versao = None
+        self._dados = None
+
+    def obter(self):
+        """``(tabela, metadados, versao)``, ou None se o snapshot ainda não existe."""
+        versao = snapshot.modificado_em(self.caminho)
+        with self._trava:
+            if versao != self._versao:
+                self._dados = snapshot.carregar(self.caminho) if versao is not None else None
+                self._versao = versao
+            if self._dados is None:
+                return None
+            return self._dados[0], self._dados[1], self._versao
+
+
+def _registros(tabela):
+    """Linhas como dicionários, com datas ISO e NaN como null."""
+    tabela = tabela.assign(data=tabela["data"].dt.strftime("%Y-%m-%d"))
+    tabela = tabela.astype(object).where(tabela.notna(), None)
+    return tabela.to_dict(orient="records")
+
+
+class ManipuladorAPI(BaseHTTPRequestHandler):
+    server_version = "BrentAPI/1.0"
+
+    def do_GET(self):  # noqa: N802 - nome exigido pelo http.server
+        url = urlsplit(self.path)
+        parametros = {chave: valores[-1] for chave, valores in parse_qs(url.query).items()}
+        rotas = {"/saude": self._saude, "/metricas": self._metricas, "/previsoes": self._previsoes}
+        if url.path not in rotas:
+            return self._erro(HTTPStatus.NOT_FOUND, f"Rota desconhecida: {url.path} (use {sorted(rotas)})")
+        dados = self.server.snapshot.obter()
+        if dados is None:
+            return self._erro(HTTPStatus.SERVICE_UNAVAILABLE, "Snapshot não encontrado; rode `python -m brent.snapshot`.")
+        tabela, metadados, versao = dados
+        etag = f'"{versao:x}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return None
+        try:
+            corpo, tipo = rotas[url.path](tabela, metadados, parametros)
+        except ValueError as erro:
+            return self._erro(HTTPStatus.BAD_REQUEST, str(erro))
+        self._responder(HTTPStatus.OK, corpo, tipo, etag)
+        return None
+
+    def _saude(self, tabela, metadados, parametros):
+        return self._json({"criado_em": metadados["criado_em"], "periodo": metadados["periodo"],
+                           "modelos": sorted(metadados["modelos"]), "linhas": len(tabela)})
+
+    def _metricas(self, tabela, metadados, parametros):
+        return self._json({"criado_em": metadados["criado_em"], "modelos": metadados["modelos"],
+                           "erros": metadados["erros"]})
+
+    def _previsoes(self, tabela, metadados, parametros):
+        modelo, tipo = parametros.get("modelo"), parametros.get("tipo")
+        if modelo is not None and modelo not in metadados["modelos"]:
+            raise ValueError(f"Modelo fora do snapshot: {modelo!r} (use um de {sorted(metadados['modelos'])})")
+        if tipo is not None and tipo not in snapshot.TIPOS:
+            raise ValueError(f"Tipo desconhecido: {tipo!r} (use um de {list(snapshot.TIPOS)})")
+        formato = parametros.get("formato", "json")
+        if formato not in ("json", "csv"):
+            raise ValueError(f"Formato desconhecido: {formato!r} (use json ou csv)")
+        fatia = snapshot.fatiar(tabela, modelo, tipo, parametros.get("inicio"), parametros.get("fim"))
+        if formato == "csv":
+            return fatia.to_csv(index=False, date_format="%Y-%m-%d").encode("utf-8"), "text/csv; charset=utf-8"
+        return self._json({"criado_em": metadados["criado_em"], "linhas": _registros(fatia)})
+
+    @staticmethod
+    def _json(dados):
+        return json.dumps(dados, ensure_ascii=False).encode("utf-8"), "application/json; charset=utf-8"
+
+    def _erro(self, status, mensagem):
+        corpo, tipo = self._json({"erro": mensagem})
+        self._responder(status, corpo, tipo)
+
+    def _responder(self, status, corpo, tipo, etag=None):
+        self.send_response(status)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(corpo)))
+        if etag is not None:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, formato, *args):
+        if not self.server.silencioso:
+            super().log_message(formato, *args)
+
+
+def criar_servidor(host="127.0.0.1", porta=PORTA_PADRAO, caminho=None, silencioso=False):
+    """Servidor pronto para ``serve_forever()`` (``porta=0`` escolhe uma porta livre)."""
+    servidor = ThreadingHTTPServer((host, porta), ManipuladorAPI)
+    servidor.snapshot = SnapshotEmMemoria(caminho)
+    servidor.silencioso = silencioso
+    return servidor
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API local somente leitura sobre o snapshot de previsões.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=PORTA_PADRAO)
+    parser.add_argument("--snapshot", default=None, help=f"arquivo do snapshot (padrão: {snapshot.caminho_padrao()})")
+    args = parser.parse_args()
+
+    servidor = criar_servidor(args.host, args.porta, args.snapshot)
+    print(f"Servindo {servidor.snapshot.caminho} em http://{args.host}:{servidor.server_address[1]}")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""Backtest walk-forward dos modelos de previsão, com as dobras em paralelo.
+
+As páginas avaliam cada modelo em um único corte 80/20. Aqui a origem da
+previsão avança pelo período: em cada dobra o modelo é ajustado com os dados
+até a origem (janela ``expansiva`` desde o início, ou ``deslizante`` com
+tamanho fixo) e prevê os ``horizonte`` pregões seguintes, sem ver o teste.
+As dobras de um modelo são independentes e rodam em um pool de processos
+(``brent.paralelo``: ``spawn``, uma thread de BLAS/TensorFlow por processo).
+
+Modelos: ``prophet``, ``lstm`` (previsão recursiva), ``arima`` e ``sarimax``.
+Cada execução grava em ``artefatos/backtest/AAAAMMDD-HHMMSS/``:
+
+- ``dobras.parquet``: RMSE, MAE, MAPE e tempo de ajuste de cada dobra;
+- ``resumo.json``: configuração e tempo de parede (wall time) de cada modelo.
+
+Uso:
+    python -m brent.backtest [--modelos prophet arima sarimax lstm] [--modo expansiva]
+                             [--treino-inicial 1260] [--horizonte 21] [--passo 126] [--processos 4]
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from brent.paralelo import criar_pool, processos_padrao
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DIRETORIO_RESULTADOS = os.environ.get("BRENT_BACKTEST_DIR", os.path.join(RAIZ, "artefatos", "backtest"))
+ARQUIVO_DOBRAS = "dobras.parquet"
+ARQUIVO_RESUMO = "resumo.json"
+
+PERIODO_PADRAO = ("2015-02-10", "2025-02-10")
+MODOS = ("expansiva", "deslizante")
+
+
+def dobras(n, treino_inicial, horizonte, passo, modo="expansiva"):
+    """Lista de ``(inicio_treino, fim_treino, fim_teste)`` em posições; o teste é ``[fim_treino, fim_teste)``."""
+    if modo not in MODOS:
+        raise ValueError(f"Modo desconhecido: {modo!r} (use um de {MODOS})")
+    resultado = []
+    for fim_treino in range(treino_inicial, n - horizonte + 1, passo):
+        inicio_treino = 0 if modo == "expansiva" else fim_treino - treino_inicial
+        resultado.append((inicio_treino, fim_treino, fim_treino + horizonte))
+    return resultado
+
+
+def metricas(reais, previstos):
+    reais, previstos = np.asarray(reais, dtype=float), np.asarray(previstos, dtype=float)
+    erros = previstos - reais
+    return {
+        "rmse": float(np.sqrt(np.mean(erros ** 2))),
+        "mae": float(np.mean(np.abs(erros))),
+        "mape": float(np.mean(np.abs(erros / reais)) * 100),
+    }
+
+
+def prever_prophet(datas_treino, precos_treino, datas_teste):
+    import logging
+
+    from prophet import Prophet
+
+    from brent.modelo_prophet import prever
+
+    logging.getLogger("cmdstanpy").setLevel(logging.WARNING)
+    modelo = Prophet()
+    modelo.fit(pd.DataFrame({"ds": datas_treino, "y": precos_treino}))
+    # As métricas usam só o yhat: sem simulações de incerteza
+    return prever(modelo, pd.DataFrame({"ds": datas_teste}))["yhat"].to_numpy()
+
+
+def prever_arima(datas_treino, precos_treino, datas_teste, ordem=(1, 1, 1)):
+    from statsmodels.tsa.arima.model import ARIMA
+
+    return np.asarray(ARIMA(np.asarray(precos_treino, dtype=float), order=ordem).fit().forecast(len(datas_teste)))
+
+
+def prever_sarimax(datas_treino, precos_treino, datas_teste, ordem=(1, 1, 1), ordem_sazonal=(1, 0, 1, 5)):
+    from statsmodels.tsa.statespace.sarimax import SARIMAX
+
+    modelo = SARIMAX(np.asarray(precos_treino, dtype=float), order=ordem, seasonal_order=ordem_sazonal)
+    return np.asarray(modelo.fit(disp=False).forecast(len(datas_teste)))
+
+
+def prever_lstm(datas_treino, precos_treino, datas_teste, epochs=5, janela_temporal=None):
+    """Treina o LSTM da página com todo o treino e prevê o horizonte de forma recursiva."""
+    from brent import modelo_lstm
+
+    janela_temporal = janela_temporal or modelo_lstm.JANELA_TEMPORAL
+    artefato = modelo_lstm.treinar(precos_treino, janela_temporal, epochs=epochs, proporcao_treino=1.0)
+    return modelo_lstm.prever_recursivo(artefato, precos_treino, len(datas_teste))
+
+
+MODELOS = {
+    "prophet": prever_prophet,
+    "lstm": prever_lstm,
+    "arima": prever_arima,
+    "sarimax": prever_sarimax,
+}
+
+
+def _avaliar_dobra(modelo, numero, datas, precos, dobra, opcoes):
+    """Ajusta e avalia uma dobra; roda dentro de um processo do pool."""
+    inicio_treino, fim_treino, fim_teste = dobra
+    inicio = time.perf_counter()
+    previstos = MODELOS[modelo](datas[inicio_treino:fim_treino], precos[inicio_treino:fim_treino],
+                                datas[fim_treino:fim_teste], **opcoes)
+    registro = {
+        "modelo": modelo,
+        "dobra": numero,
+        "treino_inicio": datas[inicio_treino],
+        "origem": datas[fim_treino - 1],
+        "n_treino": fim_treino - inicio_treino,
+        "horizonte": fim_teste - fim_treino,
+        "segundos": time.perf_counter() - inicio,
+    }
+    registro.update(metricas(precos[fim_treino:fim_teste], previstos))
+    return registro
+
+
+def executar(datas, precos, modelos=("prophet", "arima", "sarimax", "lstm"), modo="expansiva",
+             treino_inicial=1260, horizonte=21, passo=126, processos=None, opcoes=None):
+    """Roda o backtest e devolve ``(dobras_df, tempos)``; ``tempos`` é o wall time (s) de cada modelo.
+
+    ``processos=1`` roda tudo no processo atual, sem pool. ``opcoes`` mapeia
+    modelo -> argumentos extras da função de previsão (ex.: ``{"lstm": {"epochs": 10}}``).
+    """
+    desconhecidos = set(modelos) - set(MODELOS)
+    if desconhecidos:
+        raise ValueError(f"Modelos desconhecidos: {sorted(desconhecidos)} (use {sorted(MODELOS)})")
+    datas, precos = np.asarray(datas), np.asarray(precos, dtype=float)
+    cortes = dobras(len(precos), treino_inicial, horizonte, passo, modo)
+    if not cortes:
+        raise ValueError("Nenhuma dobra cabe no período: reduza --treino-inicial ou --horizonte.")
+    processos = processos or processos_padrao(len(cortes))
+    opcoes = opcoes or {}
+
+    registros, tempos = [], {}
+    pool = criar_pool(processos) if processos > 1 else None
+    try:
+        for modelo in modelos:
+            inicio = time.perf_counter()
+            argumentos = [(modelo, i, datas, precos, dobra, opcoes.get(modelo, {})) for i, dobra in enumerate(cortes)]
+            if pool is None:
+                registros += [_avaliar_dobra(*a) for a in argumentos]
+            else:
+                registros += list(pool.map(_avaliar_dobra, *zip(*argumentos)))
+            tempos[modelo] = time.perf_counter() - inicio
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return pd.DataFrame(registros), tempos
+
+
+def resumir(df_dobras, tempos=None):
+    """Distribuição de RMSE/MAE/MAPE por modelo (média, desvio, mediana, p10, p90) e tempos."""
+    agregacoes = {}
+    for metrica in ("rmse", "mae", "mape"):
+        agregacoes.update({
+            f"{metrica}_media": (metrica, "mean"),
+            f"{metrica}_desvio": (metrica, "std"),
+            f"{metrica}_mediana": (metrica, "median"),
+            f"{metrica}_p10": (metrica, lambda v: v.quantile(0.1)),
+            f"{metrica}_p90": (metrica, lambda v: v.quantile(0.9)),
+        })
+    resumo = df_dobras.groupby("modelo").agg(dobras=("dobra", "count"), segundos_ajuste=("segundos", "sum"),
+                                             **agregacoes)
+    if tempos:
+        resumo["wall_time"] = pd.Series(tempos)
+    return resumo
+
+
+def salvar(df_dobras, tempos, configuracao, diretorio=DIRETORIO_RESULTADOS):
+    """Grava a execução em um novo subdiretório e devolve o caminho."""
+    destino = os.path.join(diretorio, time.strftime("%Y%m%d-%H%M%S"))
+    os.makedirs(destino, exist_ok=True)
+    df_dobras.to_parquet(os.path.join(destino, ARQUIVO_DOBRAS), index=False)
+    # resumo.json por último: uma execução sem ele está incompleta e é ignorada
+    with open(os.path.join(destino, ARQUIVO_RESUMO), "w", encoding="utf-8") as arquivo:
+        json.dump({"configuracao": configuracao, "wall_time": tempos,
+                   "criado_em": time.strftime("%Y-%m-%dT%H:%M:%S")}, arquivo, ensure_ascii=False, indent=2)
+    return destino
+
+
+def carregar_ultimo(diretorio=DIRETORIO_RESULTADOS):
+    """``(dobras_df, resumo)`` da execução mais recente, ou None se não houver."""
+    if not os.path.isdir(diretorio):
+        return None
+    execucoes = sorted(nome for nome in os.listdir(diretorio)
+                       if os.path.exists(os.path.join(diretorio, nome, ARQUIVO_RESUMO)))
+    if not execucoes:
+        return None
+    origem = os.path.join(diretorio, execucoes[-1])
+    with open(os.path.join(origem, ARQUIVO_RESUMO), encoding="utf-8") as arquivo:
+        resumo = json.load(arquivo)
+    return pd.read_parquet(os.path.join(origem, ARQUIVO_DOBRAS)), resumo
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest walk-forward dos modelos de previsão.")
+    parser.add_argument("--modelos", nargs="+", default=["prophet", "arima", "sarimax", "lstm"], choices=sorted(MODELOS))
+    parser.add_argument("--modo", default="expansiva", choices=MODOS)
+    parser.add_argument("--inicio", default=PERIODO_PADRAO[0], help="data inicial do período (AAAA-MM-DD)")
+    parser.add_argument("--fim", default=PERIODO_PADRAO[1], help="data final do período (AAAA-MM-DD)")
+    parser.add_argument("--treino-inicial", type=int, default=1260, help="pregões no treino da primeira dobra")
+    parser.add_argument("--horizonte", type=int, default=21, help="pregões previstos em cada dobra")
+    parser.add_argument("--passo", type=int, default=126, help="pregões entre origens consecutivas")
+    parser.add_argument("--processos", type=int, default=None, help="tamanho do pool (1 = sem paralelismo)")
+    parser.add_argument("--epochs-lstm", type=int, default=5)
+    args = parser.parse_args()
+
+    from brent.fontes import criar_fonte
+    from brent.serie import SerieBrent
+
+    periodo = SerieBrent.de_dataframe(criar_fonte().ler()).intervalo(args.inicio, args.fim)
+    df_dobras, tempos = executar(
+        periodo.datas, periodo.precos, args.modelos, args.modo, args.treino_inicial, args.horizonte, args.passo,
+        args.processos, opcoes={"lstm": {"epochs": args.epochs_lstm}},
+    )
+    configuracao = {chave: valor for chave, valor in vars(args).items()}
+    configuracao["impressao_digital"] = periodo.impressao_digital
+    destino = salvar(df_dobras, tempos, configuracao)
+
+    colunas = ["dobras", "rmse_media", "rmse_p10", "rmse_p90", "mae_media", "mape_media", "segundos_ajuste", "wall_time"]
+    with pd.option_context("display.width", 160, "display.max_columns", None, "display.float_format", "{:.2f}".format):
+        print(resumir(df_dobras, tempos)[colunas])
+    print(f"\nResultados em {destino}")
+
+
+if __name__ == "__main__":
+    main()
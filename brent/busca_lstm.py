@@ -0,0 +1,352 @@
+"""Busca de hiperparâmetros do LSTM em paralelo, com poda de tentativas e estudo em SQLite.
+
+Cada tentativa treina o LSTM (``modelo_lstm.treinar``, com validação e parada
+antecipada) com uma combinação de ``ESPACO`` e é avaliada pelo menor loss de
+validação (últimas janelas do treino; o teste da página não é visto). As
+tentativas rodam no pool de processos de ``brent.paralelo`` (``spawn``), cada
+uma com ``threads`` threads do TensorFlow/BLAS.
+
+O estudo fica em um banco SQLite local (``artefatos/lstm/busca/estudos.db``):
+parâmetros, status e resultado de cada tentativa e o loss de validação de
+cada época. Os processos só se comunicam por ele, e um estudo interrompido
+continua de onde parou ao rodar de novo com o mesmo ``--estudo``.
+
+Ao fim de cada época, a tentativa grava o loss e consulta as outras para
+decidir se continua (``PODAS``):
+
+- ``mediana``: após ``aquecimento`` épocas, para se o melhor loss até aqui é
+  pior que a mediana do melhor loss das outras tentativas na mesma época
+  (com pelo menos ``minimo`` tentativas para comparar);
+- ``halving``: successive halving assíncrono; nos degraus
+  ``aquecimento * eta^k`` épocas, só continua quem está entre o 1/``eta``
+  melhores das tentativas que chegaram ao degrau.
+
+A primeira tentativa de um estudo é sempre a arquitetura atual da página. O
+modelo de cada tentativa concluída é guardado, e ``promover`` grava o melhor
+como nova versão do artefato em ``artefatos/lstm/``, que passa a ser servida.
+
+Uso:
+    python -m brent.busca_lstm [--tentativas 20] [--processos 4] [--threads 1] [--poda mediana]
+                               [--estudo lstm] [--epochs 20] [--promover]
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import time
+from concurrent.futures import as_completed
+from contextlib import contextmanager
+
+import numpy as np
+
+from brent.modelo_lstm import ARQUITETURA_PADRAO, DIRETORIO_ARTEFATOS, JANELA_TEMPORAL, PERIODO_PADRAO, RAIZ
+from brent.paralelo import criar_pool, processos_padrao
+
+DIRETORIO_BUSCA = os.path.join(DIRETORIO_ARTEFATOS, "busca")
+ARQUIVO_ESTUDOS = "estudos.db"
+PODAS = ("mediana", "halving", "nenhuma")
+
+ESPACO = {
+    "janela": (30, 60, 90),
+    "unidades": (32, 50, 64, 96),
+    "camadas": (1, 2),
+    "densa": (0, 25),
+    "batch_size": (32, 64),
+    "taxa_aprendizado": (0.0005, 0.001, 0.003),
+}
+PADRAO = {"janela": JANELA_TEMPORAL, "batch_size": 32, **ARQUITETURA_PADRAO}
+
+CONFIG_PADRAO = {
+    "epochs": 20,
+    "poda": "mediana",
+    "aquecimento": 3,
+    "minimo": 3,
+    "eta": 3,
+    "threads": 1,
+}
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS estudos (
+    nome TEXT PRIMARY KEY, criado_em TEXT, config TEXT, espaco TEXT, hash_dados TEXT
+);
+CREATE TABLE IF NOT EXISTS tentativas (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, estudo TEXT, numero INTEGER, parametros TEXT, status TEXT,
+    val_loss REAL, epocas INTEGER, segundos REAL, iniciada_em TEXT, concluida_em TEXT, diretorio TEXT, erro TEXT,
+    UNIQUE (estudo, numero)
+);
+CREATE TABLE IF NOT EXISTS intermediarios (
+    tentativa INTEGER, epoca INTEGER, val_loss REAL, PRIMARY KEY (tentativa, epoca)
+);
+"""
+
+
+@contextmanager
+def conectar(banco):
+    """Transação no banco dos estudos, fechada ao sair (WAL: os processos do pool leem enquanto outros escrevem)."""
+    os.makedirs(os.path.dirname(banco) or ".", exist_ok=True)
+    conexao = sqlite3.connect(banco, timeout=60)
+    try:
+        conexao.execute("PRAGMA journal_mode=WAL")
+        conexao.executescript(ESQUEMA)
+        with conexao:
+            yield conexao
+    finally:
+        conexao.close()
+
+
+def _agora():
+    return time.strftime("%Y-%m-%dT%H:%M:%S")
+
+
+def sortear(semente, vistos):
+    """Combinação aleatória de ``ESPACO`` ainda não vista (None se o espaço acabou)."""
+    gerador = random.Random(semente)
+    total = int(np.prod([len(valores) for valores in ESPACO.values()]))
+    for _ in range(10 * total):
+        parametros = {nome: gerador.choice(valores) for nome, valores in ESPACO.items()}
+        if json.dumps(parametros, sort_keys=True) not in vistos:
+            return parametros
+    return None
+
+
+def deve_podar(conexao, tentativa, epoca, config):
+    """Regra de poda de ``config["poda"]`` para ``tentativa`` ao fim de ``epoca`` (1, 2, ...)."""
+    if config["poda"] == "nenhuma" or epoca < config["aquecimento"]:
+        return False
+    estudo = conexao.execute("SELECT estudo FROM tentativas WHERE id = ?", (tentativa,)).fetchone()[0]
+    # Melhor loss de cada tentativa até ``epoca``, entre as que já chegaram a essa época
+    linhas = conexao.execute("""
+        SELECT i.tentativa, MIN(i.val_loss) FROM intermediarios i JOIN tentativas t ON t.id = i.tentativa
+        WHERE t.estudo = ? AND i.epoca <= ? GROUP BY i.tentativa HAVING MAX(i.epoca) >= ?
+    """, (estudo, epoca, epoca)).fetchall()
+    melhores = {tentativa_: valor for tentativa_, valor in linhas}
+    atual = melhores.pop(tentativa, None)
+    if atual is None:
+        return False
+    if config["poda"] == "mediana":
+        return len(melhores) >= config["minimo"] and atual > float(np.median(list(melhores.values())))
+
+    eta = config["eta"]
+    degrau = config["aquecimento"]
+    while degrau < epoca:
+        degrau *= eta
+    if degrau != epoca or len(melhores) + 1 < eta:
+        return False  # Fora de um degrau, ou poucas tentativas no degrau para comparar
+    posicao = sum(valor < atual for valor in melhores.values())
+    return posicao >= max(1, (len(melhores) + 1) // eta)
+
+
+def callback_poda(banco, tentativa, config):
+    """Callback do Keras que grava o loss de validação de cada época no estudo e para o treino se for podado."""
+    from tensorflow.keras.callbacks import Callback
+
+    class Poda(Callback):
+        def __init__(self):
+            super().__init__()
+            self.podada = False
+
+        def on_epoch_end(self, epoca, logs=None):
+            with conectar(banco) as conexao:
+                conexao.execute("INSERT OR REPLACE INTO intermediarios VALUES (?, ?, ?)",
+                                (tentativa, epoca + 1, float(logs["val_loss"])))
+            with conectar(banco) as conexao:  # Já com o loss gravado, visível para as outras tentativas
+                if deve_podar(conexao, tentativa, epoca + 1, config):
+                    self.podada = True
+                    self.model.stop_training = True
+
+    return Poda()
+
+
+def executar_tentativa(banco, tentativa, parametros, precos, config):
+    """Treina uma tentativa; roda dentro de um processo do pool. Devolve o registro gravado no estudo."""
+    from brent import modelo_lstm
+    from brent.pipeline_lstm import configurar_threads
+
+    configurar_threads(config["threads"], 1)
+    with conectar(banco) as conexao:
+        conexao.execute("UPDATE tentativas SET status = 'executando', iniciada_em = ? WHERE id = ?", (_agora(), tentativa))
+        numero = conexao.execute("SELECT numero FROM tentativas WHERE id = ?", (tentativa,)).fetchone()[0]
+    inicio = time.perf_counter()
+    registro = {"id": tentativa, "numero": numero, "status": "concluida", "val_loss": None, "epocas": 0, "diretorio": None, "erro": None}
+    try:
+        poda = callback_poda(banco, tentativa, config)
+        arquitetura = {nome: parametros[nome] for nome in ARQUITETURA_PADRAO}
+        artefato = modelo_lstm.treinar(precos, parametros["janela"], config["epochs"], parametros["batch_size"],
+                                       arquitetura=arquitetura, callbacks_extras=[poda])
+        registro.update({"val_loss": artefato.metadados["val_loss_melhor"],
+                         "epocas": artefato.metadados["epocas_treinadas"]})
+        if poda.podada:
+            registro["status"] = "podada"
+        else:
+            # O modelo concluído fica guardado para ser promovido sem retreinar
+            destino = os.path.join(os.path.dirname(banco), f"t{tentativa:05d}")
+            os.makedirs(destino, exist_ok=True)
+            artefato.modelo.save(os.path.join(destino, modelo_lstm.ARQUIVO_MODELO))
+            with open(os.path.join(destino, modelo_lstm.ARQUIVO_ARTEFATO), "w", encoding="utf-8") as arquivo:
+                json.dump(artefato.metadados, arquivo, ensure_ascii=False, indent=2)
+            registro["diretorio"] = destino
+    except Exception as erro:  # noqa: BLE001 - uma tentativa que falha não derruba a busca
+        registro.update({"status": "falhou", "erro": f"{type(erro).__name__}: {erro}"})
+    registro["segundos"] = time.perf_counter() - inicio
+    with conectar(banco) as conexao:
+        conexao.execute("""
+            UPDATE tentativas SET status = ?, val_loss = ?, epocas = ?, segundos = ?, concluida_em = ?, diretorio = ?,
+            erro = ? WHERE id = ?
+        """, (registro["status"], registro["val_loss"], registro["epocas"], registro["segundos"], _agora(),
+              registro["diretorio"], registro["erro"], tentativa))
+    return registro
+
+
+def criar_tentativas(banco, estudo, quantidade, semente=0):
+    """Reserva ``quantidade`` novas tentativas no estudo (a primeira de um estudo novo é ``PADRAO``)."""
+    with conectar(banco) as conexao:
+        existentes = conexao.execute("SELECT numero, parametros FROM tentativas WHERE estudo = ?", (estudo,)).fetchall()
+        vistos = {json.dumps(json.loads(parametros), sort_keys=True) for _, parametros in existentes}
+        numero = max((n for n, _ in existentes), default=-1) + 1
+        novas = []
+        for _ in range(quantidade):
+            parametros = dict(PADRAO) if numero == 0 else sortear(semente + numero, vistos)
+            if parametros is None:
+                break
+            vistos.add(json.dumps(parametros, sort_keys=True))
+            cursor = conexao.execute("INSERT INTO tentativas (estudo, numero, parametros, status) VALUES (?, ?, ?, ?)",
+                                     (estudo, numero, json.dumps(parametros), "pendente"))
+            novas.append((cursor.lastrowid, parametros))
+            numero += 1
+    return novas
+
+
+def buscar(precos, tentativas=20, estudo="lstm", config=None, processos=None, banco=None, semente=0,
+           hash_dados=None, progresso=None):
+    """Roda ``tentativas`` novas tentativas do estudo em paralelo e devolve a tabela de todas as tentativas.
+
+    Tentativas que ficaram ``pendente`` ou ``executando`` (busca interrompida)
+    são refeitas. ``progresso(fracao, mensagem, melhor=...)`` é chamado a cada
+    tentativa concluída.
+    """
+    config = {**CONFIG_PADRAO, **(config or {})}
+    if config["poda"] not in PODAS:
+        raise ValueError(f"Poda desconhecida: {config['poda']!r} (use uma de {list(PODAS)})")
+    banco = banco or os.path.join(DIRETORIO_BUSCA, ARQUIVO_ESTUDOS)
+    precos = np.asarray(precos, dtype=float)
+    with conectar(banco) as conexao:
+        conexao.execute("INSERT OR IGNORE INTO estudos VALUES (?, ?, ?, ?, ?)",
+                        (estudo, _agora(), json.dumps(config), json.dumps(ESPACO), hash_dados))
+        hash_estudo = conexao.execute("SELECT hash_dados FROM estudos WHERE nome = ?", (estudo,)).fetchone()[0]
+        if hash_dados and hash_estudo and hash_estudo != hash_dados:
+            raise ValueError(f"O estudo {estudo!r} foi criado com outros dados; use outro --estudo.")
+        interrompidas = conexao.execute("""
+            SELECT id, parametros FROM tentativas WHERE estudo = ? AND status IN ('pendente', 'executando')
+        """, (estudo,)).fetchall()
+        conexao.executemany("DELETE FROM intermediarios WHERE tentativa = ?", [(id_,) for id_, _ in interrompidas])
+    fila = [(id_, json.loads(parametros)) for id_, parametros in interrompidas]
+    fila += criar_tentativas(banco, estudo, tentativas, semente)
+
+    processos = processos or processos_padrao(len(fila))
+    concluidas, melhor = 0, None
+    # Os processos nascem com o limite de threads (o ambiente deste processo não muda); cada tentativa ainda o
+    # fixa no TensorFlow
+    with criar_pool(processos, threads=config["threads"]) as pool:
+        futuros = [pool.submit(executar_tentativa, banco, id_, parametros, precos, config) for id_, parametros in fila]
+        for futuro in as_completed(futuros):
+            registro = futuro.result()
+            concluidas += 1
+            if registro["status"] == "concluida" and (melhor is None or registro["val_loss"] < melhor):
+                melhor = registro["val_loss"]
+            if progresso:
+                progresso(concluidas / len(fila), f"{concluidas}/{len(fila)} tentativas; tentativa {registro['numero']}: "
+                          f"{registro['status']}", melhor=melhor)
+    return tabela(banco, estudo)
+
+
+def tabela(banco, estudo):
+    """Tentativas do estudo (parâmetros em colunas), da melhor para a pior."""
+    import pandas as pd
+
+    with conectar(banco) as conexao:
+        df = pd.read_sql_query("SELECT * FROM tentativas WHERE estudo = ? ORDER BY numero", conexao, params=(estudo,))
+    parametros = pd.DataFrame([json.loads(p) for p in df["parametros"]], index=df.index)
+    return pd.concat([df.drop(columns="parametros"), parametros], axis=1).sort_values(
+        "val_loss", na_position="last").reset_index(drop=True)
+
+
+def melhor_tentativa(banco, estudo):
+    """Tentativa concluída com o menor loss de validação (None se não houver)."""
+    with conectar(banco) as conexao:
+        linha = conexao.execute("""
+            SELECT id, numero, parametros, val_loss, diretorio FROM tentativas
+            WHERE estudo = ? AND status = 'concluida' AND diretorio IS NOT NULL ORDER BY val_loss LIMIT 1
+        """, (estudo,)).fetchone()
+    if linha is None:
+        return None
+    id_, numero, parametros, val_loss, diretorio = linha
+    return {"id": id_, "numero": numero, "parametros": json.loads(parametros), "val_loss": val_loss,
+            "diretorio": diretorio}
+
+
+def promover(banco, estudo, metadados_extras=None, diretorio=DIRETORIO_ARTEFATOS):
+    """Grava o modelo da melhor tentativa como nova versão do artefato do LSTM; devolve o diretório criado."""
+    from tensorflow.keras.models import load_model
+
+    from brent import modelo_lstm
+
+    melhor = melhor_tentativa(banco, estudo)
+    if melhor is None:
+        raise RuntimeError(f"O estudo {estudo!r} não tem tentativas concluídas para promover.")
+    with open(os.path.join(melhor["diretorio"], modelo_lstm.ARQUIVO_ARTEFATO), encoding="utf-8") as arquivo:
+        metadados = json.load(arquivo)
+    artefato = modelo_lstm.ArtefatoLSTM(load_model(os.path.join(melhor["diretorio"], modelo_lstm.ARQUIVO_MODELO)),
+                                        modelo_lstm.scaler_de_parametros(metadados["scaler"]),
+                                        metadados["janela_temporal"], metadados)
+    busca = {"estudo": estudo, "tentativa": melhor["numero"], "val_loss": melhor["val_loss"],
+             "parametros": melhor["parametros"]}
+    return modelo_lstm.salvar_artefato(artefato, {**(metadados_extras or {}), "busca": busca}, diretorio)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Busca de hiperparâmetros do LSTM em paralelo, com poda.")
+    parser.add_argument("--tentativas", type=int, default=20, help="novas tentativas nesta execução")
+    parser.add_argument("--estudo", default="lstm", help="nome do estudo no banco (continua se já existir)")
+    parser.add_argument("--processos", type=int, help="processos do pool (padrão: núcleos disponíveis)")
+    parser.add_argument("--threads", type=int, default=CONFIG_PADRAO["threads"], help="threads por processo")
+    parser.add_argument("--poda", choices=PODAS, default=CONFIG_PADRAO["poda"])
+    parser.add_argument("--aquecimento", type=int, default=CONFIG_PADRAO["aquecimento"],
+                        help="épocas antes da primeira poda (no halving, o primeiro degrau)")
+    parser.add_argument("--eta", type=int, default=CONFIG_PADRAO["eta"], help="fator do successive halving")
+    parser.add_argument("--epochs", type=int, default=CONFIG_PADRAO["epochs"], help="máximo de épocas por tentativa")
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--inicio", default=PERIODO_PADRAO[0], help="data inicial do período (AAAA-MM-DD)")
+    parser.add_argument("--fim", default=PERIODO_PADRAO[1], help="data final do período (AAAA-MM-DD)")
+    parser.add_argument("--banco", default=os.path.join(DIRETORIO_BUSCA, ARQUIVO_ESTUDOS))
+    parser.add_argument("--promover", action="store_true", help="grava a melhor tentativa como nova versão servida")
+    parser.add_argument("--parquet", default=os.path.join(RAIZ, "ipea_brent_20250217.parquet"))
+    args = parser.parse_args()
+
+    import pandas as pd
+
+    from brent.cache import hash_dataframe
+
+    df = pd.read_parquet(args.parquet)
+    df_periodo = df[(df["data"] >= pd.to_datetime(args.inicio)) & (df["data"] <= pd.to_datetime(args.fim))]
+    hash_dados = hash_dataframe(df_periodo[["data", "preco"]])
+    config = {"epochs": args.epochs, "poda": args.poda, "aquecimento": args.aquecimento, "eta": args.eta,
+              "threads": args.threads}
+
+    inicio = time.perf_counter()
+    resultado = buscar(df_periodo["preco"].values, args.tentativas, args.estudo, config, args.processos, args.banco,
+                       args.semente, hash_dados, progresso=lambda fracao, mensagem, **_: print(mensagem, flush=True))
+    parede = time.perf_counter() - inicio
+    colunas = ["numero", "status", "val_loss", "epocas", "segundos"] + list(ESPACO)
+    print(resultado[colunas].to_string(index=False))
+    contagem = resultado["status"].value_counts().to_dict()
+    print(f"\nEstudo {args.estudo!r} em {args.banco}: {len(resultado)} tentativas ({contagem}); "
+          f"{parede:.0f} s de parede, {resultado['segundos'].sum():.0f} s somando as tentativas.")
+
+    if args.promover:
+        destino = promover(args.banco, args.estudo, {"periodo": [args.inicio, args.fim], "hash_dados": hash_dados})
+        print(f"Melhor tentativa promovida: {destino}")
+
+
+if __name__ == "__main__":
+    main()
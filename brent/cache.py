@@ -0,0 +1,238 @@
+"""Cache em disco endereçado por conteúdo para modelos ajustados e previsões.
+
+Cada entrada é um diretório ``<raiz>/<nome>/<chave>/`` com os arquivos do
+artefato e um ``metadados.json``. A chave é um hash SHA-256 dos dados de treino
+e dos hiperparâmetros, de forma que dados ou configurações diferentes nunca
+colidem. O despejo (eviction) é LRU, limitado por número de entradas e por
+tamanho total em disco. Quando o parquet de origem muda, ``sincronizar_origem``
+descarta as entradas geradas a partir da versão anterior (todas, ou só as que
+o chamador não reconhece como ainda válidas).
+
+A raiz padrão é ``.cache/`` na raiz do repositório e pode ser trocada pela
+variável de ambiente ``BRENT_CACHE_DIR``.
+
+Uso pela linha de comando:
+    python -m brent.cache --listar
+    python -m brent.cache --limpar [nome]
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+RAIZ_PADRAO = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache")
+ARQUIVO_METADADOS = "metadados.json"
+ARQUIVO_ORIGEM = "origem.txt"
+
+
+def diretorio_raiz():
+    """Diretório raiz de todos os caches (``BRENT_CACHE_DIR`` ou ``.cache/``)."""
+    return os.environ.get("BRENT_CACHE_DIR", RAIZ_PADRAO)
+
+
+def calcular_chave(*partes):
+    """Hash SHA-256 de uma sequência de partes (bytes, str ou objetos JSON)."""
+    h = hashlib.sha256()
+    for parte in partes:
+        if isinstance(parte, bytes):
+            dados = parte
+        elif isinstance(parte, str):
+            dados = parte.encode("utf-8")
+        else:
+            dados = json.dumps(parte, sort_keys=True, default=str).encode("utf-8")
+        # Prefixo com o tamanho para que ("ab", "c") e ("a", "bc") não colidam
+        h.update(len(dados).to_bytes(8, "little"))
+        h.update(dados)
+    return h.hexdigest()
+
+
+def hash_dataframe(df):
+    """Hash estável do conteúdo de um DataFrame (valores e nomes de colunas, sem o índice)."""
+    import pandas as pd
+
+    valores = pd.util.hash_pandas_object(df, index=False).values
+    return calcular_chave(list(map(str, df.columns)), valores.tobytes())
+
+
+class CacheDisco:
+    """Cache LRU em disco de artefatos (um diretório por chave)."""
+
+    def __init__(self, nome, max_entradas=20, max_bytes=512 * 1024 ** 2, raiz=None):
+        self.nome = nome
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self.diretorio = os.path.join(raiz or diretorio_raiz(), nome)
+
+    def caminho(self, chave):
+        return os.path.join(self.diretorio, chave)
+
+    def obter(self, chave):
+        """Devolve o diretório da entrada, ou None se não existir.
+
+        A data de modificação dos metadados é atualizada a cada acesso e serve de
+        relógio para o despejo LRU.
+        """
+        metadados = os.path.join(self.caminho(chave), ARQUIVO_METADADOS)
+        if not os.path.exists(metadados):
+            return None
+        os.utime(metadados)
+        return self.caminho(chave)
+
+    def metadados(self, chave):
+        with open(os.path.join(self.caminho(chave), ARQUIVO_METADADOS), encoding="utf-8") as arquivo:
+            return json.load(arquivo)
+
+    def gravar(self, chave, escrever, metadados=None):
+        """Grava uma entrada de forma atômica e aplica a política de despejo.
+
+        ``escrever(diretorio)`` recebe um diretório temporário e deve salvar nele
+        os arquivos do artefato. Só depois de completo ele é renomeado para o
+        destino final, então leitores concorrentes nunca veem entradas pela metade.
+        """
+        os.makedirs(self.diretorio, exist_ok=True)
+        temporario = tempfile.mkdtemp(prefix=".tmp-", dir=self.diretorio)
+        try:
+            escrever(temporario)
+            dados = {"chave": chave, "criado_em": time.time(), "origem": self._origem_atual()}
+            dados.update(metadados or {})
+            with open(os.path.join(temporario, ARQUIVO_METADADOS), "w", encoding="utf-8") as arquivo:
+                json.dump(dados, arquivo, ensure_ascii=False, indent=2, default=str)
+            destino = self.caminho(chave)
+            if os.path.exists(destino):
+                shutil.rmtree(destino, ignore_errors=True)
+            try:
+                os.replace(temporario, destino)
+            except OSError:
+                # Outro processo gravou a mesma chave ao mesmo tempo: o conteúdo é o mesmo
+                if not os.path.exists(destino):
+                    raise
+        finally:
+            shutil.rmtree(temporario, ignore_errors=True)
+        self.despejar()
+        return self.caminho(chave)
+
+    def entradas(self):
+        """Lista (chave, último acesso, bytes) das entradas, da mais antiga para a mais recente."""
+        if not os.path.isdir(self.diretorio):
+            return []
+        resultado = []
+        for chave in os.listdir(self.diretorio):
+            metadados = os.path.join(self.diretorio, chave, ARQUIVO_METADADOS)
+            if chave.startswith(".") or not os.path.exists(metadados):
+                continue
+            tamanho = sum(
+                os.path.getsize(os.path.join(pasta, f))
+                for pasta, _, arquivos in os.walk(os.path.join(self.diretorio, chave))
+                for f in arquivos
+            )
+            resultado.append((chave, os.path.getmtime(metadados), tamanho))
+        return sorted(resultado, key=lambda entrada: entrada[1])
+
+    def despejar(self):
+        """Remove as entradas menos usadas até respeitar os limites de quantidade e tamanho."""
+        entradas = self.entradas()
+        total = sum(tamanho for _, _, tamanho in entradas)
+        while entradas and (len(entradas) > self.max_entradas or total > self.max_bytes):
+            chave, _, tamanho = entradas.pop(0)
+            shutil.rmtree(self.caminho(chave), ignore_errors=True)
+            total -= tamanho
+
+    def limpar(self):
+        shutil.rmtree(self.diretorio, ignore_errors=True)
+
+    def _origem_atual(self):
+        try:
+            with open(os.path.join(self.diretorio, ARQUIVO_ORIGEM), encoding="utf-8") as arquivo:
+                return arquivo.read().strip()
+        except FileNotFoundError:
+            return None
+
+    def sincronizar_origem(self, origem, limpar=True, manter=None):
+        """Invalida o cache se os dados de origem (ex.: o parquet) mudaram.
+
+        ``origem`` é uma impressão digital dos dados completos, como
+        ``hash_dataframe(df)``. Devolve True quando houve invalidação. Com
+        ``manter(metadados)``, só as entradas para as quais ele devolve False
+        são descartadas (ex.: modelos cujo treino não faz mais parte dos
+        dados); sem ele, o cache inteiro. Com ``limpar=False`` só registra a
+        nova origem e mantém todas as entradas.
+        """
+        atual = self._origem_atual()
+        if atual == origem:
+            return False
+        if atual is not None and limpar:
+            if manter is None:
+                self.limpar()
+            else:
+                for chave, _, _ in self.entradas():
+                    if not manter(self.metadados(chave)):
+                        shutil.rmtree(self.caminho(chave), ignore_errors=True)
+        os.makedirs(self.diretorio, exist_ok=True)
+        with open(os.path.join(self.diretorio, ARQUIVO_ORIGEM), "w", encoding="utf-8") as arquivo:
+            arquivo.write(origem)
+        return atual is not None and limpar
+
+
+class CacheMemoria:
+    """Cache LRU em memória e seguro entre threads (cada sessão do Streamlit roda em uma thread).
+
+    Usado para resultados baratos de guardar mas caros de recalcular a cada
+    rerun, como figuras renderizadas e séries reduzidas.
+    """
+
+    def __init__(self, max_entradas=128):
+        self.max_entradas = max_entradas
+        self._itens = OrderedDict()
+        self._trava = threading.Lock()
+
+    def obter_ou_calcular(self, chave, calcular):
+        with self._trava:
+            if chave in self._itens:
+                self._itens.move_to_end(chave)
+                return self._itens[chave]
+        # Calcula fora da trava para não bloquear as outras sessões
+        valor = calcular()
+        with self._trava:
+            self._itens[chave] = valor
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_entradas:
+                self._itens.popitem(last=False)
+        return valor
+
+    def __contains__(self, chave):
+        with self._trava:
+            return chave in self._itens
+
+    def __len__(self):
+        return len(self._itens)
+
+    def limpar(self):
+        with self._trava:
+            self._itens.clear()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gerencia o cache em disco de modelos do app.")
+    parser.add_argument("--listar", action="store_true", help="lista as entradas de cada cache")
+    parser.add_argument("--limpar", nargs="?", const="", metavar="NOME", help="apaga um cache (ou todos)")
+    args = parser.parse_args()
+
+    raiz = diretorio_raiz()
+    nomes = sorted(os.listdir(raiz)) if os.path.isdir(raiz) else []
+    if args.limpar is not None:
+        for nome in nomes if args.limpar == "" else [args.limpar]:
+            CacheDisco(nome).limpar()
+            print(f"Cache '{nome}' apagado.")
+    else:
+        for nome in nomes:
+            entradas = CacheDisco(nome).entradas()
+            print(f"{nome}: {len(entradas)} entradas, {sum(e[2] for e in entradas) / 1024 ** 2:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
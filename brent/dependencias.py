@@ -0,0 +1,79 @@
+"""Carregamento preguiçoso (lazy) das dependências pesadas de cada página.
+
+TensorFlow, Prophet, statsmodels, scikit-learn e scipy custam segundos e
+centenas de MB para importar. Cada página do app declara aqui apenas os
+símbolos de que precisa, e eles só são importados quando a página é exibida.
+Como o Python guarda os módulos em ``sys.modules``, os reruns seguintes não
+pagam o custo novamente.
+
+Dentro da página, cada símbolo só é importado no primeiro acesso: uma página
+de modelo que exibe o snapshot das previsões (``brent.snapshot``) não importa
+o TensorFlow nem o Prophet.
+"""
+import importlib
+from functools import lru_cache
+
+# Nome usado no app -> (módulo, atributo). Atributo None devolve o próprio módulo.
+SIMBOLOS = {
+    "plt": ("matplotlib.pyplot", None),
+    "Figure": ("matplotlib.figure", "Figure"),
+    "make_interp_spline": ("scipy.interpolate", "make_interp_spline"),
+    "adfuller": ("statsmodels.tsa.stattools", "adfuller"),
+    "seasonal_decompose": ("statsmodels.tsa.seasonal", "seasonal_decompose"),
+    "STL": ("statsmodels.tsa.seasonal", "STL"),
+    "ARIMA": ("statsmodels.tsa.arima.model", "ARIMA"),
+    "SARIMAX": ("statsmodels.tsa.statespace.sarimax", "SARIMAX"),
+    "mean_squared_error": ("sklearn.metrics", "mean_squared_error"),
+    "mean_absolute_error": ("sklearn.metrics", "mean_absolute_error"),
+    "MinMaxScaler": ("sklearn.preprocessing", "MinMaxScaler"),
+    "Prophet": ("prophet", "Prophet"),
+    "Sequential": ("tensorflow.keras.models", "Sequential"),
+    "LSTM": ("tensorflow.keras.layers", "LSTM"),
+    "Dense": ("tensorflow.keras.layers", "Dense"),
+}
+
+# Símbolos usados por cada página do menu lateral
+PAGINAS = {
+    "Brent: Histórico": ["Figure", "make_interp_spline"],
+    "Estacionariedade, Tendências e Sazonalidades": ["adfuller", "STL"],
+    "ARIMA": ["SARIMAX", "mean_squared_error", "mean_absolute_error"],
+    "Prophet": ["Prophet", "plt", "mean_squared_error", "mean_absolute_error"],
+    "LSTM": ["Sequential", "LSTM", "Dense", "MinMaxScaler", "mean_squared_error", "mean_absolute_error"],
+    "Video Explicativo": [],
+    "Sobre o Desafio": [],
+    "Sobre o Desenvolvedor": [],
+}
+
+
+@lru_cache(maxsize=None)
+def importar(nome):
+    """Importa e devolve o símbolo registrado em ``SIMBOLOS`` com esse nome."""
+    modulo, atributo = SIMBOLOS[nome]
+    objeto = importlib.import_module(modulo)
+    return objeto if atributo is None else getattr(objeto, atributo)
+
+
+class DependenciasPagina:
+    """Símbolos de uma página como atributos, importados no primeiro acesso."""
+
+    def __init__(self, nomes):
+        self._nomes = frozenset(nomes)
+
+    def __contains__(self, nome):
+        return nome in self._nomes
+
+    def __getattr__(self, nome):
+        if nome.startswith("_") or nome not in self._nomes:
+            raise AttributeError(f"{nome!r} não está entre as dependências desta página ({sorted(self._nomes)})")
+        objeto = importar(nome)
+        setattr(self, nome, objeto)  # Os próximos acessos não passam mais por __getattr__
+        return objeto
+
+
+def carregar_pagina(pagina):
+    """Dependências declaradas da página, como atributos importados sob demanda.
+
+    Ex.: ``dep = carregar_pagina("Prophet")`` e depois ``dep.Prophet()``.
+    Páginas desconhecidas não têm dependências.
+    """
+    return DependenciasPagina(PAGINAS.get(pagina, []))
@@ -0,0 +1,234 @@
+"""Testes de estacionariedade em cache: ADF, KPSS, Phillips–Perron e ADF em janela móvel.
+
+A página de estacionariedade rodava ``adfuller`` com seleção automática de
+defasagens sobre o período inteiro a cada exibição. Aqui cada teste é
+memoizado por (dados, intervalo, transformação, opções), então reruns e
+outras sessões reaproveitam o resultado.
+
+O ADF em janela móvel não roda um ``adfuller`` por passo. A regressão do ADF
+
+    Δy_t = α + γ·y_{t-1} + Σ β_i·Δy_{t-i} + e_t
+
+é montada uma vez para o período todo, e as somas acumuladas de X'X, X'y e
+y'y dão as mesmas matrizes de qualquer janela por uma subtração. Cada passo
+custa só a solução de um sistema (k + 2) × (k + 2), resolvida em lote para
+todas as janelas. A ordem de defasagem é escolhida uma única vez, por AIC,
+no período completo.
+"""
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from brent.cache import CacheMemoria
+
+# Rótulo exibido no app -> nome da transformação
+ROTULOS = {
+    "Nível": "nivel",
+    "Logaritmo": "log",
+    "Primeira diferença": "diferenca",
+    "Retorno logarítmico": "log_diferenca",
+}
+
+cache_diagnosticos = CacheMemoria(max_entradas=128)
+
+
+def transformar(precos, transformacao="nivel"):
+    """Aplica a transformação ao array de preços."""
+    precos = np.asarray(precos, dtype=np.float64)
+    if transformacao == "nivel":
+        return precos
+    if transformacao == "log":
+        return np.log(precos)
+    if transformacao == "diferenca":
+        return np.diff(precos)
+    if transformacao == "log_diferenca":
+        return np.diff(np.log(precos))
+    raise ValueError(f"Transformação desconhecida: {transformacao!r} (use uma de {sorted(ROTULOS.values())})")
+
+
+def _memoizado(teste, serie, inicio, fim, transformacao, opcoes, calcular):
+    a, b = serie.posicoes(inicio, fim)
+    chave = (teste, serie.impressao_digital, a, b, transformacao) + tuple(sorted(opcoes.items()))
+    return cache_diagnosticos.obter_ou_calcular(
+        chave, lambda: calcular(transformar(serie.precos[a:b], transformacao), **opcoes))
+
+
+def _adf(x, regressao="c", autolag="AIC"):
+    from statsmodels.tsa.stattools import adfuller
+
+    with warnings.catch_warnings():
+        # Versões novas do statsmodels avisam que o retorno vai virar um objeto; a tupla continua igual
+        warnings.simplefilter("ignore", FutureWarning)
+        estatistica, p_valor, lags, n, criticos, _ = adfuller(x, regression=regressao, autolag=autolag)
+    return {"estatistica": estatistica, "p_valor": p_valor, "lags": lags, "n": n, "criticos": criticos}
+
+
+def _kpss(x, regressao="c"):
+    from statsmodels.tsa.stattools import kpss
+
+    with warnings.catch_warnings():
+        # O p-valor é truncado na tabela (0,01 a 0,10); o aviso só repete isso
+        warnings.simplefilter("ignore")
+        estatistica, p_valor, lags, criticos = kpss(x, regression=regressao, nlags="auto")
+    return {"estatistica": estatistica, "p_valor": p_valor, "lags": lags, "n": len(x), "criticos": criticos}
+
+
+def _phillips_perron(x, regressao="c", lags=None):
+    """Estatística Z_t de Phillips–Perron (núcleo de Bartlett), com p-valor de MacKinnon."""
+    from statsmodels.tsa.adfvalues import mackinnoncrit, mackinnonp
+
+    y, y_anterior = x[1:], x[:-1]
+    n = len(y)
+    colunas = [y_anterior]
+    if regressao in ("c", "ct"):
+        colunas.append(np.ones(n))
+    if regressao == "ct":
+        colunas.append(np.arange(1, n + 1, dtype=np.float64))
+    X = np.column_stack(colunas)
+    beta, *_ = np.linalg.lstsq(X, y, rcond=None)
+    residuos = y - X @ beta
+    s2 = residuos @ residuos / (n - X.shape[1])
+    erro_rho = np.sqrt(s2 * np.linalg.inv(X.T @ X)[0, 0])
+    t_rho = (beta[0] - 1) / erro_rho
+
+    # Variância de longo prazo de Newey–West
+    if lags is None:
+        lags = int(np.ceil(12 * (n / 100) ** 0.25))
+    gamma0 = residuos @ residuos / n
+    lambda2 = gamma0
+    for j in range(1, lags + 1):
+        lambda2 += 2 * (1 - j / (lags + 1)) * (residuos[j:] @ residuos[:-j]) / n
+    estatistica = (np.sqrt(gamma0 / lambda2) * t_rho
+                   - (lambda2 - gamma0) * n * erro_rho / (2 * np.sqrt(lambda2) * np.sqrt(s2)))
+    criticos = dict(zip(["1%", "5%", "10%"], mackinnoncrit(1, regressao, n)))
+    return {"estatistica": estatistica, "p_valor": mackinnonp(estatistica, regressao, 1), "lags": lags, "n": n,
+            "criticos": criticos}
+
+
+def adf(serie, inicio=None, fim=None, transformacao="nivel", regressao="c", autolag="AIC"):
+    """Dickey–Fuller aumentado (H0: raiz unitária) sobre o intervalo, memoizado."""
+    return _memoizado("adf", serie, inicio, fim, transformacao, {"regressao": regressao, "autolag": autolag}, _adf)
+
+
+def kpss(serie, inicio=None, fim=None, transformacao="nivel", regressao="c"):
+    """KPSS (H0: estacionária) sobre o intervalo, memoizado."""
+    return _memoizado("kpss", serie, inicio, fim, transformacao, {"regressao": regressao}, _kpss)
+
+
+def phillips_perron(serie, inicio=None, fim=None, transformacao="nivel", regressao="c"):
+    """Phillips–Perron (H0: raiz unitária) sobre o intervalo, memoizado."""
+    return _memoizado("pp", serie, inicio, fim, transformacao, {"regressao": regressao}, _phillips_perron)
+
+
+def tabela_testes(serie, inicio=None, fim=None, transformacao="nivel"):
+    """Resumo dos três testes em um DataFrame (uma linha por teste)."""
+    resultados = {
+        "ADF": (adf(serie, inicio, fim, transformacao), "raiz unitária"),
+        "KPSS": (kpss(serie, inicio, fim, transformacao), "estacionária"),
+        "Phillips–Perron": (phillips_perron(serie, inicio, fim, transformacao), "raiz unitária"),
+    }
+    linhas = []
+    for nome, (r, h0) in resultados.items():
+        estacionaria = r["p_valor"] < 0.05 if h0 == "raiz unitária" else r["p_valor"] >= 0.05
+        linhas.append({"Teste": nome, "H0": h0, "Estatística": r["estatistica"], "p-valor": r["p_valor"],
+                       "Defasagens": r["lags"], "Estacionária (5%)": "Sim" if estacionaria else "Não"})
+    return pd.DataFrame(linhas).set_index("Teste")
+
+
+def _regressao_adf(x, lags, regressao="c"):
+    """Matriz X e alvo Δy da regressão do ADF com ``lags`` defasagens fixas."""
+    dx = np.diff(x)
+    n = len(dx) - lags
+    colunas = [x[lags:-1]]
+    if regressao in ("c", "ct"):
+        colunas.append(np.ones(n))
+    if regressao == "ct":
+        colunas.append(np.arange(1, n + 1, dtype=np.float64))
+    colunas += [dx[lags - i:len(dx) - i] for i in range(1, lags + 1)]
+    return np.column_stack(colunas), dx[lags:]
+
+
+# Aproximação de MacKinnon (1994) para a distribuição de τ com N = 1 (Dickey–Fuller): limites da
+# estatística, ponto de troca τ* e coeficientes (grau crescente) dos polinômios em τ usados abaixo e
+# acima de τ*, cujo valor passa pela normal padrão. Mesmos números de ``statsmodels.tsa.adfvalues``.
+# MacKinnon, J. G. (1994). "Approximate Asymptotic Distribution Functions for Unit-Root and
+# Cointegration Tests". Journal of Business & Economic Statistics, 12(2), 167-176.
+MACKINNON_TAU = {
+    # regressão: (τ mínimo, τ máximo, τ*, polinômio para τ <= τ*, polinômio para τ > τ*)
+    "n": (-19.04, np.inf, -1.04, (0.6344, 1.2378, 3.2496e-2), (0.4797, 0.93557, -0.06999, 3.3066e-2)),
+    "c": (-18.83, 2.74, -1.61, (2.1659, 1.4412, 3.8269e-2), (1.7339, 0.93202, -0.12745, -1.0368e-2)),
+    "ct": (-16.18, 0.7, -2.89, (3.2512, 1.6047, 4.9588e-2), (2.5261, 0.61654, -0.37956, -6.0285e-2)),
+}
+
+
+def p_valores_mackinnon(estatisticas, regressao="c"):
+    """``mackinnonp`` vetorizado (N = 1): uma chamada de ``norm.cdf`` para todas as estatísticas."""
+    from scipy.stats import norm
+
+    minimo, maximo, troca, pequenos, grandes = MACKINNON_TAU[regressao]
+    estatisticas = np.asarray(estatisticas, dtype=np.float64)
+    z = np.where(estatisticas <= troca,
+                 np.polynomial.polynomial.polyval(estatisticas, pequenos),
+                 np.polynomial.polynomial.polyval(estatisticas, grandes))
+    p_valores = norm.cdf(z)
+    p_valores[estatisticas > maximo] = 1.0
+    p_valores[estatisticas < minimo] = 0.0
+    return p_valores
+
+
+def adf_janelas(x, janela, passo=1, lags=0, regressao="c"):
+    """Estatística ADF e p-valor de cada janela de ``janela`` observações, avançando ``passo``.
+
+    Devolve ``(fins, estatisticas, p_valores)``, em que ``fins[i]`` é a posição
+    (em ``x``) da última observação da janela i. Usa somas acumuladas de X'X,
+    então o custo não cresce com o tamanho da janela.
+    """
+    if regressao == "ct":
+        raise ValueError("A janela móvel não suporta tendência determinística ('ct'); use 'c' ou 'n'.")
+    x = np.asarray(x, dtype=np.float64)
+    if regressao == "c":
+        # Com constante, γ e seu erro não mudam ao deslocar o nível; centrar reduz o cancelamento nas somas
+        x = x - x.mean()
+    X, y = _regressao_adf(x, lags, regressao)
+    linhas = janela - lags - 1  # Linhas da regressão dentro de uma janela de ``janela`` observações
+    p = X.shape[1]
+    if linhas <= p or len(y) < linhas:
+        return np.arange(0), np.array([]), np.array([])
+
+    zeros = np.zeros((1, p, p))
+    xtx = np.concatenate([zeros, np.cumsum(X[:, :, None] * X[:, None, :], axis=0)])
+    xty = np.concatenate([np.zeros((1, p)), np.cumsum(X * y[:, None], axis=0)])
+    yty = np.concatenate([[0.0], np.cumsum(y * y)])
+
+    inicios = np.arange(0, len(y) - linhas + 1, passo)
+    fins = inicios + linhas
+    A = xtx[fins] - xtx[inicios]
+    c = xty[fins] - xty[inicios]
+    beta = np.linalg.solve(A, c[:, :, None])[:, :, 0]
+    ssr = (yty[fins] - yty[inicios]) - np.einsum("ij,ij->i", beta, c)
+    inversa = np.linalg.inv(A)
+    erro = np.sqrt(ssr / (linhas - p) * inversa[:, 0, 0])
+    estatisticas = beta[:, 0] / erro
+    p_valores = p_valores_mackinnon(estatisticas, regressao)
+    # A linha r da regressão corresponde à observação x[r + lags + 1]
+    return fins + lags, estatisticas, p_valores
+
+
+def adf_movel(serie, inicio=None, fim=None, janela=252, passo=5, transformacao="nivel", regressao="c"):
+    """ADF em janela móvel sobre o intervalo, como DataFrame (data final da janela, estatística, p-valor).
+
+    A ordem de defasagem é a escolhida por AIC no intervalo completo (``adf``).
+    """
+    a, b = serie.posicoes(inicio, fim)
+
+    def calcular():
+        x = transformar(serie.precos[a:b], transformacao)
+        lags = adf(serie, inicio, fim, transformacao, regressao)["lags"]
+        fins, estatisticas, p_valores = adf_janelas(x, janela, passo, lags, regressao)
+        deslocamento = len(serie.precos[a:b]) - len(x)  # Transformações com diferença perdem a 1ª data
+        datas = serie.datas[a:b][fins + deslocamento]
+        return pd.DataFrame({"data": datas, "estatistica": estatisticas, "p_valor": p_valores})
+
+    chave = ("adf_movel", serie.impressao_digital, a, b, janela, passo, transformacao, regressao)
+    return cache_diagnosticos.obter_ou_calcular(chave, calcular)
@@ -0,0 +1,112 @@
+"""Figuras da página Histórico renderizadas uma vez e servidas como PNG.
+
+Antes, cada rerun criava figuras novas com ``plt.subplots``, rasterizava com
+``st.pyplot`` e nunca as fechava, acumulando memória no registro global do
+pyplot. Aqui as figuras são criadas com a API orientada a objetos
+(``matplotlib.figure.Figure``, fora do registro do pyplot), convertidas em
+bytes PNG e descartadas explicitamente. Os bytes ficam em um cache LRU com
+chave (gráfico, dados, ano inicial, ano final, opções), então trocar de
+página e voltar, ou outra sessão pedir o mesmo intervalo, não redesenha nada.
+"""
+import io
+from contextlib import contextmanager
+
+import numpy as np
+
+from brent.cache import CacheMemoria
+
+# Estilo dos gráficos matplotlib do app
+ESTILO_GRAFICOS = {
+    "font.size": 14,
+    "axes.labelsize": 16,
+    "axes.titlesize": 18,
+    "xtick.labelsize": 14,
+    "ytick.labelsize": 14,
+    "legend.fontsize": 14,
+    "axes.spines.top": False,
+    "axes.spines.right": False,
+    "axes.grid": False,
+    "grid.alpha": 0.3,
+}
+
+TAMANHO_FIGURA = (12, 6)
+DPI = 100
+
+cache_figuras = CacheMemoria(max_entradas=64)
+
+
+@contextmanager
+def figura(figsize=TAMANHO_FIGURA):
+    """Cria uma figura fora do registro do pyplot e garante que ela seja liberada ao final."""
+    import matplotlib
+    from matplotlib.figure import Figure
+
+    with matplotlib.rc_context(ESTILO_GRAFICOS):
+        fig = Figure(figsize=figsize, dpi=DPI)
+        try:
+            yield fig
+        finally:
+            fig.clear()
+
+
+def para_png(fig):
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", bbox_inches="tight")
+    return buffer.getvalue()
+
+
+def _em_cache(nome, serie, args, desenhar):
+    return cache_figuras.obter_ou_calcular((nome, serie.impressao_digital) + args, desenhar)
+
+
+def png_boxplot(serie, ano_inicial, ano_final, destaque_anos=(), cor_primaria="#3366CC", cor_destaque="#FF7F0E"):
+    """Boxplot anual do preço (PNG), desenhado das estatísticas pré-calculadas por ano."""
+    from brent.resumo_anual import desenhar_boxplot
+
+    destaque = tuple(sorted(destaque_anos))
+
+    def desenhar():
+        estatisticas = serie.resumo_anual.estatisticas_boxplot(ano_inicial, ano_final)
+        cores = [cor_destaque if int(e["label"]) in destaque else cor_primaria for e in estatisticas]
+        with figura() as fig:
+            ax = fig.subplots()
+            desenhar_boxplot(ax, estatisticas, cores)
+            ax.tick_params(axis="x", labelrotation=45)
+            ax.set_xlabel(" ")
+            ax.set_ylabel(" ")
+            ax.set_title("Boxplot do preço do barril de Brent (US$)", fontsize=18, fontweight="bold")
+            return para_png(fig)
+
+    return _em_cache("boxplot", serie, (ano_inicial, ano_final, destaque, cor_primaria, cor_destaque), desenhar)
+
+
+def png_serie_temporal(serie, ano_inicial, ano_final, cor_primaria="#3366CC", cor_max="#D62728", cor_min="#2CA02C",
+                       suavizador="spline"):
+    """Linha suavizada do preço no período, com máximo e mínimo destacados (PNG)."""
+
+    def desenhar():
+        from brent.suavizacao import suavizar
+
+        inicio, fim = f"{ano_inicial}-01-01", f"{ano_final}-12-31"
+        periodo = serie.intervalo(inicio, fim)
+        datas, precos = periodo.datas, periodo.precos
+        max_idx, min_idx = int(np.argmax(precos)), int(np.argmin(precos))
+        max_val, min_val = precos[max_idx], precos[min_idx]
+
+        # Linha suavizada sobre médias semanais/mensais, com custo limitado pela saída (brent/suavizacao.py)
+        x_smooth, y_smooth = suavizar(serie, inicio, fim, suavizador)
+
+        with figura() as fig:
+            ax = fig.subplots()
+            ax.plot(x_smooth, y_smooth, color=cor_primaria, linewidth=2, alpha=0.9)
+            ax.scatter(datas[max_idx], max_val, color=cor_max, s=100, label="Máximo")
+            ax.scatter(datas[min_idx], min_val, color=cor_min, s=100, label="Mínimo")
+            ax.text(datas[max_idx], max_val, f"{max_val:.2f}", fontsize=12, verticalalignment='bottom', horizontalalignment='left', color=cor_max, fontweight='bold')
+            ax.text(datas[min_idx], min_val, f"{min_val:.2f}", fontsize=12, verticalalignment='top', horizontalalignment='left', color=cor_min, fontweight='bold')
+            ax.set_xlabel("")
+            ax.set_ylabel("")
+            ax.set_title('Série Temporal do Preço do Brent em US$', fontsize=18, fontweight="bold")
+            ax.legend()
+            return para_png(fig)
+
+    return _em_cache("serie_temporal", serie, (ano_inicial, ano_final, cor_primaria, cor_max, cor_min, suavizador), desenhar)
@@ -0,0 +1,204 @@
+"""Fontes de dados do histórico do Brent, escolhidas por configuração.
+
+- ``local``: lê o parquet do disco (padrão: o arquivo versionado no repositório);
+- ``arrow``: lê um arquivo Arrow IPC mapeado em memória (gerado a partir do
+  parquet na primeira leitura, se ainda não existir);
+- ``http``: baixa o parquet com requisição condicional (ETag) e guarda uma
+  cópia local, usada também quando a rede não está disponível.
+
+A escolha vem da seção ``[dados]`` do ``config.toml`` e pode ser sobrescrita
+pelas variáveis de ambiente de ``VARIAVEIS_AMBIENTE`` (``BRENT_FONTE``,
+``BRENT_FONTE_PARQUET``, ``BRENT_FONTE_ARROW``, ``BRENT_FONTE_DESTINO`` e
+``BRENT_FONTE_URL``). Sem configuração nenhuma, o app lê o parquet local e não
+faz nenhum acesso à rede.
+
+Todas as fontes devolvem um DataFrame com as colunas ``data`` e ``preco``.
+"""
+import os
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ARQUIVO_CONFIG = os.path.join(RAIZ, "config.toml")
+PARQUET_PADRAO = os.path.join(RAIZ, "ipea_brent_20250217.parquet")
+URL_PADRAO = "https://raw.githubusercontent.com/Rabramo/Fiap-Postech-Tech-Challenge-Fase-4/main/ipea_brent_20250217.parquet"
+
+
+def _caminho_absoluto(caminho):
+    return caminho if os.path.isabs(caminho) else os.path.join(RAIZ, caminho)
+
+
+def _gravar_atomico(destino, escrever):
+    """Escreve em um arquivo temporário e renomeia, para que leitores nunca vejam o arquivo pela metade."""
+    os.makedirs(os.path.dirname(destino) or ".", exist_ok=True)
+    descritor, temporario = tempfile.mkstemp(prefix=".tmp-", dir=os.path.dirname(destino) or ".")
+    os.close(descritor)
+    try:
+        escrever(temporario)
+        os.replace(temporario, destino)
+    finally:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+
+
+class FonteArquivoLocal:
+    """Parquet em disco."""
+
+    def __init__(self, caminho=PARQUET_PADRAO):
+        self.caminho = _caminho_absoluto(caminho)
+
+    def ler(self):
+        import pandas as pd
+
+        return pd.read_parquet(self.caminho, engine="pyarrow")
+
+    def __repr__(self):
+        return f"FonteArquivoLocal({self.caminho!r})"
+
+
+class FonteArrowMmap:
+    """Arquivo Arrow IPC lido por ``memory_map``: as colunas apontam para as páginas do arquivo.
+
+    Se o ``.arrow`` não existir, ele é gerado uma única vez a partir de ``parquet``.
+    """
+
+    def __init__(self, caminho=None, parquet=PARQUET_PADRAO):
+        self.parquet = _caminho_absoluto(parquet)
+        self.caminho = _caminho_absoluto(caminho) if caminho else os.path.splitext(self.parquet)[0] + ".arrow"
+
+    def preparar(self):
+        """Gera o arquivo Arrow a partir do parquet se ele não existir ou estiver desatualizado."""
+        import pyarrow.ipc as ipc
+        import pyarrow.parquet as pq
+
+        if os.path.exists(self.caminho) and os.path.getmtime(self.caminho) >= os.path.getmtime(self.parquet):
+            return self.caminho
+
+        def escrever(temporario):
+            tabela = pq.read_table(self.parquet)
+            with ipc.new_file(temporario, tabela.schema) as escritor:
+                escritor.write_table(tabela)
+
+        _gravar_atomico(self.caminho, escrever)
+        return self.caminho
+
+    def ler_tabela(self):
+        """Tabela Arrow mapeada em memória (sem cópia dos dados)."""
+        import pyarrow as pa
+        import pyarrow.ipc as ipc
+
+        if not os.path.exists(self.caminho):
+            self.preparar()
+        with pa.memory_map(self.caminho, "r") as arquivo:
+            return ipc.open_file(arquivo).read_all()
+
+    def ler(self):
+        return self.ler_tabela().to_pandas()
+
+    def __repr__(self):
+        return f"FonteArrowMmap({self.caminho!r})"
+
+
+class FonteHttpEtag:
+    """Download HTTP com ETag e cópia local.
+
+    A cópia e a ETag ficam em ``destino`` e ``destino + '.etag'``. Quando o
+    servidor responde 304 (não modificado), ou quando a rede falha, a cópia
+    local é usada; só há erro se a rede falhar e ainda não houver cópia.
+    """
+
+    def __init__(self, url=URL_PADRAO, destino=None, timeout=10):
+        self.url = url
+        self.destino = _caminho_absoluto(destino) if destino else os.path.join(
+            RAIZ, ".cache", "dados", os.path.basename(url.split("?")[0]))
+        self.timeout = timeout
+
+    def _etag(self):
+        try:
+            with open(self.destino + ".etag", encoding="utf-8") as arquivo:
+                return arquivo.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def atualizar(self):
+        """Sincroniza a cópia local com o servidor. Devolve True se baixou uma versão nova."""
+        import requests
+
+        cabecalhos = {}
+        etag = self._etag()
+        if etag and os.path.exists(self.destino):
+            cabecalhos["If-None-Match"] = etag
+        try:
+            resposta = requests.get(self.url, headers=cabecalhos, timeout=self.timeout)
+            if resposta.status_code == 304:
+                return False
+            resposta.raise_for_status()
+        except requests.RequestException:
+            if os.path.exists(self.destino):
+                return False
+            raise
+
+        def escrever(temporario):
+            with open(temporario, "wb") as arquivo:
+                arquivo.write(resposta.content)
+
+        _gravar_atomico(self.destino, escrever)
+        with open(self.destino + ".etag", "w", encoding="utf-8") as arquivo:
+            arquivo.write(resposta.headers.get("ETag", ""))
+        return True
+
+    def ler(self):
+        import pandas as pd
+
+        self.atualizar()
+        return pd.read_parquet(self.destino, engine="pyarrow")
+
+    def __repr__(self):
+        return f"FonteHttpEtag({self.url!r})"
+
+
+FONTES = {"local": FonteArquivoLocal, "arrow": FonteArrowMmap, "http": FonteHttpEtag}
+VARIAVEIS_AMBIENTE = {
+    "fonte": "BRENT_FONTE",
+    "parquet": "BRENT_FONTE_PARQUET",
+    "arrow": "BRENT_FONTE_ARROW",
+    "destino": "BRENT_FONTE_DESTINO",
+    "url": "BRENT_FONTE_URL",
+}
+
+
+def ler_configuracao(caminho=ARQUIVO_CONFIG):
+    """Seção ``[dados]`` do config.toml (dicionário vazio se não existir)."""
+    try:
+        import tomllib
+    except ImportError:  # Python < 3.11
+        try:
+            import tomli as tomllib
+        except ImportError:
+            return {}
+    if not os.path.exists(caminho):
+        return {}
+    with open(caminho, "rb") as arquivo:
+        return tomllib.load(arquivo).get("dados", {})
+
+
+def criar_fonte(configuracao=None):
+    """Cria a fonte de dados configurada (padrão: parquet local do repositório).
+
+    Cada fonte tem a própria chave de arquivo: ``parquet`` (o parquet lido
+    pela fonte ``local`` e de onde a ``arrow`` gera o seu arquivo), ``arrow``
+    (o arquivo Arrow IPC) e ``destino`` (a cópia baixada pela ``http``, por
+    padrão em ``.cache/dados/``).
+    """
+    configuracao = dict(ler_configuracao() if configuracao is None else configuracao)
+    for chave, variavel in VARIAVEIS_AMBIENTE.items():
+        if os.environ.get(variavel):
+            configuracao[chave] = os.environ[variavel]
+
+    tipo = configuracao.pop("fonte", "local")
+    if tipo not in FONTES:
+        raise ValueError(f"Fonte de dados desconhecida: {tipo!r} (opções: {', '.join(FONTES)})")
+    if tipo == "http":
+        return FonteHttpEtag(configuracao.get("url", URL_PADRAO), configuracao.get("destino"))
+    if tipo == "arrow":
+        return FonteArrowMmap(configuracao.get("arrow"), configuracao.get("parquet", PARQUET_PADRAO))
+    return FonteArquivoLocal(configuracao.get("parquet", PARQUET_PADRAO))
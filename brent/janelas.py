@@ -0,0 +1,60 @@
+"""Janelas deslizantes (X, y) para modelos de séries temporais, sem cópia.
+
+Substitui o laço de ``criar_sequencias``, que fazia um ``append`` por linha e
+depois copiava tudo para um ``np.array``. Aqui X é uma *view* com strides
+(``sliding_window_view``) sobre a própria série: nenhuma janela é alocada.
+
+Convenção: para a origem ``i``, ``X[i] = dados[i : i + janela]`` e
+``y[i, k] = dados[i + janela + horizontes[k] - 1]``; o horizonte 1 é o dia
+seguinte ao fim da janela, como em ``criar_sequencias``.
+"""
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def criar_janelas(dados, janela, horizontes=(1,), alvo=None):
+    """Monta X e y a partir de uma série uni ou multivariada.
+
+    ``dados`` tem formato (n,) ou (n, variaveis). ``alvo`` escolhe as colunas de
+    ``dados`` usadas em y (índice ou lista; padrão: todas). Devolve
+
+    - X com formato (amostras, janela, variaveis): view somente leitura da série;
+    - y com formato (amostras, len(horizontes), len(alvo)).
+
+    y também é uma view quando os horizontes são consecutivos (ex.: 1..H) e o
+    alvo é None ou um único índice; caso contrário, apenas y é copiado.
+    """
+    dados = np.asarray(dados)
+    if dados.ndim == 1:
+        dados = dados[:, None]
+    horizontes = np.atleast_1d(np.asarray(horizontes, dtype=int))
+    if horizontes.min() < 1:
+        raise ValueError("Os horizontes devem ser >= 1.")
+    h_max = int(horizontes.max())
+    amostras = len(dados) - janela - h_max + 1
+    if amostras <= 0:
+        raise ValueError(f"Série com {len(dados)} pontos é curta demais para janela {janela} e horizonte {h_max}.")
+
+    # (n - janela + 1, variaveis, janela) -> (amostras, janela, variaveis), ainda sem cópia
+    X = sliding_window_view(dados, janela, axis=0)[:amostras].transpose(0, 2, 1)
+
+    if alvo is None:
+        colunas = dados
+    elif np.isscalar(alvo):
+        colunas = dados[:, alvo:alvo + 1]
+    else:
+        colunas = dados[:, alvo]  # lista de colunas: cópia apenas das colunas-alvo
+    futuros = sliding_window_view(colunas[janela:], h_max, axis=0)[:amostras].transpose(0, 2, 1)
+    consecutivos = np.array_equal(horizontes, np.arange(horizontes[0], horizontes[-1] + 1))
+    y = futuros[:, horizontes[0] - 1:horizontes[-1]] if consecutivos else futuros[:, horizontes - 1]
+    return X, y
+
+
+def criar_sequencias(dados, janela_temporal):
+    """Equivalente vetorizado de ``criar_sequencias`` da página LSTM.
+
+    Recebe a série escalada (n, 1) e devolve X com formato (amostras, janela, 1)
+    e y com formato (amostras,), ambos views da série.
+    """
+    X, y = criar_janelas(dados, janela_temporal)
+    return X, y[:, 0, 0]
@@ -0,0 +1,148 @@
+"""Inferência do LSTM em NumPy puro, sem carregar o TensorFlow.
+
+A página LSTM só precisa de ``modelo.predict(X)``, mas ``load_model`` importa
+o TensorFlow inteiro: segundos de import e centenas de MB por worker. Os
+pesos do modelo (duas camadas LSTM e duas Dense) são exportados para
+``pesos.npz`` ao lado do ``modelo.keras``, e ``ModeloNumPy`` refaz o forward
+pass com as mesmas equações do Keras:
+
+- LSTM com ativação ``tanh``, recorrente ``sigmoid`` e os portões na ordem
+  do Keras, ``i, f, c, o`` (colunas do ``kernel``, do ``recurrent_kernel`` e
+  do ``bias``); a projeção da entrada é feita para todos os passos de uma
+  vez e só o termo recorrente fica no laço sobre a janela;
+- Dense linear.
+
+Tudo em float32 e em lotes de ``tamanho_lote`` janelas, então a memória não
+cresce com o número de janelas. A diferença para o Keras fica na ordem de
+1e-6 (``comparar``).
+
+Uso (exporta os pesos de artefatos antigos, que só têm o ``modelo.keras``):
+    python -m brent.lstm_numpy [--versao 3]
+"""
+import argparse
+import os
+
+import numpy as np
+
+ARQUIVO_PESOS = "pesos.npz"
+TAMANHO_LOTE = 1024
+TOLERANCIA = 1e-4
+
+
+def _sigmoid(x):
+    return 0.5 * (1.0 + np.tanh(0.5 * x))  # Mesma curva de 1 / (1 + e^-x), sem overflow no exp
+
+
+def exportar_pesos(modelo, caminho):
+    """Grava os pesos de um ``Sequential`` de LSTM e Dense em ``caminho`` (.npz); recusa outras camadas."""
+    arrays, tipos = {}, []
+    for numero, camada in enumerate(modelo.layers):
+        config = camada.get_config()
+        tipo = type(camada).__name__
+        if tipo == "LSTM":
+            if (config["activation"], config["recurrent_activation"], config["use_bias"]) != ("tanh", "sigmoid", True):
+                raise ValueError(f"Camada {camada.name}: só LSTM com tanh/sigmoid e bias é suportada.")
+            kernel, recorrente, bias = camada.get_weights()
+            arrays.update({f"c{numero}_kernel": kernel, f"c{numero}_recorrente": recorrente, f"c{numero}_bias": bias,
+                           f"c{numero}_sequencias": np.array(config["return_sequences"])})
+        elif tipo == "Dense":
+            if config["activation"] != "linear" or not config["use_bias"]:
+                raise ValueError(f"Camada {camada.name}: só Dense linear com bias é suportada.")
+            kernel, bias = camada.get_weights()
+            arrays.update({f"c{numero}_kernel": kernel, f"c{numero}_bias": bias})
+        else:
+            raise ValueError(f"Camada {camada.name} ({tipo}) sem equivalente em NumPy.")
+        tipos.append(tipo)
+    arrays = {nome: valor.astype(np.float32) if valor.dtype.kind == "f" else valor for nome, valor in arrays.items()}
+    np.savez(caminho, tipos=np.array(tipos), **arrays)
+    return caminho
+
+
+class ModeloNumPy:
+    """Forward pass do ``Sequential`` exportado; aceita as mesmas chamadas que a página faz ao modelo do Keras."""
+
+    def __init__(self, camadas):
+        self.camadas = camadas
+
+    @classmethod
+    def carregar(cls, caminho):
+        with np.load(caminho) as arquivo:
+            camadas = []
+            for numero, tipo in enumerate(arquivo["tipos"]):
+                pesos = {nome.split("_", 1)[1]: arquivo[nome] for nome in arquivo.files if nome.startswith(f"c{numero}_")}
+                camadas.append((str(tipo), pesos))
+        return cls(camadas)
+
+    @staticmethod
+    def _lstm(x, pesos):
+        kernel, recorrente, bias = pesos["kernel"], pesos["recorrente"], pesos["bias"]
+        lote, passos, _ = x.shape
+        unidades = recorrente.shape[0]
+        entrada = x @ kernel + bias  # Projeção da entrada em todos os passos de uma vez: [lote, passos, 4 * unidades]
+        h = np.zeros((lote, unidades), dtype=np.float32)
+        c = np.zeros((lote, unidades), dtype=np.float32)
+        saidas = np.empty((lote, passos, unidades), dtype=np.float32) if pesos["sequencias"] else None
+        for passo in range(passos):
+            z = entrada[:, passo] + h @ recorrente
+            i, f, g, o = (z[:, k * unidades:(k + 1) * unidades] for k in range(4))  # Ordem dos portões do Keras
+            c = _sigmoid(f) * c + _sigmoid(i) * np.tanh(g)
+            h = _sigmoid(o) * np.tanh(c)
+            if saidas is not None:
+                saidas[:, passo] = h
+        return saidas if saidas is not None else h
+
+    def _lote(self, x):
+        for tipo, pesos in self.camadas:
+            x = self._lstm(x, pesos) if tipo == "LSTM" else x @ pesos["kernel"] + pesos["bias"]
+        return x
+
+    def predict(self, X, verbose=0, batch_size=TAMANHO_LOTE):
+        """Previsões para ``X`` no formato ``[amostras, janela, 1]``, em lotes de ``batch_size`` janelas."""
+        X = np.asarray(X, dtype=np.float32)
+        if len(X) == 0:
+            return np.empty((0, self.camadas[-1][1]["bias"].shape[0]), dtype=np.float32)
+        return np.concatenate([self._lote(X[inicio:inicio + batch_size]) for inicio in range(0, len(X), batch_size)])
+
+    def __call__(self, X, training=False):
+        return self.predict(X)
+
+
+def comparar(modelo_keras, modelo_numpy, X):
+    """Maior diferença absoluta entre as previsões do Keras e as do NumPy para ``X``."""
+    referencia = modelo_keras.predict(np.asarray(X, dtype=np.float32), verbose=0)
+    return float(np.max(np.abs(referencia - modelo_numpy.predict(X)))) if len(X) else 0.0
+
+
+def exportar_artefato(diretorio_versao, X=None):
+    """Exporta ``pesos.npz`` de uma versão que só tem o ``modelo.keras``; devolve a diferença para o Keras."""
+    from tensorflow.keras.models import load_model
+
+    from brent.modelo_lstm import ARQUIVO_MODELO
+
+    modelo = load_model(os.path.join(diretorio_versao, ARQUIVO_MODELO))
+    caminho = exportar_pesos(modelo, os.path.join(diretorio_versao, ARQUIVO_PESOS))
+    if X is None:
+        X = np.random.default_rng(0).random((256,) + tuple(modelo.input_shape[1:]), dtype=np.float32)
+    return caminho, comparar(modelo, ModeloNumPy.carregar(caminho), X)
+
+
+def main():
+    from brent.modelo_lstm import DIRETORIO_ARTEFATOS, listar_versoes
+
+    parser = argparse.ArgumentParser(description="Exporta os pesos dos artefatos do LSTM para inferência em NumPy.")
+    parser.add_argument("--versao", type=int, nargs="*", help="versões a exportar (padrão: todas sem pesos.npz)")
+    parser.add_argument("--diretorio", default=DIRETORIO_ARTEFATOS)
+    args = parser.parse_args()
+
+    versoes = args.versao or [versao for versao in listar_versoes(args.diretorio)
+                              if not os.path.exists(os.path.join(args.diretorio, f"v{versao:04d}", ARQUIVO_PESOS))]
+    for versao in versoes:
+        caminho, diferenca = exportar_artefato(os.path.join(args.diretorio, f"v{versao:04d}"))
+        situacao = "ok" if diferenca <= TOLERANCIA else "ACIMA DA TOLERÂNCIA"
+        print(f"v{versao:04d}: {caminho} (diferença máxima para o Keras {diferenca:.2e}, {situacao})")
+    if not versoes:
+        print("Nenhuma versão sem pesos.npz.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Série do Brent publicada uma vez em memória compartilhada e anexada sem cópia.
+
+``carregar_dados`` já guarda uma única ``SerieBrent`` por processo
+(``st.cache_resource``), mas cada worker do Streamlit ainda lia o parquet e
+montava os próprios arrays. Aqui o primeiro processo grava as colunas da
+série (datas, preços, ano, mês e dia da semana, já ordenadas e validadas)
+em um arquivo Arrow IPC sem compressão em ``/dev/shm``. Os demais processos
+apenas fazem ``memory_map`` desse arquivo: os arrays NumPy da ``SerieBrent``
+apontam direto para as páginas compartilhadas do kernel, então N workers e
+suas sessões usam uma única cópia dos dados, e as fatias por período
+(``SerieBrent.intervalo``) continuam sendo views.
+
+O nome do arquivo vem da identidade da fonte (caminho, tamanho e data de
+modificação do arquivo de origem); quando a fonte muda, um novo arquivo é
+publicado e os antigos são removidos (quem ainda os mapeia continua lendo
+normalmente até soltar o mapeamento).
+"""
+import glob
+import os
+import tempfile
+
+import numpy as np
+
+PREFIXO = "serie-"
+COLUNAS = ("datas", "precos", "anos", "meses", "dias_semana")
+CHAVE_IMPRESSAO = b"brent.impressao_digital"
+
+
+def diretorio_padrao():
+    """``BRENT_SHM_DIR``, ou ``/dev/shm/brent`` (memória), ou o diretório temporário do sistema."""
+    if os.environ.get("BRENT_SHM_DIR"):
+        return os.environ["BRENT_SHM_DIR"]
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(base, "brent")
+
+
+def habilitada(configuracao=None):
+    """``memoria_compartilhada`` da seção ``[dados]`` (padrão: sim), sobrescrita por ``BRENT_MEMORIA_COMPARTILHADA``."""
+    from brent.fontes import ler_configuracao
+
+    valor = os.environ.get("BRENT_MEMORIA_COMPARTILHADA")
+    if valor is not None:
+        return valor.strip().lower() not in ("0", "false", "nao", "não", "")
+    configuracao = ler_configuracao() if configuracao is None else configuracao
+    return bool(configuracao.get("memoria_compartilhada", True))
+
+
+def identidade_fonte(fonte):
+    """Chave da fonte: repr e, se houver arquivo de origem, seu tamanho e data de modificação.
+
+    Na fonte ``arrow`` o arquivo de origem é o parquet: o ``.arrow`` é gerado
+    a partir dele na primeira leitura, depois de calculada a identidade.
+    """
+    from brent.cache import calcular_chave
+
+    candidatos = [getattr(fonte, atributo, None) for atributo in ("parquet", "caminho", "destino")]
+    arquivo = next((c for c in candidatos if c and os.path.exists(c)), None)
+    partes = [repr(fonte)]
+    if arquivo:
+        estado = os.stat(arquivo)
+        partes += [estado.st_size, estado.st_mtime_ns]
+    return calcular_chave(*partes)
+
+
+def publicar(serie, caminho):
+    """Grava as colunas da série como Arrow IPC (um único lote, sem compressão) de forma atômica."""
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+
+    tabela = pa.table({nome: pa.array(np.asarray(getattr(serie, nome))) for nome in COLUNAS})
+    tabela = tabela.replace_schema_metadata({CHAVE_IMPRESSAO: (serie.impressao_digital or "").encode("utf-8")})
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    descritor, temporario = tempfile.mkstemp(prefix=".tmp-", dir=os.path.dirname(caminho))
+    os.close(descritor)
+    try:
+        with ipc.new_file(temporario, tabela.schema) as escritor:
+            escritor.write_table(tabela, max_chunksize=max(1, len(tabela)))
+        os.replace(temporario, caminho)
+    finally:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+    return caminho
+
+
+def anexar(caminho):
+    """``SerieBrent`` cujos arrays são views do arquivo mapeado em memória (nenhuma cópia dos dados)."""
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+
+    from brent.serie import SerieBrent
+
+    # O mapeamento continua vivo enquanto os arrays (e a tabela Arrow por trás deles) existirem
+    tabela = ipc.open_file(pa.memory_map(caminho, "r")).read_all()
+    colunas = {nome: tabela.column(nome).chunk(0).to_numpy(zero_copy_only=True) if len(tabela)
+               else tabela.column(nome).to_numpy() for nome in COLUNAS}
+    impressao = (tabela.schema.metadata or {}).get(CHAVE_IMPRESSAO, b"").decode("utf-8") or None
+    return SerieBrent(**colunas, impressao_digital=impressao)
+
+
+def _remover_antigos(diretorio, atual):
+    for caminho in glob.glob(os.path.join(diretorio, PREFIXO + "*.arrow")):
+        if caminho != atual:
+            try:
+                os.remove(caminho)  # Processos que ainda mapeiam o arquivo não são afetados
+            except OSError:
+                pass
+
+
+def carregar_serie(fonte, diretorio=None):
+    """Série da ``fonte``, anexada da memória compartilhada; publica na primeira vez."""
+    from brent.serie import SerieBrent
+
+    if hasattr(fonte, "atualizar"):
+        fonte.atualizar()  # Fonte HTTP: sincroniza a cópia local antes de calcular a identidade
+    diretorio = diretorio or diretorio_padrao()
+    caminho = os.path.join(diretorio, f"{PREFIXO}{identidade_fonte(fonte)[:16]}.arrow")
+    if not os.path.exists(caminho):
+        publicar(SerieBrent.de_dataframe(fonte.ler()), caminho)
+        _remover_antigos(diretorio, caminho)
+    return anexar(caminho)
+
+
+def ler_serie(fonte):
+    """Série da ``fonte``: da memória compartilhada se ``habilitada()``, senão lida e montada neste processo."""
+    from brent.serie import SerieBrent
+
+    return carregar_serie(fonte) if habilitada() else SerieBrent.de_dataframe(fonte.ler())
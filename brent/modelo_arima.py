@@ -0,0 +1,254 @@
+"""ARIMA/SARIMA com busca automática de ordens em paralelo e atualização sem reajuste.
+
+Busca de ordens (p, d, q)(P, D, Q, s), no estilo stepwise de Hyndman–Khandakar:
+
+1. ``d`` vem do KPSS (diferencia até a série passar no teste);
+2. quatro modelos iniciais são ajustados em paralelo;
+3. a cada rodada, os vizinhos do melhor modelo (±1 em p, q, P, Q) que ainda
+   não foram vistos são ajustados em paralelo, até nenhum vizinho melhorar o
+   critério (AIC ou BIC) ou atingir ``max_modelos``.
+
+Cada ajuste começa com poucas iterações do otimizador: se o critério já está
+``margem_poda`` pontos pior que o melhor até agora, o candidato é podado sem
+terminar o ajuste. Ajustes que não convergem em ``maxiter`` iterações, ou
+que falham numericamente, são descartados em vez de insistir.
+
+O resultado fica em ``CacheDisco("arima")`` com chave derivada do hash dos
+dados e da configuração, guardando só a ordem e os parâmetros: recarregar é
+rodar o filtro de Kalman com esses parâmetros (``smooth``), sem otimizar.
+Quando os dados ganham novos dias, uma entrada cujo treino é prefixo dos
+dados novos é reaproveitada com ``append`` (sem reajustar os parâmetros).
+Por isso este cache não é invalidado quando o parquet muda: a verificação do
+prefixo por hash já garante que a entrada corresponde aos dados.
+"""
+import json
+import os
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from brent.cache import CacheDisco, calcular_chave
+from brent.paralelo import criar_pool, processos_padrao
+from brent.rastreamento import etapa
+
+cache_arima = CacheDisco("arima", max_entradas=10)
+
+SAZONALIDADE_PADRAO = 5  # Uma semana de pregões
+
+CONFIG_PADRAO = {
+    "criterio": "aic",
+    "sazonalidade": SAZONALIDADE_PADRAO,
+    "max_p": 3,
+    "max_q": 3,
+    "max_P": 1,
+    "max_Q": 1,
+    "d": None,
+    "D": 0,
+    "max_modelos": 30,
+    "margem_poda": 10.0,
+    "iter_poda": 10,
+    "maxiter": 50,
+}
+
+
+def hash_prefixo(datas, precos, n):
+    return calcular_chave(np.asarray(datas[:n]).tobytes(), np.asarray(precos[:n], dtype=np.float64).tobytes())
+
+
+def diferencas_necessarias(x, max_d=2, alpha=0.05):
+    """Número de diferenças até o KPSS não rejeitar a estacionariedade (como o ``ndiffs`` do pmdarima)."""
+    from statsmodels.tsa.stattools import kpss
+
+    x = np.asarray(x, dtype=np.float64)
+    for d in range(max_d + 1):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            p_valor = kpss(x, regression="c", nlags="auto")[1]
+        if p_valor >= alpha or d == max_d:
+            return d
+        x = np.diff(x)
+    return max_d
+
+
+def construir(x, ordem):
+    """``SARIMAX`` da ordem ``(p, d, q, P, D, Q, s)``, com constante apenas sem diferenciação."""
+    from statsmodels.tsa.statespace.sarimax import SARIMAX
+
+    p, d, q, P, D, Q, s = ordem
+    sazonal = (P, D, Q, s) if (P or D or Q) else (0, 0, 0, 0)
+    return SARIMAX(np.asarray(x, dtype=np.float64), order=(p, d, q), seasonal_order=sazonal,
+                   trend="c" if d + D == 0 else "n")
+
+
+def ajustar_ordem(x, ordem, criterio="aic", limite=np.inf, iter_poda=10, maxiter=50):
+    """Ajusta uma ordem candidata; roda dentro de um processo do pool.
+
+    Devolve um dicionário com o status (``ok``, ``podado``, ``nao_convergiu``
+    ou ``erro``), AIC, BIC e os parâmetros estimados.
+    """
+    inicio = time.perf_counter()
+    registro = {"ordem": tuple(ordem), "status": "ok", "aic": np.nan, "bic": np.nan, "params": None}
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            modelo = construir(x, ordem)
+            resultado = modelo.fit(disp=False, maxiter=iter_poda)
+            if getattr(resultado, criterio) > limite:
+                registro["status"] = "podado"
+            else:
+                resultado = modelo.fit(disp=False, maxiter=maxiter, start_params=resultado.params)
+                if not resultado.mle_retvals.get("converged", True):
+                    registro["status"] = "nao_convergiu"
+        registro.update({"aic": float(resultado.aic), "bic": float(resultado.bic),
+                         "params": [float(v) for v in resultado.params]})
+    except Exception as erro:  # noqa: BLE001 - uma ordem que o statsmodels não ajusta não pode derrubar a busca
+        registro.update({"status": "erro", "erro": f"{type(erro).__name__}: {erro}"})
+    registro["segundos"] = time.perf_counter() - inicio
+    return registro
+
+
+def _vizinhos(ordem, config):
+    p, d, q, P, D, Q, s = ordem
+    passos = [(1, 0, 0, 0), (-1, 0, 0, 0), (0, 1, 0, 0), (0, -1, 0, 0), (1, 1, 0, 0), (-1, -1, 0, 0)]
+    if s:
+        passos += [(0, 0, 1, 0), (0, 0, -1, 0), (0, 0, 0, 1), (0, 0, 0, -1)]
+    for dp, dq, dP, dQ in passos:
+        candidato = (p + dp, d, q + dq, P + dP, D, Q + dQ, s)
+        if (0 <= candidato[0] <= config["max_p"] and 0 <= candidato[2] <= config["max_q"]
+                and 0 <= candidato[3] <= config["max_P"] and 0 <= candidato[5] <= config["max_Q"]):
+            yield candidato
+
+
+def buscar_ordem(x, config=None, processos=None, progresso=None):
+    """Busca stepwise da melhor ordem. Devolve ``(melhor, tentativas)``; ``tentativas`` é um DataFrame.
+
+    ``progresso(fracao, mensagem, modelos=..., melhor=...)`` é chamado ao fim de cada rodada.
+    """
+    config = {**CONFIG_PADRAO, **(config or {})}
+    x = np.asarray(x, dtype=np.float64)
+    criterio, s = config["criterio"], config["sazonalidade"] or 0
+    d = config["d"] if config["d"] is not None else diferencas_necessarias(x)
+    D = config["D"] if s else 0
+    sazonal = 1 if s else 0
+    iniciais = [(2, d, 2, sazonal, D, sazonal, s), (0, d, 0, 0, D, 0, s),
+                (1, d, 0, sazonal, D, 0, s), (0, d, 1, 0, D, sazonal, s)]
+
+    processos = processos or processos_padrao()
+    pool = criar_pool(processos) if processos > 1 else None
+    tentativas, vistos, melhor = [], set(), None
+    try:
+        candidatos = list(dict.fromkeys(iniciais))
+        while candidatos and len(tentativas) < config["max_modelos"]:
+            candidatos = candidatos[:config["max_modelos"] - len(tentativas)]
+            vistos.update(candidatos)
+            limite = melhor[criterio] + config["margem_poda"] if melhor else np.inf
+            argumentos = [(x, ordem, criterio, limite, config["iter_poda"], config["maxiter"]) for ordem in candidatos]
+            if pool is None:
+                rodada = [ajustar_ordem(*a) for a in argumentos]
+            else:
+                rodada = list(pool.map(ajustar_ordem, *zip(*argumentos)))
+            tentativas += rodada
+
+            validos = [r for r in rodada if r["status"] == "ok"]
+            melhor_rodada = min(validos, key=lambda r: r[criterio], default=None)
+            if melhor_rodada is None or (melhor is not None and melhor_rodada[criterio] >= melhor[criterio]):
+                break  # Nenhum vizinho melhorou: fim do stepwise
+            melhor = melhor_rodada
+            candidatos = [v for v in _vizinhos(melhor["ordem"], config) if v not in vistos]
+            if progresso:
+                progresso(len(tentativas) / config["max_modelos"],
+                          f"{len(tentativas)} modelos ajustados; melhor até agora: {formatar_ordem(melhor['ordem'])}",
+                          modelos=len(tentativas), melhor=melhor[criterio])
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    if melhor is None:
+        raise RuntimeError("Nenhuma ordem ARIMA convergiu; reduza as ordens máximas ou aumente maxiter.")
+    tabela = pd.DataFrame(tentativas)
+    tabela["ordem"] = tabela["ordem"].map(formatar_ordem)
+    return melhor, tabela.drop(columns="params").sort_values(criterio, na_position="last").reset_index(drop=True)
+
+
+def formatar_ordem(ordem):
+    p, d, q, P, D, Q, s = ordem
+    return f"({p},{d},{q})({P},{D},{Q},{s})" if s else f"({p},{d},{q})"
+
+
+def _procurar_prefixo(datas, precos, chave_config):
+    """Entrada do cache cujo treino é um prefixo de (datas, precos), para atualizar com ``append``."""
+    for chave, _, _ in reversed(cache_arima.entradas()):
+        metadados = cache_arima.metadados(chave)
+        n = metadados.get("n", 0)
+        if (metadados.get("config") == chave_config and 0 < n < len(precos)
+                and metadados.get("hash_dados") == hash_prefixo(datas, precos, n)):
+            return chave, metadados
+    return None
+
+
+def ajustar_arima(datas, precos, config=None, processos=None, progresso=None):
+    """Melhor SARIMA para ``precos``, com cache em disco e atualização incremental.
+
+    Devolve ``(resultado, busca, info)``: o resultado do statsmodels, os dados
+    da busca (ordem, parâmetros e tabela de tentativas) e ``info`` com a
+    origem (``cache``, ``append`` ou ``busca``) e o tempo gasto. ``progresso``
+    acompanha as rodadas da busca (ver ``buscar_ordem``).
+    """
+    import statsmodels
+
+    config = {**CONFIG_PADRAO, **(config or {})}
+    chave_config = calcular_chave("arima", statsmodels.__version__, config)
+    x = np.asarray(precos, dtype=np.float64)
+    hash_dados = hash_prefixo(datas, x, len(x))
+    chave = calcular_chave(chave_config, hash_dados)
+    inicio = time.perf_counter()
+
+    diretorio = cache_arima.obter(chave)
+    if diretorio is not None:
+        busca = _ler_busca(diretorio)
+        resultado = construir(x, busca["ordem"]).smooth(busca["params"])
+        return resultado, busca, {"origem": "cache", "segundos": time.perf_counter() - inicio}
+
+    prefixo = _procurar_prefixo(datas, x, chave_config)
+    if prefixo is not None:
+        busca = _ler_busca(cache_arima.caminho(prefixo[0]))
+        n = prefixo[1]["n"]
+        # Só filtra os novos dias com os parâmetros já estimados
+        resultado = construir(x[:n], busca["ordem"]).smooth(busca["params"]).append(x[n:], refit=False)
+        origem = "append"
+    else:
+        with etapa("arima: busca de ordens", observacoes=len(x)):
+            melhor, tabela = buscar_ordem(x, config, processos, progresso)
+        busca = {"ordem": list(melhor["ordem"]), "params": melhor["params"], "criterio": config["criterio"],
+                 "valor": melhor[config["criterio"]], "tentativas": tabela.to_dict(orient="records"),
+                 "segundos_busca": time.perf_counter() - inicio}
+        resultado = construir(x, busca["ordem"]).smooth(busca["params"])
+        origem = "busca"
+
+    def escrever(destino):
+        with open(os.path.join(destino, "busca.json"), "w", encoding="utf-8") as arquivo:
+            json.dump(busca, arquivo, ensure_ascii=False, default=str)
+
+    cache_arima.gravar(chave, escrever, {
+        "config": chave_config,
+        "hash_dados": hash_dados,
+        "n": len(x),
+        "ordem": formatar_ordem(busca["ordem"]),
+        "treino_inicio": str(np.asarray(datas)[0]),
+        "treino_fim": str(np.asarray(datas)[-1]),
+    })
+    return resultado, busca, {"origem": origem, "segundos": time.perf_counter() - inicio}
+
+
+def _ler_busca(diretorio):
+    with open(os.path.join(diretorio, "busca.json"), encoding="utf-8") as arquivo:
+        busca = json.load(arquivo)
+    busca["ordem"] = tuple(busca["ordem"])
+    return busca
+
+
+def atualizar(resultado, novos):
+    """Acrescenta novas observações a um resultado ajustado, sem reestimar os parâmetros."""
+    return resultado.append(np.asarray(novos, dtype=np.float64), refit=False)
@@ -0,0 +1,384 @@
+"""Treino offline e artefatos versionados do modelo LSTM.
+
+O treino sai do caminho da requisição: ``python -m brent.modelo_lstm`` treina
+o modelo e grava um artefato versionado em ``artefatos/lstm/vNNNN/`` com
+
+- ``modelo.keras``: arquitetura e pesos do Keras;
+- ``pesos.npz``: os mesmos pesos para a inferência em NumPy (``brent.lstm_numpy``);
+- ``artefato.json``: ``janela_temporal``, parâmetros do ``MinMaxScaler``
+  ajustado, período e hash dos dados de treino, métricas e versões.
+
+A página LSTM só carrega o artefato mais recente (ou o fixado em
+``BRENT_LSTM_VERSAO``) e roda a inferência, por padrão em NumPy, sem importar
+o TensorFlow (``BRENT_LSTM_MOTOR=keras`` volta a usar o modelo do Keras).
+
+O treino usa o pipeline ``tf.data`` de ``brent.pipeline_lstm``: validação nas
+últimas janelas do treino, parada antecipada e pesos da melhor época gravados
+em ``artefatos/lstm/checkpoints/``.
+
+Uso:
+    python -m brent.modelo_lstm [--inicio 2015-02-10] [--fim 2025-02-10] [--epochs 20] [--paciencia 3]
+                                [--threads-intra 4] [--threads-inter 2] [--threads-dados 2]
+"""
+import argparse
+import json
+import os
+import re
+import time
+
+import numpy as np
+
+from brent.cache import CacheMemoria, calcular_chave
+from brent.janelas import criar_janelas, criar_sequencias
+from brent.pipeline_lstm import (PACIENCIA, PROPORCAO_VALIDACAO, callback_vazao, callbacks_treino, configurar_threads,
+                                 criar_dataset, dividir_origens)
+from brent.rastreamento import etapa
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DIRETORIO_ARTEFATOS = os.environ.get("BRENT_ARTEFATOS_DIR", os.path.join(RAIZ, "artefatos", "lstm"))
+ARQUIVO_MODELO = "modelo.keras"
+ARQUIVO_ARTEFATO = "artefato.json"
+MOTORES = ("numpy", "keras")
+
+# Configuração usada na página LSTM
+JANELA_TEMPORAL = 60
+PROPORCAO_TREINO = 0.8
+PERIODO_PADRAO = ("2015-02-10", "2025-02-10")
+ARQUITETURA_PADRAO = {"unidades": 50, "camadas": 2, "densa": 25, "taxa_aprendizado": 0.001}
+HORIZONTES = (5, 10, 21, 42, 63, 126)  # Opções de horizonte da página, em pregões
+
+cache_trajetorias = CacheMemoria(max_entradas=16)
+
+
+class ArtefatoLSTM:
+    """Modelo treinado + escala + janela temporal, prontos para inferência."""
+
+    def __init__(self, modelo, scaler, janela_temporal, metadados, diretorio=None):
+        self.modelo = modelo
+        self.scaler = scaler
+        self.janela_temporal = janela_temporal
+        self.metadados = metadados
+        self.diretorio = diretorio
+
+    @property
+    def versao(self):
+        return self.metadados.get("versao")
+
+
+def preparar_dados(precos, scaler, janela_temporal):
+    """Escala a série de preços e monta as janelas (X com formato [amostras, janela, 1], sem cópia)."""
+    dados_escalados = scaler.transform(np.asarray(precos, dtype=float).reshape(-1, 1))
+    return criar_sequencias(dados_escalados, janela_temporal)
+
+
+def construir_modelo(janela_temporal, unidades=50, camadas=2, densa=25, taxa_aprendizado=0.001):
+    """``Sequential`` com ``camadas`` LSTM de ``unidades``, uma Dense de ``densa`` (0 omite) e a saída.
+
+    Os padrões (``ARQUITETURA_PADRAO``) são a arquitetura original da página.
+    """
+    from tensorflow.keras.layers import LSTM, Dense
+    from tensorflow.keras.models import Sequential
+    from tensorflow.keras.optimizers import Adam
+
+    modelo = Sequential()
+    for camada in range(camadas):
+        entrada = {"input_shape": (janela_temporal, 1)} if camada == 0 else {}
+        modelo.add(LSTM(units=unidades, return_sequences=camada < camadas - 1, **entrada))
+    if densa:
+        modelo.add(Dense(units=densa))
+    modelo.add(Dense(units=1))
+    modelo.compile(optimizer=Adam(learning_rate=taxa_aprendizado), loss='mean_squared_error')
+    return modelo
+
+
+def scaler_de_parametros(parametros):
+    """Reconstrói o MinMaxScaler ajustado a partir dos parâmetros salvos no artefato.
+
+    Ajustar o scaler em ``[[min], [max]]`` reproduz exatamente os atributos do
+    scaler original, sem depender de pickle entre versões do scikit-learn.
+    """
+    from sklearn.preprocessing import MinMaxScaler
+
+    scaler = MinMaxScaler(feature_range=tuple(parametros["feature_range"]))
+    return scaler.fit(np.array([parametros["data_min"], parametros["data_max"]], dtype=float).reshape(2, -1))
+
+
+def parametros_do_scaler(scaler):
+    return {
+        "feature_range": list(scaler.feature_range),
+        "data_min": float(scaler.data_min_[0]),
+        "data_max": float(scaler.data_max_[0]),
+    }
+
+
+def callback_progresso(progresso, epochs):
+    """Callback do Keras que informa época, loss e vazão a ``progresso(fracao, mensagem, epoca=..., loss=...)``.
+
+    Com parada antecipada o treino pode terminar antes de ``epochs`` épocas.
+    """
+    from tensorflow.keras.callbacks import LambdaCallback
+
+    def ao_fim_da_epoca(epoca, logs):
+        vazao = f" ({logs['amostras_s']:,.0f} amostras/s)" if "amostras_s" in logs else ""
+        progresso((epoca + 1) / epochs, f"Época {epoca + 1}/{epochs}{vazao}", epoca=epoca + 1, loss=float(logs["loss"]))
+
+    return LambdaCallback(on_epoch_end=ao_fim_da_epoca)
+
+
+def treinar(precos, janela_temporal=JANELA_TEMPORAL, epochs=20, batch_size=32, verbose=0,
+            proporcao_treino=PROPORCAO_TREINO, progresso=None, proporcao_validacao=PROPORCAO_VALIDACAO,
+            paciencia=PACIENCIA, checkpoint=None, cache=None, threads_dados=None, arquitetura=None,
+            callbacks_extras=()):
+    """Treina o LSTM da página nos primeiros 80% das janelas (``proporcao_treino``) e devolve um ``ArtefatoLSTM``.
+
+    As janelas são geradas sob demanda por ``brent.pipeline_lstm``. As últimas
+    ``proporcao_validacao`` das janelas de treino ficam para a validação, e o
+    treino para depois de ``paciencia`` épocas sem melhora do loss de
+    validação (``epochs`` é o máximo). Ao fim, parando antes ou não, o
+    modelo fica com os pesos da época de menor loss de validação, também
+    gravados em ``checkpoint``, se informado. ``arquitetura`` substitui
+    chaves de ``ARQUITETURA_PADRAO`` (ver ``construir_modelo``), e
+    ``callbacks_extras`` entram no ``fit`` (ex.: a poda da busca de
+    hiperparâmetros). ``progresso``, se informado, recebe a fração concluída,
+    a época e o loss ao fim de cada época.
+    """
+    from sklearn.preprocessing import MinMaxScaler
+
+    scaler = MinMaxScaler(feature_range=(0, 1))
+    serie = scaler.fit_transform(np.asarray(precos, dtype=float).reshape(-1, 1))
+    origens_treino, origens_validacao = dividir_origens(len(serie) - janela_temporal, proporcao_treino,
+                                                        proporcao_validacao)
+    if len(origens_validacao) == 0:
+        origens_treino = range(origens_treino.start, origens_validacao.stop)
+
+    inicio = time.perf_counter()
+    arquitetura = {**ARQUITETURA_PADRAO, **(arquitetura or {})}
+    modelo = construir_modelo(janela_temporal, **arquitetura)
+    treino = criar_dataset(serie, janela_temporal, origens_treino, batch_size, embaralhar=True, cache=cache,
+                           threads_dados=threads_dados)
+    validacao = None
+    vazao = callback_vazao(len(origens_treino))
+    callbacks = [vazao]
+    if len(origens_validacao):
+        validacao = criar_dataset(serie, janela_temporal, origens_validacao, batch_size, cache="",
+                                  threads_dados=threads_dados)
+        callbacks += callbacks_treino(paciencia, checkpoint)
+    if progresso:
+        callbacks.append(callback_progresso(progresso, epochs))
+    callbacks += list(callbacks_extras)
+    with etapa("lstm: fit", epochs=epochs, janelas=len(origens_treino)):
+        historico = modelo.fit(treino, validation_data=validacao, epochs=epochs, verbose=verbose, callbacks=callbacks,
+                               shuffle=False)  # O dataset já embaralha as origens a cada época
+    perdas_validacao = historico.history.get("val_loss")
+    metadados = {
+        "janela_temporal": janela_temporal,
+        "scaler": parametros_do_scaler(scaler),
+        "epochs": epochs,
+        "epocas_treinadas": len(historico.history["loss"]),
+        "batch_size": batch_size,
+        "arquitetura": arquitetura,
+        "janelas_treino": len(origens_treino),
+        "janelas_validacao": len(origens_validacao),
+        "loss_final": float(historico.history["loss"][-1]),
+        "val_loss_melhor": float(min(perdas_validacao)) if perdas_validacao else None,
+        "amostras_por_segundo": float(np.median(vazao.por_epoca)),
+        "segundos_treino": time.perf_counter() - inicio,
+    }
+    return ArtefatoLSTM(modelo, scaler, janela_temporal, metadados)
+
+
+def prever_trajetorias(artefato, janelas, passos):
+    """Trajetórias de ``passos`` dias a partir de várias origens, em lote, na escala original: ``[origens, passos]``.
+
+    ``janelas`` são as janelas escaladas de cada origem (``[origens, janela, 1]``).
+    Cada chamada ao modelo prevê o próximo trecho de todas as origens de uma
+    vez, e a previsão é realimentada na janela (previsão recursiva). Um
+    modelo com várias saídas (multi-horizonte direto) avança tantos dias
+    quanto saídas por chamada; o da página tem uma saída, então são
+    ``passos`` chamadas, independentemente do número de origens.
+    """
+    janelas = np.asarray(janelas, dtype=np.float32)
+    origens, janela_temporal = janelas.shape[:2]
+    # Janela e previsões no mesmo buffer: a entrada de cada chamada é uma fatia, sem concatenar arrays
+    buffer = np.empty((origens, janela_temporal + passos, 1), dtype=np.float32)
+    buffer[:, :janela_temporal] = janelas
+    feitos = 0
+    while feitos < passos:
+        saida = np.asarray(artefato.modelo(buffer[:, feitos:feitos + janela_temporal], training=False))
+        avanco = min(saida.shape[1], passos - feitos)
+        buffer[:, janela_temporal + feitos:janela_temporal + feitos + avanco, 0] = saida[:, :avanco]
+        feitos += avanco
+    previsoes = buffer[:, janela_temporal:, 0].reshape(-1, 1)
+    return artefato.scaler.inverse_transform(previsoes).reshape(origens, passos)
+
+
+def prever_recursivo(artefato, precos, passos):
+    """Prevê ``passos`` dias após o fim de ``precos``, realimentando cada previsão na janela."""
+    janela_temporal = artefato.janela_temporal
+    janela = artefato.scaler.transform(np.asarray(precos[-janela_temporal:], dtype=float).reshape(-1, 1))
+    return prever_trajetorias(artefato, janela[None], passos)[0]
+
+
+def erros_por_horizonte(artefato, precos, passos, proporcao_treino=PROPORCAO_TREINO, passo_origens=1):
+    """RMSE e MAE de cada horizonte (1 a ``passos`` dias) das trajetórias que partem das origens do teste.
+
+    As origens são as da página (janelas após os primeiros 80%) que ainda têm
+    ``passos`` preços reais à frente, uma a cada ``passo_origens``; todas as
+    trajetórias saem de uma só ``prever_trajetorias``. O resultado fica em cache por artefato, série e
+    horizonte. Devolve um dict com ``horizonte``, ``rmse``, ``mae`` (arrays)
+    e ``origens`` (0 se o teste for curto demais para o horizonte).
+    """
+    precos = np.asarray(precos, dtype=float)
+    chave = (artefato.diretorio, artefato.versao, calcular_chave(precos.tobytes()), passos, proporcao_treino,
+             passo_origens)
+
+    def calcular():
+        janela_temporal = artefato.janela_temporal
+        inicio = int((len(precos) - janela_temporal) * proporcao_treino)
+        if len(precos) - janela_temporal - passos + 1 <= inicio:
+            vazio = np.empty(0)
+            return {"horizonte": np.arange(1, passos + 1), "rmse": vazio, "mae": vazio, "origens": 0}
+        X, y = criar_janelas(artefato.scaler.transform(precos.reshape(-1, 1)), janela_temporal,
+                             horizontes=range(1, passos + 1))
+        janelas, futuros = X[inicio::passo_origens], y[inicio::passo_origens, :, 0]
+        with etapa("lstm: trajetórias", origens=len(janelas), passos=passos):
+            previstos = prever_trajetorias(artefato, janelas, passos)
+        reais = artefato.scaler.inverse_transform(futuros.reshape(-1, 1)).reshape(previstos.shape)
+        erros = previstos - reais
+        return {"horizonte": np.arange(1, passos + 1), "rmse": np.sqrt(np.mean(erros ** 2, axis=0)),
+                "mae": np.mean(np.abs(erros), axis=0), "origens": len(erros)}
+
+    return cache_trajetorias.obter_ou_calcular(chave, calcular)
+
+
+def listar_versoes(diretorio=DIRETORIO_ARTEFATOS):
+    """Versões disponíveis (números inteiros), em ordem crescente."""
+    if not os.path.isdir(diretorio):
+        return []
+    versoes = []
+    for nome in os.listdir(diretorio):
+        encontrado = re.fullmatch(r"v(\d+)", nome)
+        if encontrado and os.path.exists(os.path.join(diretorio, nome, ARQUIVO_ARTEFATO)):
+            versoes.append(int(encontrado.group(1)))
+    return sorted(versoes)
+
+
+def salvar_artefato(artefato, metadados_extras=None, diretorio=DIRETORIO_ARTEFATOS):
+    """Grava o artefato como uma nova versão e devolve o diretório criado.
+
+    O arquivo ``artefato.json`` é escrito por último; uma versão sem ele é
+    ignorada por ``listar_versoes``, então leitores nunca carregam um artefato
+    pela metade.
+    """
+    import tensorflow as tf
+
+    os.makedirs(diretorio, exist_ok=True)
+    versao = (listar_versoes(diretorio) or [0])[-1] + 1
+    while True:
+        destino = os.path.join(diretorio, f"v{versao:04d}")
+        try:
+            os.makedirs(destino)
+            break
+        except FileExistsError:  # outro processo reservou essa versão ao mesmo tempo
+            versao += 1
+    artefato.modelo.save(os.path.join(destino, ARQUIVO_MODELO))
+    from brent.lstm_numpy import ARQUIVO_PESOS, ModeloNumPy, comparar, exportar_pesos
+
+    caminho_pesos = exportar_pesos(artefato.modelo, os.path.join(destino, ARQUIVO_PESOS))
+    janelas = np.random.default_rng(0).random((256, artefato.janela_temporal, 1), dtype=np.float32)
+
+    metadados = dict(artefato.metadados)
+    metadados.update(metadados_extras or {})
+    metadados["diferenca_numpy"] = comparar(artefato.modelo, ModeloNumPy.carregar(caminho_pesos), janelas)
+    metadados.update({"versao": versao, "criado_em": time.strftime("%Y-%m-%dT%H:%M:%S"), "tensorflow": tf.__version__})
+    with open(os.path.join(destino, ARQUIVO_ARTEFATO), "w", encoding="utf-8") as arquivo:
+        json.dump(metadados, arquivo, ensure_ascii=False, indent=2)
+    artefato.metadados = metadados
+    artefato.diretorio = destino
+    return destino
+
+
+def versao_atual(diretorio=DIRETORIO_ARTEFATOS):
+    """Versão a servir: a fixada em ``BRENT_LSTM_VERSAO`` ou a mais recente (None se não houver)."""
+    if os.environ.get("BRENT_LSTM_VERSAO"):
+        return int(os.environ["BRENT_LSTM_VERSAO"])
+    versoes = listar_versoes(diretorio)
+    return versoes[-1] if versoes else None
+
+
+def motor_padrao():
+    """``BRENT_LSTM_MOTOR`` (``numpy`` ou ``keras``); padrão ``numpy``."""
+    motor = os.environ.get("BRENT_LSTM_MOTOR", "numpy").strip().lower()
+    if motor not in MOTORES:
+        raise ValueError(f"BRENT_LSTM_MOTOR desconhecido: {motor!r} (use um de {list(MOTORES)})")
+    return motor
+
+
+def carregar_artefato(versao=None, diretorio=DIRETORIO_ARTEFATOS, motor=None):
+    """Carrega a versão pedida (por padrão ``versao_atual()``). None se ela não existir.
+
+    Com ``motor="numpy"`` (padrão, ver ``motor_padrao``) e ``pesos.npz`` na
+    versão, o modelo é um ``ModeloNumPy`` e o TensorFlow não é importado;
+    versões antigas, sem ``pesos.npz``, continuam carregando pelo Keras.
+    """
+    versao = versao or versao_atual(diretorio)
+    if versao is None:
+        return None
+    origem = os.path.join(diretorio, f"v{int(versao):04d}")
+    if not os.path.exists(os.path.join(origem, ARQUIVO_ARTEFATO)):
+        return None
+
+    from brent.lstm_numpy import ARQUIVO_PESOS, ModeloNumPy
+
+    with open(os.path.join(origem, ARQUIVO_ARTEFATO), encoding="utf-8") as arquivo:
+        metadados = json.load(arquivo)
+    if (motor or motor_padrao()) == "numpy" and os.path.exists(os.path.join(origem, ARQUIVO_PESOS)):
+        modelo = ModeloNumPy.carregar(os.path.join(origem, ARQUIVO_PESOS))
+    else:
+        from tensorflow.keras.models import load_model
+
+        modelo = load_model(os.path.join(origem, ARQUIVO_MODELO))
+    return ArtefatoLSTM(modelo, scaler_de_parametros(metadados["scaler"]), metadados["janela_temporal"], metadados, origem)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Treina o LSTM da página e grava um artefato versionado.")
+    parser.add_argument("--inicio", default=PERIODO_PADRAO[0], help="data inicial do período (AAAA-MM-DD)")
+    parser.add_argument("--fim", default=PERIODO_PADRAO[1], help="data final do período (AAAA-MM-DD)")
+    parser.add_argument("--janela", type=int, default=JANELA_TEMPORAL, help="janela temporal em dias úteis")
+    parser.add_argument("--epochs", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--validacao", type=float, default=PROPORCAO_VALIDACAO,
+                        help="fração final das janelas de treino usada na validação")
+    parser.add_argument("--paciencia", type=int, default=PACIENCIA, help="épocas sem melhora antes de parar")
+    parser.add_argument("--checkpoint", default=os.path.join(DIRETORIO_ARTEFATOS, "checkpoints", "melhor.weights.h5"),
+                        help="arquivo com os pesos da melhor época ('' para não gravar)")
+    parser.add_argument("--cache", help="cache das janelas de treino: '' em memória ou caminho de um arquivo")
+    parser.add_argument("--threads-intra", type=int, help="threads de cada operação do TensorFlow")
+    parser.add_argument("--threads-inter", type=int, help="threads para operações independentes do TensorFlow")
+    parser.add_argument("--threads-dados", type=int, help="threads do pipeline tf.data")
+    parser.add_argument("--parquet", default=os.path.join(RAIZ, "ipea_brent_20250217.parquet"))
+    args = parser.parse_args()
+    configurar_threads(args.threads_intra, args.threads_inter)
+
+    import pandas as pd
+
+    from brent.cache import hash_dataframe
+
+    df = pd.read_parquet(args.parquet)
+    df_periodo = df[(df["data"] >= pd.to_datetime(args.inicio)) & (df["data"] <= pd.to_datetime(args.fim))]
+    artefato = treinar(df_periodo["preco"].values, args.janela, args.epochs, args.batch_size, verbose=2,
+                       proporcao_validacao=args.validacao, paciencia=args.paciencia, checkpoint=args.checkpoint or None,
+                       cache=args.cache, threads_dados=args.threads_dados)
+    destino = salvar_artefato(artefato, {
+        "periodo": [args.inicio, args.fim],
+        "hash_dados": hash_dataframe(df_periodo[["data", "preco"]]),
+    })
+    metadados = artefato.metadados
+    print(f"Artefato salvo em {destino}: {metadados['epocas_treinadas']}/{args.epochs} épocas, "
+          f"loss final {metadados['loss_final']:.5f}, melhor val_loss {metadados['val_loss_melhor'] or float('nan'):.5f}, "
+          f"{metadados['amostras_por_segundo']:,.0f} amostras/s.")
+
+
+if __name__ == "__main__":
+    main()
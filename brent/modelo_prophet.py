@@ -0,0 +1,242 @@
+"""Ajuste do Prophet com cache persistente em disco e atualização aquecida (warm start).
+
+O modelo ajustado e a saída de ``predict`` são guardados em ``CacheDisco``
+sob uma chave que combina o hash do trecho de treino, os hiperparâmetros, o
+horizonte de previsão e a versão do Prophet. Uma nova carga da página apenas
+desserializa o modelo, sem rodar o otimizador do Stan novamente.
+
+Como a série só cresce (um pregão por dia), um treino novo quase sempre é o
+treino anterior mais alguns dias. Nesse caso o cache tem um modelo
+"defasado": se faltam até ``tolerancia_dias`` observações, ele é reutilizado
+como está; se faltam mais, o Stan é reiniciado a partir dos parâmetros dele
+(``k``, ``m``, ``delta``, ``beta``, ``sigma_obs``) e converge em poucas
+iterações. Cada entrada guarda o tempo do ajuste e o do último ajuste a frio,
+para comparar a atualização diária com o treino completo.
+
+A previsão guardada é só a pontual (``yhat``, tendência e sazonalidades): o
+``predict`` padrão do Prophet simula 1000 trajetórias da tendência para cada
+linha, o que custa mais que o próprio ajuste. Os intervalos de incerteza são
+calculados à parte por ``intervalos``, com o número de amostras escolhido, em
+lotes de linhas e com cache por modelo, datas e número de amostras.
+"""
+import copy
+import json
+import os
+import time
+
+from brent.cache import CacheDisco, calcular_chave, hash_dataframe
+from brent.rastreamento import etapa
+
+cache_prophet = CacheDisco("prophet", max_entradas=10)
+cache_intervalos = CacheDisco("prophet_intervalos", max_entradas=20)
+
+AMOSTRAS_PADRAO = 1000  # O uncertainty_samples padrão do Prophet
+LINHAS_POR_LOTE = 1000  # ~8 MB por componente com 1000 amostras; lotes menores pagam o custo fixo de cada predict
+COLUNAS_INTERVALO = ["yhat_lower", "yhat_upper", "trend_lower", "trend_upper"]
+# Opções da página: rótulo -> número de simulações (0 = só a previsão pontual)
+ROTULOS_AMOSTRAS = {
+    "Sem intervalo (previsão pontual)": 0,
+    "200 simulações": 200,
+    "1000 simulações (padrão do Prophet)": AMOSTRAS_PADRAO,
+}
+
+PARAMETROS_AQUECIMENTO = ("k", "m", "delta", "beta", "sigma_obs")
+
+
+def _futuro_datas(datas):
+    import pandas as pd
+
+    return pd.DataFrame({"ds": pd.to_datetime(pd.Series(datas)).reset_index(drop=True)})
+
+
+def chave_modelo(train, periodos, hiperparametros, datas=None):
+    """Chave do ajuste; com ``datas`` (ver ``ajustar_prophet``), as datas previstas entram no lugar de ``periodos``."""
+    import prophet
+
+    horizonte = periodos if datas is None else hash_dataframe(_futuro_datas(datas))
+    return calcular_chave(
+        "prophet", prophet.__version__, hash_dataframe(train[["ds", "y"]]), hiperparametros, horizonte
+    )
+
+
+def _carregar(diretorio):
+    import pandas as pd
+    from prophet.serialize import model_from_json
+
+    with open(os.path.join(diretorio, "modelo.json"), encoding="utf-8") as arquivo:
+        modelo = model_from_json(arquivo.read())
+    previsoes = pd.read_parquet(os.path.join(diretorio, "previsoes.parquet"))
+    return modelo, previsoes
+
+
+def parametros_iniciais(modelo):
+    """Parâmetros de um Prophet ajustado no formato do ``init`` do Stan (média das amostras, se houver MCMC)."""
+    parametros = {}
+    for nome in PARAMETROS_AQUECIMENTO:
+        valores = modelo.params[nome].mean(axis=0)
+        parametros[nome] = float(valores[0]) if nome in ("k", "m", "sigma_obs") else valores
+    return parametros
+
+
+def prever(modelo, futuro, amostras=0, linhas_por_lote=LINHAS_POR_LOTE):
+    """``predict`` do Prophet com ``amostras`` simulações de incerteza (0: só a previsão pontual).
+
+    As simulações são feitas em lotes de ``linhas_por_lote`` datas, então a
+    memória fica em ``amostras x linhas_por_lote`` por componente, qualquer que
+    seja o horizonte. Os quantis são calculados data a data, então simular os
+    lotes separadamente não muda a distribuição de cada data.
+    """
+    import pandas as pd
+
+    modelo = copy.copy(modelo)  # O modelo pode estar em uso por outra sessão: o original não é alterado
+    modelo.uncertainty_samples = 0
+    previsoes = modelo.predict(futuro)
+    if not amostras:
+        return previsoes
+    modelo.uncertainty_samples = int(amostras)
+    lotes = [modelo.predict(futuro.iloc[inicio:inicio + linhas_por_lote])[COLUNAS_INTERVALO]
+             for inicio in range(0, len(futuro), linhas_por_lote)]
+    intervalos_lotes = pd.concat(lotes, ignore_index=True)
+    for coluna in COLUNAS_INTERVALO:
+        previsoes[coluna] = intervalos_lotes[coluna].to_numpy()
+    return previsoes
+
+
+def intervalos(modelo, chave, datas, amostras=AMOSTRAS_PADRAO, linhas_por_lote=LINHAS_POR_LOTE):
+    """``ds`` e ``COLUNAS_INTERVALO`` para as ``datas``, em cache por modelo (``chave_modelo``), datas e amostras."""
+    import pandas as pd
+
+    futuro = _futuro_datas(datas)
+    chave_intervalos = calcular_chave("intervalos", chave, hash_dataframe(futuro), int(amostras), modelo.interval_width)
+    diretorio = cache_intervalos.obter(chave_intervalos)
+    if diretorio is not None:
+        return pd.read_parquet(os.path.join(diretorio, "intervalos.parquet"))
+
+    with etapa("prophet: amostragem de incerteza", amostras=amostras, linhas=len(futuro)):
+        tabela = prever(modelo, futuro, amostras, linhas_por_lote)[["ds", *COLUNAS_INTERVALO]]
+
+    def escrever(destino):
+        tabela.to_parquet(os.path.join(destino, "intervalos.parquet"))
+
+    cache_intervalos.gravar(chave_intervalos, escrever, {"amostras": int(amostras), "linhas": len(futuro)})
+    return tabela
+
+
+def _treino_e_prefixo(metadados, train):
+    """Se o treino da entrada do cache são as primeiras linhas de ``train``."""
+    n = metadados.get("n_treino", 0)
+    return 0 < n <= len(train) and metadados.get("hash_treino") == hash_dataframe(train[["ds", "y"]].iloc[:n])
+
+
+def _procurar_anterior(train, hiperparametros):
+    """Entrada mais recente do cache cujo treino é um prefixo de ``train``, com os mesmos hiperparâmetros."""
+    import prophet
+
+    hiper = json.dumps(hiperparametros, sort_keys=True)
+    for chave, _, _ in reversed(cache_prophet.entradas()):
+        metadados = cache_prophet.metadados(chave)
+        if (metadados.get("hiperparametros") == hiper and metadados.get("prophet") == prophet.__version__
+                and _treino_e_prefixo(metadados, train)):
+            return chave, metadados
+    return None
+
+
+def ajustar_prophet(train, periodos, hiperparametros=None, origem=None, aquecer=True, tolerancia_dias=0, progresso=None,
+                    datas=None):
+    """Ajusta o Prophet em ``train`` (colunas ``ds``/``y``) e prevê ``periodos`` dias à frente.
+
+    Com ``datas`` (ex.: os pregões do teste), a previsão é feita nas datas do
+    treino seguidas dessas datas, em vez de ``periodos`` dias corridos, e é
+    essa previsão que fica no cache. Devolve ``(modelo, previsoes, info)``. ``info["modo"]`` é ``cache`` (mesmo
+    treino), ``reaproveitado`` (modelo defasado em até ``tolerancia_dias``),
+    ``aquecido`` (reajuste a partir do modelo anterior) ou ``frio``;
+    ``info["segundos"]`` é o tempo gasto e ``info["segundos_frio"]`` o do último
+    ajuste completo. ``origem`` é a impressão digital do dataset completo:
+    quando ela muda, o cache é invalidado; com ``aquecer=True`` ficam só os
+    modelos cujo treino ainda é um prefixo de ``train`` (dados apenas
+    acrescentados), que servem de ponto de partida. ``progresso(fracao, mensagem)``
+    é chamado a cada etapa (ex.: pela fila de ``brent.tarefas``).
+    """
+    import prophet
+    from prophet import Prophet
+    from prophet.serialize import model_to_json
+
+    hiperparametros = dict(hiperparametros or {})
+    progresso = progresso or (lambda *args, **kwargs: None)
+    if origem is not None:
+        # Dados corrigidos no meio da série invalidam os modelos; dados só acrescentados, não
+        cache_prophet.sincronizar_origem(origem, manter=(lambda metadados: _treino_e_prefixo(metadados, train))
+                                         if aquecer else None)
+
+    inicio = time.perf_counter()
+    chave = chave_modelo(train, periodos, hiperparametros, datas)
+    diretorio = cache_prophet.obter(chave)
+    if diretorio is not None:
+        modelo, previsoes = _carregar(diretorio)
+        metadados = cache_prophet.metadados(chave)
+        return modelo, previsoes, {"modo": "cache", "cache": True, "segundos": time.perf_counter() - inicio,
+                                   "segundos_ajuste": metadados.get("segundos_ajuste"),
+                                   "segundos_frio": metadados.get("segundos_frio")}
+
+    progresso(0.05, "Procurando um ajuste anterior no cache")
+    anterior = _procurar_anterior(train, hiperparametros) if aquecer else None
+    segundos_frio = None
+    if anterior is not None and len(train) - anterior[1]["n_treino"] <= tolerancia_dias:
+        # Poucos dias novos: o modelo anterior ainda vale, só a previsão é refeita
+        modelo, _ = _carregar(cache_prophet.caminho(anterior[0]))
+        modo, segundos_frio = "reaproveitado", anterior[1].get("segundos_frio")
+    elif anterior is not None:
+        progresso(0.1, "Reajustando o Prophet a partir do ajuste anterior")
+        modelo_anterior, _ = _carregar(cache_prophet.caminho(anterior[0]))
+        modelo = Prophet(**hiperparametros)
+        with etapa("prophet: fit", modo="aquecido", linhas=len(train)):
+            modelo.fit(train, init=parametros_iniciais(modelo_anterior))
+        modo, segundos_frio = "aquecido", anterior[1].get("segundos_frio")
+    else:
+        progresso(0.1, "Ajustando o Prophet (treino completo)")
+        modelo = Prophet(**hiperparametros)
+        with etapa("prophet: fit", modo="frio", linhas=len(train)):
+            modelo.fit(train)
+        modo = "frio"
+    segundos_ajuste = time.perf_counter() - inicio
+    if modo == "frio":
+        segundos_frio = segundos_ajuste
+
+    progresso(0.8, "Calculando as previsões")
+    import pandas as pd
+
+    if datas is not None:
+        futuro = pd.concat([train[["ds"]].reset_index(drop=True), _futuro_datas(datas)], ignore_index=True)
+    elif modo == "reaproveitado":
+        # O histórico do modelo termina antes do treino: o futuro parte do fim do treino atual
+        datas_futuras = pd.date_range(train["ds"].max(), periods=periodos + 1, freq="D")[1:]
+        futuro = pd.DataFrame({"ds": pd.concat([train["ds"], pd.Series(datas_futuras)], ignore_index=True)})
+    else:
+        futuro = modelo.make_future_dataframe(periods=periodos)
+    with etapa("prophet: predict", linhas=len(futuro)):
+        previsoes = prever(modelo, futuro)  # Só a previsão pontual; intervalos sob demanda (``intervalos``)
+    segundos = time.perf_counter() - inicio
+
+    progresso(0.95, "Salvando no cache")
+
+    def escrever(destino):
+        with open(os.path.join(destino, "modelo.json"), "w", encoding="utf-8") as arquivo:
+            arquivo.write(model_to_json(modelo))
+        previsoes.to_parquet(os.path.join(destino, "previsoes.parquet"))
+
+    # Um modelo reaproveitado não foi ajustado neste treino: guarda o prefixo com que foi ajustado
+    n_treino = anterior[1]["n_treino"] if modo == "reaproveitado" else len(train)
+    cache_prophet.gravar(chave, escrever, {
+        "hiperparametros": json.dumps(hiperparametros, sort_keys=True),
+        "prophet": prophet.__version__,
+        "periodos": periodos if datas is None else len(futuro) - len(train),
+        "n_treino": n_treino,
+        "hash_treino": hash_dataframe(train[["ds", "y"]].iloc[:n_treino]),
+        "treino_inicio": train["ds"].iloc[0],
+        "treino_fim": train["ds"].iloc[-1],
+        "modo": modo,
+        "segundos_ajuste": segundos_ajuste,
+        "segundos_frio": segundos_frio,
+    })
+    return modelo, previsoes, {"modo": modo, "cache": False, "segundos": segundos, "segundos_ajuste": segundos_ajuste,
+                               "segundos_frio": segundos_frio}
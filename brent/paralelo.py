@@ -0,0 +1,74 @@
+"""Pool de processos para trabalhos pesados em lote (backtest, busca de ordens, hiperparâmetros).
+
+Os processos são criados com ``spawn`` (o TensorFlow e o Stan não convivem
+bem com ``fork``) e cada um usa uma única thread de BLAS/OpenMP/TensorFlow:
+o paralelismo vem de rodar vários ajustes ao mesmo tempo, e não de cada
+ajuste disputar todos os núcleos com os outros.
+
+Os limites valem só nos processos filhos: eles nascem com as variáveis de
+``LIMITES_THREADS`` no ambiente, lidas antes de importarem numpy/TensorFlow,
+e o ambiente do processo pai (ex.: o servidor do Streamlit) não muda.
+"""
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.context import SpawnContext, SpawnProcess
+
+LIMITES_THREADS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS", "TF_NUM_INTRAOP_THREADS",
+                   "TF_NUM_INTEROP_THREADS")
+AMBIENTE_PADRAO = {"TF_CPP_MIN_LOG_LEVEL": "3"}  # Só quando o pai não define a variável
+
+# O ambiente é do processo inteiro: dois pools iniciando processos ao mesmo tempo não se misturam
+_trava_ambiente = threading.Lock()
+
+
+def processos_padrao(tarefas=None):
+    """Número de processos: os núcleos disponíveis, sem passar do número de tarefas."""
+    nucleos = os.cpu_count() or 1
+    return max(1, min(nucleos, tarefas)) if tarefas else nucleos
+
+
+def ambiente_filhos(threads=1):
+    """Variáveis de ambiente com que os processos do pool nascem."""
+    ambiente = {variavel: valor for variavel, valor in AMBIENTE_PADRAO.items() if variavel not in os.environ}
+    ambiente.update({variavel: str(threads) for variavel in LIMITES_THREADS})
+    return ambiente
+
+
+class ProcessoLimitado(SpawnProcess):
+    """Processo ``spawn`` que nasce com ``ambiente_filhos(threads)``."""
+
+    threads = 1
+
+    def start(self):
+        # O filho copia o ambiente ao ser criado: as variáveis ficam no pai só durante o início do processo
+        with _trava_ambiente:
+            ambiente = ambiente_filhos(self.threads)
+            anteriores = {variavel: os.environ.get(variavel) for variavel in ambiente}
+            os.environ.update(ambiente)
+            try:
+                super().start()
+            finally:
+                for variavel, valor in anteriores.items():
+                    if valor is None:
+                        os.environ.pop(variavel, None)
+                    else:
+                        os.environ[variavel] = valor
+
+
+class ContextoLimitado(SpawnContext):
+    """Contexto ``spawn`` do pool; os processos usam ``threads`` threads de BLAS/TensorFlow."""
+
+    def __init__(self, threads=1):
+        super().__init__()
+        self.threads = threads
+
+    def Process(self, *args, **kwargs):  # noqa: N802 - nome usado pelo ProcessPoolExecutor
+        processo = ProcessoLimitado(*args, **kwargs)
+        processo.threads = self.threads
+        return processo
+
+
+def criar_pool(processos, threads=1):
+    """``ProcessPoolExecutor`` com ``spawn`` e ``threads`` threads de BLAS/TensorFlow por processo."""
+    return ProcessPoolExecutor(max_workers=processos, mp_context=ContextoLimitado(threads))
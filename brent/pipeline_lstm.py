@@ -0,0 +1,143 @@
+"""Pipeline de treino do LSTM com ``tf.data``: janelas geradas sob demanda, validação e parada antecipada.
+
+O treino antigo materializava todas as janelas em um array denso (janela x
+amostras floats) e rodava sempre as 20 épocas. Aqui só a série escalada fica
+em memória, como um tensor float32; cada lote é montado na hora a partir dos
+índices de origem das janelas:
+
+- ``Dataset.range`` com as origens, embaralhadas a cada época (só inteiros no
+  buffer do ``shuffle``, nunca janelas inteiras);
+- ``batch`` das origens e ``map`` com um ``tf.gather`` que monta o lote de
+  janelas ``[lote, janela, 1]`` e os alvos, em paralelo (``AUTOTUNE``);
+- ``cache`` do conjunto de validação (fixo entre as épocas) e, opcionalmente,
+  do treino em memória ou em arquivo; o cache guarda as janelas na ordem das
+  origens, e o embaralhamento vem depois dele (com cache, o buffer do
+  ``shuffle`` passa a guardar janelas);
+- ``prefetch``, para montar o próximo lote enquanto o modelo treina no atual.
+
+A validação são as últimas janelas do treino, em ordem cronológica, e nunca
+as do teste da página. ``EarlyStopping`` para o treino quando o loss de
+validação deixa de cair e, parando ou não, restaura os melhores pesos; ``ModelCheckpoint``
+grava esses pesos em disco, se pedido. O ``Vazao`` mede amostras por segundo
+a cada época.
+"""
+import os
+import time
+
+import numpy as np
+
+PROPORCAO_VALIDACAO = 0.1
+PACIENCIA = 3
+
+
+def configurar_threads(intra=None, inter=None):
+    """Pools de threads do TensorFlow (operações e entre operações); 0 ou None deixa a escolha com o TF.
+
+    Só tem efeito antes de o runtime do TensorFlow ser iniciado; depois disso
+    (ex.: um segundo treino no mesmo processo) os pools atuais são mantidos.
+    Devolve os valores em uso.
+    """
+    import tensorflow as tf
+
+    try:
+        if intra:
+            tf.config.threading.set_intra_op_parallelism_threads(int(intra))
+        if inter:
+            tf.config.threading.set_inter_op_parallelism_threads(int(inter))
+    except RuntimeError:  # Runtime já iniciado: o TF não permite trocar os pools
+        pass
+    return (tf.config.threading.get_intra_op_parallelism_threads(),
+            tf.config.threading.get_inter_op_parallelism_threads())
+
+
+def criar_dataset(serie, janela_temporal, origens, batch_size=32, embaralhar=False, cache=None,
+                  threads_dados=None, semente=None):
+    """``tf.data.Dataset`` de lotes ``(X, y)`` com as janelas que começam nos índices ``origens`` (um ``range``).
+
+    ``serie`` é a série escalada (n,) ou (n, 1); a janela de origem ``i`` é
+    ``serie[i:i + janela_temporal]`` e o alvo é ``serie[i + janela_temporal]``,
+    como em ``brent.janelas.criar_sequencias``. ``cache`` é None (sem cache),
+    ``""`` (memória) ou o caminho de um arquivo. ``threads_dados`` fixa o pool
+    de threads privado do pipeline.
+    """
+    import tensorflow as tf
+
+    serie = tf.constant(np.asarray(serie, dtype=np.float32).reshape(-1))
+    deslocamentos = tf.range(janela_temporal, dtype=tf.int64)
+
+    def montar_lote(inicio):
+        X = tf.gather(serie, inicio[:, None] + deslocamentos)[..., None]
+        return X, tf.gather(serie, inicio + janela_temporal)
+
+    dataset = tf.data.Dataset.range(origens.start, origens.stop)
+    if cache is None:
+        if embaralhar:
+            dataset = dataset.shuffle(len(origens), seed=semente, reshuffle_each_iteration=True)
+        dataset = dataset.batch(batch_size).map(montar_lote, num_parallel_calls=tf.data.AUTOTUNE)
+    else:
+        # O cache guarda as janelas na ordem das origens; o embaralhamento e os lotes vêm depois dele, senão a
+        # ordem da primeira época seria repetida em todas
+        dataset = dataset.batch(batch_size).map(montar_lote, num_parallel_calls=tf.data.AUTOTUNE).unbatch()
+        dataset = dataset.cache(cache)
+        if embaralhar:
+            dataset = dataset.shuffle(len(origens), seed=semente, reshuffle_each_iteration=True)
+        dataset = dataset.batch(batch_size)
+    if threads_dados:
+        opcoes = tf.data.Options()
+        opcoes.threading.private_threadpool_size = int(threads_dados)
+        dataset = dataset.with_options(opcoes)
+    return dataset.prefetch(tf.data.AUTOTUNE)
+
+
+def dividir_origens(amostras, proporcao_treino, proporcao_validacao=PROPORCAO_VALIDACAO):
+    """Origens de treino e de validação (as últimas janelas do treino) entre as ``amostras`` janelas da série."""
+    total = int(amostras * proporcao_treino)
+    validacao = int(total * proporcao_validacao)
+    return range(0, total - validacao), range(total - validacao, total)
+
+
+def callback_vazao(amostras_por_epoca):
+    """Callback do Keras que mede amostras de treino por segundo em cada época (``logs["amostras_s"]``)."""
+    from tensorflow.keras.callbacks import Callback
+
+    class Vazao(Callback):
+        def __init__(self):
+            super().__init__()
+            self.por_epoca = []
+
+        def on_epoch_begin(self, epoca, logs=None):
+            self._inicio = time.perf_counter()
+
+        def on_epoch_end(self, epoca, logs=None):
+            # A validação roda no fim da época e fica fora da conta
+            vazao = amostras_por_epoca / max(self._fim_treino - self._inicio, 1e-9)
+            self.por_epoca.append(vazao)
+            if logs is not None:
+                logs["amostras_s"] = vazao
+
+        def on_train_batch_end(self, lote, logs=None):
+            self._fim_treino = time.perf_counter()
+
+    return Vazao()
+
+
+def callbacks_treino(paciencia=PACIENCIA, checkpoint=None):
+    """``EarlyStopping`` no loss de validação (com os melhores pesos restaurados) e, se pedido, ``ModelCheckpoint``.
+
+    No Keras 2 o ``EarlyStopping`` só restaura os melhores pesos quando para
+    o treino antes de ``epochs``; aqui eles são restaurados também ao fim de
+    um treino que chegou à última época.
+    """
+    from tensorflow.keras.callbacks import EarlyStopping, ModelCheckpoint
+
+    class ParadaAntecipada(EarlyStopping):
+        def on_train_end(self, logs=None):
+            super().on_train_end(logs)
+            if self.restore_best_weights and self.best_weights is not None:
+                self.model.set_weights(self.best_weights)
+
+    callbacks = [ParadaAntecipada(monitor="val_loss", patience=paciencia, restore_best_weights=True)]
+    if checkpoint:
+        os.makedirs(os.path.dirname(checkpoint) or ".", exist_ok=True)
+        callbacks.append(ModelCheckpoint(checkpoint, monitor="val_loss", save_best_only=True, save_weights_only=True))
+    return callbacks
@@ -0,0 +1,232 @@
+"""Rastreamento leve das etapas de cada rerun (spans) e ganchos de profiling.
+
+O script do Streamlit chama ``iniciar()`` no topo de cada execução e envolve
+as etapas caras em ``with etapa("nome"):``. Cada etapa vira um span com
+início, duração, profundidade (etapas dentro de etapas) e thread. Fora de um
+rastro (scripts, backtest, benchmarks) ``etapa`` não registra nada e custa
+apenas uma consulta a um ``ContextVar``.
+
+O rastro atual fica em um ``ContextVar``: cada sessão do Streamlit roda o
+script na própria thread, então os spans de sessões diferentes não se
+misturam. A fila de treinos (``brent.tarefas``) executa as tarefas no
+contexto de quem as submeteu, e as etapas do ajuste aparecem no rastro do
+rerun que pediu o treino, na linha da thread do pool.
+
+Exportação no formato Trace Event do Chrome (``chrome://tracing``, Perfetto,
+speedscope) com ``Rastro.exportar_chrome``. Para ver além das etapas,
+``Perfilador`` grava um perfil do rerun com ``cProfile`` (``.prof``, para
+``pstats``/snakeviz) ou ``pyinstrument`` (``.html``), se estiver instalado.
+
+``painel(st, rastro)`` monta o painel oculto dos apps (``?rastro=1`` na URL),
+com a tabela de etapas, o profiling do próximo rerun e a exportação.
+"""
+import contextvars
+import importlib.util
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DIRETORIO_RASTROS = os.environ.get("BRENT_RASTROS_DIR", os.path.join(RAIZ, "artefatos", "rastros"))
+FERRAMENTAS = ("cprofile", "pyinstrument")
+
+_rastro_atual = contextvars.ContextVar("brent_rastro", default=None)
+_profundidade = contextvars.ContextVar("brent_rastro_profundidade", default=0)
+
+
+class Rastro:
+    """Spans de uma execução do script, com o relógio zerado no início."""
+
+    def __init__(self, nome="rerun"):
+        self.nome = nome
+        self.iniciado_em = time.time()
+        self.inicio = time.perf_counter()
+        self.fim = None
+        self.spans = []
+        self.thread = threading.current_thread()
+        self._trava = threading.Lock()
+
+    def registrar(self, nome, inicio, fim, profundidade=0, atributos=None):
+        thread = threading.current_thread()
+        with self._trava:  # Etapas de treinos chegam das threads da fila
+            self.spans.append({"nome": nome, "inicio": inicio - self.inicio, "duracao": fim - inicio,
+                               "profundidade": profundidade, "thread": thread.name, "tid": thread.ident,
+                               "atributos": atributos or {}})
+
+    def encerrar(self):
+        if self.fim is None:
+            self.fim = time.perf_counter()
+        return self
+
+    @property
+    def segundos(self):
+        return (self.fim or time.perf_counter()) - self.inicio
+
+    def tabela(self):
+        """Spans em ordem de início, com durações em ms e a fração do rerun."""
+        with self._trava:
+            spans = sorted(self.spans, key=lambda span: (span["inicio"], -span["duracao"]))
+        total = max(self.segundos, 1e-9)
+        return [{"etapa": "  " * span["profundidade"] + span["nome"], "inicio_ms": span["inicio"] * 1000,
+                 "duracao_ms": span["duracao"] * 1000, "fracao": span["duracao"] / total, "thread": span["thread"]}
+                for span in spans]
+
+    def eventos_chrome(self):
+        """Spans no formato Trace Event (eventos completos ``ph: X``, tempos em microssegundos)."""
+        base_us = self.iniciado_em * 1e6
+        pid = os.getpid()
+        with self._trava:
+            spans = list(self.spans)
+        eventos = [{"name": self.nome, "cat": "rerun", "ph": "X", "ts": base_us, "dur": self.segundos * 1e6,
+                    "pid": pid, "tid": self.thread.ident}]
+        eventos += [{"name": span["nome"], "cat": "etapa", "ph": "X", "ts": base_us + span["inicio"] * 1e6,
+                     "dur": span["duracao"] * 1e6, "pid": pid, "tid": span["tid"],
+                     "args": {chave: str(valor) for chave, valor in span["atributos"].items()}}
+                    for span in spans]
+        nomes_threads = {self.thread.ident: self.thread.name, **{span["tid"]: span["thread"] for span in spans}}
+        eventos += [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": nome}}
+                    for tid, nome in nomes_threads.items()]
+        return {"traceEvents": eventos, "displayTimeUnit": "ms"}
+
+    def exportar_chrome(self, caminho=None):
+        """Grava o rastro em JSON (Trace Event) e devolve o caminho."""
+        caminho = caminho or os.path.join(DIRETORIO_RASTROS, f"{self.nome}-{_carimbo(self.iniciado_em)}.json")
+        os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+        with open(caminho, "w", encoding="utf-8") as arquivo:
+            json.dump(self.eventos_chrome(), arquivo, ensure_ascii=False)
+        return caminho
+
+
+def _carimbo(instante):
+    return time.strftime("%Y%m%d-%H%M%S", time.localtime(instante)) + f"-{int(instante * 1000) % 1000:03d}"
+
+
+def iniciar(nome="rerun"):
+    """Novo rastro para a execução atual (substitui o da execução anterior neste contexto)."""
+    rastro = Rastro(nome)
+    _rastro_atual.set(rastro)
+    _profundidade.set(0)
+    return rastro
+
+
+def atual():
+    return _rastro_atual.get()
+
+
+@contextmanager
+def etapa(nome, **atributos):
+    """Span em volta de um bloco; sem rastro ativo, não faz nada."""
+    rastro = _rastro_atual.get()
+    if rastro is None:
+        yield
+        return
+    profundidade = _profundidade.get()
+    token = _profundidade.set(profundidade + 1)
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        fim = time.perf_counter()
+        _profundidade.reset(token)
+        rastro.registrar(nome, inicio, fim, profundidade, atributos)
+
+
+def ferramentas_disponiveis():
+    """Profilers que podem ser usados neste ambiente (o pyinstrument é opcional)."""
+    return [ferramenta for ferramenta in FERRAMENTAS
+            if ferramenta == "cprofile" or importlib.util.find_spec(ferramenta) is not None]
+
+
+class Perfilador:
+    """Perfil de um trecho de execução com cProfile ou pyinstrument, gravado em ``DIRETORIO_RASTROS``."""
+
+    def __init__(self, ferramenta="cprofile"):
+        if ferramenta not in FERRAMENTAS:
+            raise ValueError(f"Profiler desconhecido: {ferramenta!r} (use um de {list(FERRAMENTAS)})")
+        self.ferramenta = ferramenta
+        self.iniciado_em = None
+        self._perfil = None
+
+    def iniciar(self):
+        self.iniciado_em = time.time()
+        if self.ferramenta == "cprofile":
+            import cProfile
+
+            self._perfil = cProfile.Profile()
+            self._perfil.enable()
+        else:
+            from pyinstrument import Profiler
+
+            self._perfil = Profiler()
+            self._perfil.start()
+        return self
+
+    def parar(self, caminho=None):
+        """Para o profiler e grava o perfil (``.prof`` ou ``.html``); devolve o caminho."""
+        if self._perfil is None:
+            return None
+        extensao = "prof" if self.ferramenta == "cprofile" else "html"
+        caminho = caminho or os.path.join(DIRETORIO_RASTROS, f"perfil-{_carimbo(self.iniciado_em)}.{extensao}")
+        os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+        perfil, self._perfil = self._perfil, None
+        if self.ferramenta == "cprofile":
+            perfil.disable()
+            perfil.dump_stats(caminho)
+        else:
+            perfil.stop()
+            with open(caminho, "w", encoding="utf-8") as arquivo:
+                arquivo.write(perfil.output_html())
+        return caminho
+
+
+class Painel:
+    """Painel oculto de tempos de um app do Streamlit; só aparece com ``?rastro=1`` na URL.
+
+    Criado no topo do script (depois do ``set_page_config``): se o rerun
+    anterior pediu, o profiler já começa aqui. ``exibir()`` fecha o rastro e
+    desenha o painel na barra lateral; é chamado no fim do script e antes de
+    cada ``st.stop()``, e só desenha uma vez por rerun.
+    """
+
+    def __init__(self, st, rastro):
+        self.st = st
+        self.rastro = rastro
+        self.container = st.sidebar.container() if st.query_params.get("rastro") == "1" else None
+        self.perfilador = None
+        self._exibido = False
+        if self.container is not None and st.session_state.pop("perfilar_rerun", False):
+            self.perfilador = Perfilador(st.session_state.get("ferramenta_perfil", "cprofile")).iniciar()
+
+    @property
+    def ativo(self):
+        return self.container is not None
+
+    def exibir(self):
+        """Tempo de cada etapa deste rerun, profiling do próximo rerun e exportação do rastro (Trace Event)."""
+        if self.container is None or self._exibido:
+            return
+        import pandas as pd
+
+        st, rastro = self.st, self.rastro
+        self._exibido = True
+        rastro.encerrar()
+        caminho_perfil = self.perfilador.parar() if self.perfilador is not None else None
+        with self.container.expander("⏱ Etapas deste rerun", expanded=True):
+            st.caption(f"Rerun em {rastro.segundos * 1000:.0f} ms")
+            etapas = pd.DataFrame(rastro.tabela(), columns=["etapa", "inicio_ms", "duracao_ms", "fracao", "thread"])
+            st.dataframe(etapas[["etapa", "duracao_ms", "fracao", "thread"]].style.format(
+                {"duracao_ms": "{:.1f}", "fracao": "{:.0%}"}), hide_index=True, use_container_width=True)
+            if caminho_perfil:
+                st.caption(f"Perfil gravado em `{caminho_perfil}`")
+            st.selectbox("Profiler", ferramentas_disponiveis(), key="ferramenta_perfil")
+            st.button("Perfilar o próximo rerun", key="perfilar",
+                      on_click=lambda: st.session_state.update({"perfilar_rerun": True}))
+            if st.button("Exportar rastro (Chrome trace)", key="exportar_rastro"):
+                st.caption(f"Rastro gravado em `{rastro.exportar_chrome()}`")
+
+
+def painel(st, rastro):
+    """``Painel`` do app para o ``rastro`` deste rerun (``st`` é o módulo ``streamlit``)."""
+    return Painel(st, rastro)
@@ -0,0 +1,150 @@
+"""Redução de pontos (level of detail) para gráficos de séries longas.
+
+Um gráfico de ``largura_px`` pixels não mostra mais do que algumas centenas
+de pontos por pixel; mandar os ~10 mil pontos diários de 1987–2025 ao
+navegador só aumenta o payload. Aqui a série é reduzida a um orçamento de
+pontos proporcional à largura do gráfico com
+
+- ``lttb``: Largest-Triangle-Three-Buckets, que preserva a forma visual;
+- ``minmax``: mínimo e máximo de cada balde, que preserva a envoltória.
+
+Em ambos os casos o máximo e o mínimo do trecho (ex.: o pico de 2008 e o vale
+de 2020) são sempre mantidos. Para a série completa, ``Piramide`` guarda
+reduções em várias resoluções (256, 512, 1024, ... pontos), calculadas uma
+vez; um zoom em um intervalo só escolhe o nível adequado e recorta por busca
+binária.
+"""
+import numpy as np
+
+from brent.cache import CacheMemoria
+
+# Largura máxima do conteúdo do app (ver o CSS .block-container em app1844.py)
+LARGURA_PADRAO_PX = 1400
+
+
+def orcamento_pontos(largura_px=LARGURA_PADRAO_PX, pontos_por_pixel=1.0, minimo=200):
+    """Quantidade de pontos a desenhar para um gráfico com essa largura."""
+    return max(minimo, int(largura_px * pontos_por_pixel))
+
+
+def _como_float(x):
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype("datetime64[ns]").view(np.int64).astype(np.float64)
+    return x.astype(np.float64, copy=False)
+
+
+def lttb_indices(x, y, n):
+    """Índices escolhidos pelo LTTB para reduzir (x, y) a ``n`` pontos."""
+    total = len(y)
+    if n >= total:
+        return np.arange(total)
+    if n < 3:
+        return np.array([0, total - 1])[:max(n, 0)]
+    x, y = _como_float(x), np.asarray(y, dtype=np.float64)
+
+    # n - 2 baldes entre o primeiro e o último ponto, que são sempre mantidos
+    bordas = np.linspace(1, total - 1, n - 1).astype(np.int64)
+    indices = np.empty(n, dtype=np.int64)
+    indices[0], indices[-1] = 0, total - 1
+    anterior = 0
+    for i in range(n - 2):
+        inicio, fim = bordas[i], bordas[i + 1]
+        if i + 2 < len(bordas):
+            media_x = x[fim:bordas[i + 2]].mean()
+            media_y = y[fim:bordas[i + 2]].mean()
+        else:
+            media_x, media_y = x[-1], y[-1]
+        # Área do triângulo (ponto escolhido no balde anterior, candidato, média do próximo balde)
+        area = np.abs((x[anterior] - media_x) * (y[inicio:fim] - y[anterior])
+                      - (x[anterior] - x[inicio:fim]) * (media_y - y[anterior]))
+        anterior = inicio + int(np.argmax(area))
+        indices[i + 1] = anterior
+    return indices
+
+
+def minmax_indices(y, n):
+    """Índices do mínimo e do máximo de cada um de ``n // 2`` baldes (vetorizado)."""
+    y = np.asarray(y, dtype=np.float64)
+    total = len(y)
+    baldes = n // 2
+    if baldes < 1 or n >= total:
+        return np.arange(total)
+    inicios = (np.arange(baldes) * total) // baldes
+    balde = np.repeat(np.arange(baldes), np.diff(np.append(inicios, total)))
+    posicoes = np.arange(total)
+    maximos = np.maximum.reduceat(y, inicios)
+    minimos = np.minimum.reduceat(y, inicios)
+    # Primeira posição de cada balde em que o valor é o máximo (ou o mínimo) do balde
+    idx_max = np.minimum.reduceat(np.where(y == maximos[balde], posicoes, total), inicios)
+    idx_min = np.minimum.reduceat(np.where(y == minimos[balde], posicoes, total), inicios)
+    return np.unique(np.concatenate(([0, total - 1], idx_max, idx_min)))
+
+
+def reduzir(x, y, n, metodo="lttb"):
+    """Índices (ordenados) de no máximo ~``n`` pontos de (x, y), sempre com o máximo e o mínimo."""
+    y = np.asarray(y)
+    if len(y) == 0:
+        return np.arange(0)
+    if metodo == "lttb":
+        indices = lttb_indices(x, y, n)
+    elif metodo == "minmax":
+        indices = minmax_indices(y, n)
+    else:
+        raise ValueError(f"Método de redução desconhecido: {metodo!r} (use 'lttb' ou 'minmax')")
+    return np.union1d(indices, [int(np.nanargmax(y)), int(np.nanargmin(y))])
+
+
+class Piramide:
+    """Reduções de uma série longa em resoluções crescentes (potências de 2), calculadas sob demanda."""
+
+    def __init__(self, x, y, metodo="lttb", menor_nivel=256):
+        self.x = np.asarray(x)
+        self.y = np.asarray(y)
+        self.metodo = metodo
+        self.menor_nivel = menor_nivel
+        self._niveis = {}
+
+    def nivel(self, pontos):
+        if pontos not in self._niveis:
+            self._niveis[pontos] = reduzir(self.x, self.y, pontos, self.metodo)
+        return self._niveis[pontos]
+
+    def indices(self, a, b, orcamento):
+        """Índices (absolutos) para desenhar as posições [a, b) com cerca de ``orcamento`` pontos."""
+        if b - a <= orcamento:
+            return np.arange(a, b)
+        fracao = (b - a) / len(self.y)
+        pontos = self.menor_nivel
+        # Menor nível que ainda tem pelo menos ``orcamento`` pontos dentro de [a, b)
+        while pontos * fracao < orcamento and pontos < len(self.y):
+            pontos *= 2
+        if pontos >= len(self.y):
+            return reduzir(self.x[a:b], self.y[a:b], orcamento, self.metodo) + a
+        nivel = self.nivel(pontos)
+        recorte = nivel[np.searchsorted(nivel, a):np.searchsorted(nivel, b)]
+        trecho = self.y[a:b]
+        extremos = [a, b - 1, a + int(np.nanargmax(trecho)), a + int(np.nanargmin(trecho))]
+        return np.union1d(recorte, extremos)
+
+
+cache_piramides = CacheMemoria(max_entradas=8)
+
+
+def piramide_da_serie(serie, metodo="lttb"):
+    """Pirâmide da série completa, compartilhada entre reruns e sessões."""
+    return cache_piramides.obter_ou_calcular(
+        (serie.impressao_digital, metodo), lambda: Piramide(serie.datas, serie.precos, metodo))
+
+
+def indices_para_grafico(serie, inicio=None, fim=None, largura_px=LARGURA_PADRAO_PX, metodo="lttb"):
+    """Posições, relativas ao intervalo [inicio, fim], dos pontos a desenhar da série completa."""
+    a, b = serie.posicoes(inicio, fim)
+    return piramide_da_serie(serie, metodo).indices(a, b, orcamento_pontos(largura_px)) - a
+
+
+def reduzir_xy(x, y, largura_px=LARGURA_PADRAO_PX, metodo="lttb"):
+    """(x, y) reduzidos ao orçamento de pontos do gráfico, para séries que não estão em uma pirâmide."""
+    x, y = np.asarray(x), np.asarray(y)
+    indices = reduzir(x, y, orcamento_pontos(largura_px), metodo)
+    return x[indices], y[indices]
@@ -0,0 +1,134 @@
+"""Tabela de estatísticas por ano, calculada uma vez na carga dos dados.
+
+Cada linha guarda contagem, média, desvio padrão, mínimo, quartis, máximo,
+limites dos bigodes (1,5 × IQR, como no boxplot do matplotlib/seaborn) e os
+outliers do ano. Com ela:
+
+- o boxplot é desenhado direto das estatísticas (``Axes.bxp``), sem percorrer
+  as linhas diárias;
+- ``descrever`` responde a qualquer intervalo contínuo de anos combinando as
+  linhas: contagem, média, desvio, mínimo e máximo são combinados de forma
+  exata (fórmula de Chan para a variância). Os quartis vêm de um
+  ``np.percentile`` sobre os valores dos anos do intervalo, que ficam
+  contíguos em ``valores_ordenados``: é uma seleção (``np.partition``), O(n),
+  sem reordenar os anos.
+"""
+import numpy as np
+import pandas as pd
+
+ROTULOS_DESCRICAO = ["count", "mean", "std", "min", "25%", "50%", "75%", "max"]
+
+
+class ResumoAnual:
+    """Estatísticas por ano de uma ``SerieBrent``."""
+
+    def __init__(self, tabela, valores_ordenados, inicios):
+        self.tabela = tabela
+        # Preços de todos os anos, ordenados dentro de cada ano; o ano i ocupa inicios[i]:inicios[i + 1]
+        self.valores_ordenados = valores_ordenados
+        self.inicios = inicios
+
+    @classmethod
+    def de_serie(cls, serie, whis=1.5):
+        anos = np.asarray(serie.anos)
+        precos = np.asarray(serie.precos, dtype=np.float64)
+        ordem = np.lexsort((precos, anos))
+        valores = precos[ordem]
+        valores.flags.writeable = False
+        anos_unicos, inicios, contagens = np.unique(anos[ordem], return_index=True, return_counts=True)
+        inicios = np.append(inicios, len(valores))
+
+        linhas = []
+        for i, ano in enumerate(anos_unicos):
+            v = valores[inicios[i]:inicios[i + 1]]
+            q1, mediana, q3 = np.percentile(v, [25, 50, 75])
+            iqr = q3 - q1
+            dentro = v[(v >= q1 - whis * iqr) & (v <= q3 + whis * iqr)]
+            linhas.append({
+                "ano": int(ano),
+                "contagem": int(contagens[i]),
+                "media": v.mean(),
+                "desvio": v.std(ddof=1) if len(v) > 1 else np.nan,
+                "m2": ((v - v.mean()) ** 2).sum(),
+                "minimo": v[0],
+                "q1": q1,
+                "mediana": mediana,
+                "q3": q3,
+                "maximo": v[-1],
+                "bigode_inferior": dentro.min() if len(dentro) else q1,
+                "bigode_superior": dentro.max() if len(dentro) else q3,
+                "outliers": v[(v < q1 - whis * iqr) | (v > q3 + whis * iqr)],
+            })
+        tabela = pd.DataFrame(linhas).set_index("ano")
+        return cls(tabela, valores, inicios)
+
+    @property
+    def anos(self):
+        return self.tabela.index
+
+    def _posicoes(self, ano_inicial, ano_final):
+        anos = self.tabela.index.to_numpy()
+        a = int(np.searchsorted(anos, ano_inicial, "left"))
+        b = int(np.searchsorted(anos, ano_final, "right"))
+        return a, max(a, b)
+
+    def intervalo(self, ano_inicial, ano_final):
+        """Linhas da tabela entre os dois anos (inclusive)."""
+        a, b = self._posicoes(ano_inicial, ano_final)
+        return self.tabela.iloc[a:b]
+
+    def descrever(self, ano_inicial, ano_final):
+        """Equivalente a ``df_filtrado["preco"].describe()`` para o intervalo de anos."""
+        a, b = self._posicoes(ano_inicial, ano_final)
+        linhas = self.tabela.iloc[a:b]
+        if linhas.empty:
+            return pd.Series([0] + [np.nan] * 7, index=ROTULOS_DESCRICAO, name="preco")
+        if len(linhas) == 1:
+            linha = linhas.iloc[0]
+            valores = [linha.contagem, linha.media, linha.desvio, linha.minimo, linha.q1, linha.mediana, linha.q3, linha.maximo]
+            return pd.Series(valores, index=ROTULOS_DESCRICAO, name="preco", dtype=float)
+
+        n = linhas["contagem"].to_numpy(dtype=float)
+        medias = linhas["media"].to_numpy()
+        total = n.sum()
+        media = (n * medias).sum() / total
+        m2 = linhas["m2"].to_numpy().sum() + (n * (medias - media) ** 2).sum()
+        # Os anos do intervalo são um bloco contíguo; os quartis saem por seleção, sem ordenar o bloco
+        q1, mediana, q3 = np.percentile(self.valores_ordenados[self.inicios[a]:self.inicios[b]], [25, 50, 75])
+        valores_descricao = [total, media, np.sqrt(m2 / (total - 1)), linhas["minimo"].min(), q1, mediana, q3, linhas["maximo"].max()]
+        return pd.Series(valores_descricao, index=ROTULOS_DESCRICAO, name="preco", dtype=float)
+
+    def estatisticas_boxplot(self, ano_inicial, ano_final):
+        """Lista de dicionários no formato de ``matplotlib.axes.Axes.bxp``, um por ano."""
+        return [
+            {
+                "label": str(ano),
+                "med": linha.mediana,
+                "q1": linha.q1,
+                "q3": linha.q3,
+                "whislo": linha.bigode_inferior,
+                "whishi": linha.bigode_superior,
+                "fliers": linha.outliers,
+            }
+            for ano, linha in self.intervalo(ano_inicial, ano_final).iterrows()
+        ]
+
+
+def desenhar_boxplot(ax, estatisticas, cores, largura=0.6, tamanho_outlier=3):
+    """Desenha o boxplot por ano a partir de ``estatisticas_boxplot``, no visual do ``sns.boxplot``."""
+    cinza = "#3f3f3f"
+    caixas = ax.bxp(
+        estatisticas,
+        positions=range(len(estatisticas)),
+        widths=largura,
+        patch_artist=True,
+        boxprops={"edgecolor": cinza},
+        medianprops={"color": cinza},
+        whiskerprops={"color": cinza},
+        capprops={"color": cinza},
+        flierprops={"marker": "d", "markersize": tamanho_outlier, "markerfacecolor": cinza, "markeredgecolor": cinza},
+    )
+    for caixa, cor in zip(caixas["boxes"], cores):
+        caixa.set_facecolor(cor)
+    ax.set_xticks(range(len(estatisticas)), [e["label"] for e in estatisticas])
+    return caixas
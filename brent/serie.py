@@ -0,0 +1,106 @@
+"""Série do Brent em memória: ordenada por data, imutável e com fatiamento O(log n).
+
+As páginas filtravam o DataFrame com máscaras booleanas
+(``df[(df["data"] >= inicio) & (df["data"] <= fim)]``), o que percorre todas as
+linhas e copia o resultado a cada rerun. ``SerieBrent`` guarda as colunas como
+arrays NumPy somente leitura, ordenados por data, e responde a intervalos com
+``np.searchsorted``: o resultado é outra ``SerieBrent`` cujos arrays são views
+dos originais. Ano, mês e dia da semana são calculados uma única vez, na carga.
+
+Por ser imutável, uma única instância pode ser compartilhada entre sessões
+(``st.cache_resource``) sem que uma página altere os dados de outra.
+"""
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+
+def _somente_leitura(array):
+    visao = np.asarray(array).view()
+    visao.flags.writeable = False
+    return visao
+
+
+class SerieBrent:
+    """Colunas ``datas`` (datetime64[ns]), ``precos`` e chaves de calendário pré-calculadas."""
+
+    def __init__(self, datas, precos, anos, meses, dias_semana, impressao_digital=None):
+        self.datas = _somente_leitura(datas)
+        self.precos = _somente_leitura(precos)
+        self.anos = _somente_leitura(anos)
+        self.meses = _somente_leitura(meses)
+        self.dias_semana = _somente_leitura(dias_semana)
+        # Hash do dataset completo, usado para invalidar caches de modelos (brent.cache)
+        self.impressao_digital = impressao_digital
+
+    @classmethod
+    def de_dataframe(cls, df, dtype=np.float64, coluna_data="data", coluna_preco="preco"):
+        """Constrói a série a partir de um DataFrame com colunas de data e preço.
+
+        As linhas são ordenadas por data (ordenação estável) e os preços
+        convertidos para ``dtype`` (float64 ou float32).
+        """
+        from brent.cache import hash_dataframe
+
+        datas = pd.to_datetime(df[coluna_data], errors="coerce").to_numpy(dtype="datetime64[ns]")
+        precos = df[coluna_preco].to_numpy(dtype=dtype)
+        validos = ~np.isnat(datas)
+        if not validos.all():
+            datas, precos = datas[validos], precos[validos]
+        if not (np.diff(datas.view(np.int64)) >= 0).all():
+            ordem = np.argsort(datas, kind="stable")
+            datas, precos = datas[ordem], precos[ordem]
+
+        indice = pd.DatetimeIndex(datas)
+        return cls(
+            datas,
+            precos,
+            indice.year.to_numpy(dtype=np.int16),
+            indice.month.to_numpy(dtype=np.int8),
+            indice.dayofweek.to_numpy(dtype=np.int8),
+            impressao_digital=hash_dataframe(pd.DataFrame({"data": datas, "preco": precos})),
+        )
+
+    def __len__(self):
+        return len(self.datas)
+
+    @property
+    def vazia(self):
+        return len(self.datas) == 0
+
+    @property
+    def indice(self):
+        """DatetimeIndex sobre o array de datas."""
+        return pd.DatetimeIndex(self.datas, copy=False)
+
+    def posicoes(self, inicio=None, fim=None):
+        """Posições [a, b) das datas entre ``inicio`` e ``fim`` (inclusive), por busca binária."""
+        a = 0 if inicio is None else int(np.searchsorted(self.datas, np.datetime64(pd.Timestamp(inicio), "ns"), "left"))
+        b = len(self.datas) if fim is None else int(np.searchsorted(self.datas, np.datetime64(pd.Timestamp(fim), "ns"), "right"))
+        return a, max(a, b)
+
+    def intervalo(self, inicio=None, fim=None):
+        """Sub-série entre ``inicio`` e ``fim`` (inclusive); os arrays são views, sem cópia."""
+        a, b = self.posicoes(inicio, fim)
+        return self.fatia(a, b)
+
+    def fatia(self, a, b):
+        """Sub-série pelas posições [a, b)."""
+        return SerieBrent(self.datas[a:b], self.precos[a:b], self.anos[a:b], self.meses[a:b],
+                          self.dias_semana[a:b], self.impressao_digital)
+
+    @cached_property
+    def resumo_anual(self):
+        """Tabela de estatísticas por ano (``brent.resumo_anual.ResumoAnual``), calculada uma vez."""
+        from brent.resumo_anual import ResumoAnual
+
+        return ResumoAnual.de_serie(self)
+
+    def serie(self):
+        """``pd.Series`` de preços indexada pelas datas."""
+        return pd.Series(self.precos, index=self.indice, name="preco", copy=False)
+
+    def para_dataframe(self):
+        """DataFrame com as colunas ``data``, ``preco`` e ``ano`` montado sobre os arrays da série."""
+        return pd.DataFrame({"data": self.datas, "preco": self.precos, "ano": self.anos}, copy=False)
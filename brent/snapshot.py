@@ -0,0 +1,263 @@
+"""Snapshot das previsões: os modelos rodam em lote e as páginas só leem o resultado.
+
+Quem abre o dashboard só precisa da curva de previsão mais recente, mas cada
+visita às páginas de modelos ajustava (ou carregava) o modelo dentro do
+script do Streamlit. ``python -m brent.snapshot`` roda Prophet, ARIMA e LSTM
+no período das páginas (corte 80/20) e grava em
+``artefatos/snapshot/previsoes.parquet`` uma tabela longa e compacta:
+
+- ``modelo`` e ``tipo`` (``teste`` ou ``futuro``), como dicionário;
+- ``data``, ``real``, ``previsto``, ``inferior`` e ``superior`` (intervalo
+  de previsão, NaN quando o modelo não tem intervalo), em float32. O nível
+  do intervalo (80% no Prophet, o ``interval_width`` padrão; 95% no ARIMA)
+  fica em ``nivel_intervalo`` nas métricas de cada modelo.
+
+As métricas do teste (RMSE, MAE, MAPE), o tempo de cada modelo, o período e a
+impressão digital dos dados vão nos metadados do schema do próprio parquet,
+então um único ``os.replace`` troca o snapshot inteiro de uma vez. As páginas
+(``app1844.py``) e a API local (``brent.api``) leem o mesmo arquivo, e a
+latência delas deixa de depender do custo dos modelos.
+
+Uso:
+    python -m brent.snapshot [--modelos prophet arima lstm] [--inicio 2015-02-10] [--fim 2025-02-10]
+                             [--horizonte 21]
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DIRETORIO_SNAPSHOT = os.environ.get("BRENT_SNAPSHOT_DIR", os.path.join(RAIZ, "artefatos", "snapshot"))
+ARQUIVO_SNAPSHOT = "previsoes.parquet"
+CHAVE_METADADOS = b"brent.snapshot"
+
+PERIODO_PADRAO = ("2015-02-10", "2025-02-10")
+PROPORCAO_TREINO = 0.8
+HORIZONTE_PADRAO = 21  # Pregões previstos após o fim do período
+TIPOS = ("teste", "futuro")
+COLUNAS_VALORES = ("real", "previsto", "inferior", "superior")
+
+
+def caminho_padrao():
+    return os.path.join(DIRETORIO_SNAPSHOT, ARQUIVO_SNAPSHOT)
+
+
+def datas_futuras(ultima, horizonte):
+    """Os ``horizonte`` dias úteis seguintes a ``ultima``."""
+    return pd.bdate_range(pd.Timestamp(ultima) + pd.offsets.BDay(1), periods=horizonte)
+
+
+def _linhas(modelo, tipo, datas, previsto, real=None, inferior=None, superior=None):
+    n = len(datas)
+    vazio = np.full(n, np.nan)
+    return pd.DataFrame({
+        "modelo": modelo,
+        "tipo": tipo,
+        "data": pd.DatetimeIndex(datas),
+        "real": vazio if real is None else np.asarray(real, dtype=np.float64),
+        "previsto": np.asarray(previsto, dtype=np.float64),
+        "inferior": vazio if inferior is None else np.asarray(inferior, dtype=np.float64),
+        "superior": vazio if superior is None else np.asarray(superior, dtype=np.float64),
+    })
+
+
+def prever_prophet(periodo, horizonte):
+    """Teste com o modelo da página (treino 80%) e futuro com o período inteiro, aquecido pelo ajuste do treino."""
+    from brent.modelo_prophet import AMOSTRAS_PADRAO, ajustar_prophet, chave_modelo, intervalos, prever
+
+    df = pd.DataFrame({"ds": periodo.datas, "y": periodo.precos})
+    n = int(len(df) * PROPORCAO_TREINO)
+    train, datas_teste = df.iloc[:n], df["ds"].iloc[n:]
+    # Mesma chamada da página (previsão nas datas reais do teste), para reaproveitar o cache em disco dos modelos
+    modelo, previsoes, _ = ajustar_prophet(train, len(df) - n, datas=datas_teste)
+    # Simulações só nas linhas do teste, no mesmo cache de intervalos da página
+    faixas = intervalos(modelo, chave_modelo(train, len(df) - n, {}, datas_teste), datas_teste, AMOSTRAS_PADRAO)
+    teste = previsoes.iloc[n:].assign(yhat_lower=faixas["yhat_lower"].to_numpy(), yhat_upper=faixas["yhat_upper"].to_numpy())
+    completo, _, _ = ajustar_prophet(df, 0)
+    futuro = prever(completo, pd.DataFrame({"ds": datas_futuras(periodo.datas[-1], horizonte)}), AMOSTRAS_PADRAO)
+
+    linhas = pd.concat([
+        _linhas("prophet", "teste", teste["ds"], teste["yhat"], df["y"].iloc[n:], teste["yhat_lower"], teste["yhat_upper"]),
+        _linhas("prophet", "futuro", futuro["ds"], futuro["yhat"], None, futuro["yhat_lower"], futuro["yhat_upper"]),
+    ])
+    # Usados no texto de conclusão da página
+    extras = {"tendencia_media": float(previsoes["trend"].mean()), "anual_desvio": float(previsoes["yearly"].std()),
+              "nivel_intervalo": float(modelo.interval_width)}
+    return linhas, extras
+
+
+def prever_arima(periodo, horizonte):
+    """Previsão um passo à frente no teste (filtro de Kalman) e ``horizonte`` pregões após o período."""
+    from brent.modelo_arima import ajustar_arima, formatar_ordem
+
+    n = int(len(periodo) * PROPORCAO_TREINO)
+    resultado, busca, _ = ajustar_arima(periodo.datas[:n], periodo.precos[:n])
+    teste = resultado.extend(periodo.precos[n:]).get_prediction().summary_frame(alpha=0.05)
+    futuro = resultado.append(periodo.precos[n:], refit=False).get_forecast(horizonte).summary_frame(alpha=0.05)
+
+    linhas = pd.concat([
+        _linhas("arima", "teste", periodo.datas[n:], teste["mean"], periodo.precos[n:],
+                teste["mean_ci_lower"], teste["mean_ci_upper"]),
+        _linhas("arima", "futuro", datas_futuras(periodo.datas[-1], horizonte), futuro["mean"], None,
+                futuro["mean_ci_lower"], futuro["mean_ci_upper"]),
+    ])
+    return linhas, {"ordem": formatar_ordem(busca["ordem"]), "nivel_intervalo": 0.95}
+
+
+def prever_lstm(periodo, horizonte):
+    """Artefato mais recente do LSTM: teste nas janelas da página e futuro por previsão recursiva."""
+    from brent.modelo_lstm import carregar_artefato, preparar_dados, prever_recursivo
+
+    artefato = carregar_artefato()
+    if artefato is None:
+        raise RuntimeError("Nenhum artefato do LSTM; rode `python -m brent.modelo_lstm` antes.")
+    janela = artefato.janela_temporal
+    X, _ = preparar_dados(periodo.precos, artefato.scaler, janela)
+    n = int(len(X) * PROPORCAO_TREINO)
+    teste = artefato.scaler.inverse_transform(artefato.modelo.predict(X[n:], verbose=0)).ravel()
+    futuro = prever_recursivo(artefato, periodo.precos, horizonte)
+
+    linhas = pd.concat([
+        _linhas("lstm", "teste", periodo.datas[n + janela:], teste, periodo.precos[n + janela:]),
+        _linhas("lstm", "futuro", datas_futuras(periodo.datas[-1], horizonte), futuro),
+    ])
+    return linhas, {"versao": artefato.versao}
+
+
+MODELOS = {
+    "prophet": prever_prophet,
+    "arima": prever_arima,
+    "lstm": prever_lstm,
+}
+
+
+def gerar(periodo, modelos=tuple(MODELOS), horizonte=HORIZONTE_PADRAO):
+    """Roda os modelos e devolve ``(tabela, metadados)``.
+
+    Um modelo que falha (ex.: LSTM sem artefato) não interrompe os outros: a
+    mensagem fica em ``metadados["erros"]``.
+    """
+    from brent.backtest import metricas
+
+    desconhecidos = set(modelos) - set(MODELOS)
+    if desconhecidos:
+        raise ValueError(f"Modelos desconhecidos: {sorted(desconhecidos)} (use {sorted(MODELOS)})")
+    partes, resumo, erros = [], {}, {}
+    for modelo in modelos:
+        inicio = time.perf_counter()
+        try:
+            linhas, extras = MODELOS[modelo](periodo, horizonte)
+        except Exception as erro:  # noqa: BLE001 - o snapshot dos outros modelos continua valendo
+            erros[modelo] = f"{type(erro).__name__}: {erro}"
+            continue
+        teste = linhas[linhas["tipo"] == "teste"]
+        resumo[modelo] = {**metricas(teste["real"], teste["previsto"]), **extras,
+                          "segundos": time.perf_counter() - inicio}
+        partes.append(linhas)
+    if not partes:
+        raise RuntimeError(f"Nenhum modelo gerou previsões: {erros}")
+
+    tabela = pd.concat(partes, ignore_index=True)
+    tabela["modelo"] = pd.Categorical(tabela["modelo"], categories=list(MODELOS))
+    tabela["tipo"] = pd.Categorical(tabela["tipo"], categories=list(TIPOS))
+    for coluna in COLUNAS_VALORES:
+        tabela[coluna] = tabela[coluna].astype(np.float32)
+    metadados = {
+        "criado_em": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "periodo": [str(pd.Timestamp(periodo.datas[0]).date()), str(pd.Timestamp(periodo.datas[-1]).date())],
+        "impressao_digital": periodo.impressao_digital,
+        "horizonte": horizonte,
+        "modelos": resumo,
+        "erros": erros,
+    }
+    return tabela, metadados
+
+
+def salvar(tabela, metadados, caminho=None):
+    """Grava o snapshot (metadados no schema do parquet) de forma atômica e devolve o caminho."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    caminho = caminho or caminho_padrao()
+    tabela_arrow = pa.Table.from_pandas(tabela, preserve_index=False)
+    tabela_arrow = tabela_arrow.replace_schema_metadata({
+        **(tabela_arrow.schema.metadata or {}),
+        CHAVE_METADADOS: json.dumps(metadados, ensure_ascii=False, default=str).encode("utf-8"),
+    })
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    descritor, temporario = tempfile.mkstemp(prefix=".tmp-", dir=os.path.dirname(caminho))
+    os.close(descritor)
+    try:
+        pq.write_table(tabela_arrow, temporario, compression="zstd")
+        os.replace(temporario, caminho)  # Leitores veem o snapshot antigo ou o novo, nunca um arquivo pela metade
+    finally:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+    return caminho
+
+
+def modificado_em(caminho=None):
+    """``st_mtime_ns`` do snapshot (None se não existir), para invalidar caches de leitura."""
+    try:
+        return os.stat(caminho or caminho_padrao()).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def carregar(caminho=None):
+    """``(tabela, metadados)`` do snapshot, ou None se ele ainda não foi gerado."""
+    import pyarrow.parquet as pq
+
+    caminho = caminho or caminho_padrao()
+    if not os.path.exists(caminho):
+        return None
+    tabela_arrow = pq.read_table(caminho)
+    metadados = json.loads(tabela_arrow.schema.metadata[CHAVE_METADADOS])
+    return tabela_arrow.to_pandas(), metadados
+
+
+def fatiar(tabela, modelo=None, tipo=None, inicio=None, fim=None):
+    """Linhas do snapshot filtradas por modelo, tipo e intervalo de datas (todos opcionais)."""
+    mascara = np.ones(len(tabela), dtype=bool)
+    if modelo is not None:
+        mascara &= (tabela["modelo"] == modelo).to_numpy()
+    if tipo is not None:
+        mascara &= (tabela["tipo"] == tipo).to_numpy()
+    if inicio is not None:
+        mascara &= (tabela["data"] >= pd.Timestamp(inicio)).to_numpy()
+    if fim is not None:
+        mascara &= (tabela["data"] <= pd.Timestamp(fim)).to_numpy()
+    return tabela[mascara].reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera o snapshot das previsões lido pelas páginas e pela API.")
+    parser.add_argument("--modelos", nargs="+", default=list(MODELOS), choices=list(MODELOS))
+    parser.add_argument("--inicio", default=PERIODO_PADRAO[0], help="data inicial do período (AAAA-MM-DD)")
+    parser.add_argument("--fim", default=PERIODO_PADRAO[1], help="data final do período (AAAA-MM-DD)")
+    parser.add_argument("--horizonte", type=int, default=HORIZONTE_PADRAO, help="pregões previstos após o período")
+    parser.add_argument("--saida", default=None, help=f"arquivo de saída (padrão: {caminho_padrao()})")
+    args = parser.parse_args()
+
+    from brent.fontes import criar_fonte
+    from brent.serie import SerieBrent
+
+    periodo = SerieBrent.de_dataframe(criar_fonte().ler()).intervalo(args.inicio, args.fim)
+    tabela, metadados = gerar(periodo, args.modelos, args.horizonte)
+    destino = salvar(tabela, metadados, args.saida)
+
+    resumo = pd.DataFrame(metadados["modelos"]).T[["rmse", "mae", "mape", "segundos"]]
+    with pd.option_context("display.float_format", "{:.2f}".format):
+        print(resumo)
+    for modelo, erro in metadados["erros"].items():
+        print(f"{modelo}: não incluído ({erro})")
+    print(f"\nSnapshot com {len(tabela)} linhas em {destino} ({os.path.getsize(destino) / 1024:.1f} KiB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Suavização da linha do preço com custo limitado pela resolução do gráfico.
+
+O gráfico "Série Temporal do Preço" ajustava ``make_interp_spline`` sobre
+todas as observações diárias do intervalo (um sistema do tamanho do período
+inteiro a cada rerun) para depois avaliar só 300 pontos, e falhava com datas
+repetidas. Aqui a série é primeiro agregada por médias diárias, semanais ou
+mensais, na menor resolução que ainda tem pelo menos ``saida`` pontos no
+período, e só então suavizada. Assim o custo depende da saída, não do
+tamanho do intervalo, e datas repetidas viram um único ponto.
+
+Suavizadores disponíveis (``SUAVIZADORES``):
+
+- ``spline``: spline cúbica sobre as médias (o visual original);
+- ``media_movel``: média móvel centrada;
+- ``lowess``: regressão local ponderada (statsmodels);
+- ``savgol``: filtro de Savitzky–Golay (scipy).
+
+O resultado fica em cache por (dados, intervalo, suavizador, saída).
+"""
+import numpy as np
+
+from brent.cache import CacheMemoria
+
+PONTOS_SAIDA = 300
+
+# Rótulo exibido no app -> nome do suavizador
+ROTULOS = {
+    "Spline cúbica": "spline",
+    "Média móvel": "media_movel",
+    "LOWESS": "lowess",
+    "Savitzky–Golay": "savgol",
+}
+
+# Unidades do datetime64 usadas na agregação, da mais fina para a mais grossa
+RESOLUCOES = ("D", "W", "M")
+
+cache_suavizacao = CacheMemoria(max_entradas=64)
+
+
+def escolher_resolucao(datas, saida=PONTOS_SAIDA):
+    """Resolução mais grossa que ainda deixa pelo menos ``saida`` pontos no período (ou diária)."""
+    if len(datas) == 0:
+        return "D"
+    for resolucao in reversed(RESOLUCOES):
+        primeiro, ultimo = datas[0].astype(f"datetime64[{resolucao}]"), datas[-1].astype(f"datetime64[{resolucao}]")
+        if (ultimo - primeiro).astype(np.int64) + 1 >= saida:
+            return resolucao
+    return "D"
+
+
+def agregar(datas, precos, resolucao):
+    """Médias de preço (e das datas) por dia, semana ou mês; ``datas`` precisa estar ordenado."""
+    grupos = datas.astype(f"datetime64[{resolucao}]")
+    # Datas ordenadas: cada grupo é um bloco contíguo
+    inicios = np.flatnonzero(np.r_[True, grupos[1:] != grupos[:-1]])
+    contagens = np.diff(np.append(inicios, len(datas)))
+    segundos = datas.astype("datetime64[s]").astype(np.int64).astype(np.float64)
+    x = np.add.reduceat(segundos, inicios) / contagens
+    y = np.add.reduceat(np.asarray(precos, dtype=np.float64), inicios) / contagens
+    return x, y
+
+
+def _janela_impar(n, fracao=0.05, minimo=5):
+    janela = max(minimo, int(n * fracao)) | 1
+    return min(janela, n if n % 2 else n - 1)
+
+
+def _spline(x, y, saida):
+    from scipy.interpolate import make_interp_spline
+
+    x_saida = np.linspace(x[0], x[-1], saida)
+    return x_saida, make_interp_spline(x, y, k=3)(x_saida)
+
+
+def _media_movel(x, y, saida):
+    import pandas as pd
+
+    janela = _janela_impar(len(y))
+    return x, pd.Series(y).rolling(janela, center=True, min_periods=1).mean().to_numpy()
+
+
+def _lowess(x, y, saida, fracao=0.05):
+    from statsmodels.nonparametric.smoothers_lowess import lowess
+
+    return x, lowess(y, x, frac=max(fracao, 3 / len(y)), return_sorted=False)
+
+
+def _savgol(x, y, saida):
+    from scipy.signal import savgol_filter
+
+    janela = _janela_impar(len(y))
+    return x, savgol_filter(y, janela, polyorder=min(3, janela - 1))
+
+
+SUAVIZADORES = {
+    "spline": _spline,
+    "media_movel": _media_movel,
+    "lowess": _lowess,
+    "savgol": _savgol,
+}
+
+
+def suavizar_arrays(datas, precos, metodo="spline", saida=PONTOS_SAIDA):
+    """Linha suavizada ``(datas, valores)`` de uma série diária ordenada por data."""
+    if metodo not in SUAVIZADORES:
+        raise ValueError(f"Suavizador desconhecido: {metodo!r} (use um de {sorted(SUAVIZADORES)})")
+    datas = np.asarray(datas, dtype="datetime64[ns]")
+    x, y = agregar(datas, precos, escolher_resolucao(datas, saida))
+    if len(y) < 4:
+        x_saida, y_saida = x, y  # Poucos pontos: nada a suavizar
+    else:
+        x_saida, y_saida = SUAVIZADORES[metodo](x, y, saida)
+    return np.round(x_saida).astype("datetime64[s]").astype("datetime64[ns]"), np.asarray(y_saida)
+
+
+def suavizar(serie, inicio=None, fim=None, metodo="spline", saida=PONTOS_SAIDA):
+    """Linha suavizada do intervalo [inicio, fim] da ``SerieBrent``, em cache por intervalo."""
+    a, b = serie.posicoes(inicio, fim)
+
+    def calcular():
+        periodo = serie.fatia(a, b)
+        return suavizar_arrays(periodo.datas, periodo.precos, metodo, saida)
+
+    return cache_suavizacao.obter_ou_calcular((serie.impressao_digital, a, b, metodo, saida), calcular)
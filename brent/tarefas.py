@@ -0,0 +1,150 @@
+"""Fila de treinos em segundo plano, com deduplicação e progresso.
+
+Os treinos das páginas (Prophet, SARIMA, LSTM sem artefato) rodavam dentro
+do script do Streamlit: a sessão ficava bloqueada no ``st.spinner`` durante
+todo o ajuste, e dois visitantes ao mesmo tempo ajustavam o mesmo modelo duas
+vezes. Aqui o treino vira uma ``Tarefa`` executada por um pool de threads
+(o Stan roda em subprocesso e o TensorFlow libera o GIL, então threads
+bastam):
+
+- ``FilaTarefas.submeter(chave, funcao, ...)`` devolve a tarefa já existente
+  quando a chave é a mesma, em andamento ou concluída, e não ajusta de novo;
+- a função recebe ``progresso=tarefa.reportar`` e informa fração concluída,
+  mensagem e métricas (ex.: época e loss), lidos pela página enquanto o
+  treino roda;
+- tarefas concluídas ficam guardadas (até ``max_terminadas``), servindo de
+  cache em memória dos resultados; uma tarefa que falhou também fica, para a
+  página mostrar o erro sem repetir o treino a cada rerun, até ser descartada.
+
+A função roda em uma cópia do contexto de quem a submeteu (``contextvars``),
+então as etapas do treino entram no rastro do rerun que o pediu
+(``brent.rastreamento``).
+"""
+import contextvars
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+
+PENDENTE = "pendente"
+EXECUTANDO = "executando"
+CONCLUIDA = "concluida"
+FALHOU = "falhou"
+
+TRABALHADORES_PADRAO = 2
+
+
+class Tarefa:
+    """Um treino submetido à fila: estado, progresso, histórico de métricas e resultado."""
+
+    def __init__(self, chave, nome):
+        self.chave = chave
+        self.nome = nome
+        self.estado = PENDENTE
+        self.progresso = 0.0
+        self.mensagem = "Aguardando na fila"
+        self.historico = []
+        self.erro = None
+        self.criada_em = time.time()
+        self.iniciada_em = None
+        self.terminada_em = None
+        self._trava = threading.Lock()
+        self._futuro = None
+
+    @property
+    def terminada(self):
+        return self.estado in (CONCLUIDA, FALHOU)
+
+    def reportar(self, progresso=None, mensagem=None, **metricas):
+        """Atualiza o progresso (0 a 1) e a mensagem; métricas extras entram no histórico."""
+        with self._trava:
+            if progresso is not None:
+                self.progresso = min(max(float(progresso), 0.0), 1.0)
+            if mensagem is not None:
+                self.mensagem = mensagem
+            if metricas:
+                self.historico.append(metricas)
+
+    def situacao(self):
+        """Cópia consistente do estado, para exibir sem segurar a trava."""
+        with self._trava:
+            fim = self.terminada_em or time.time()
+            return {
+                "estado": self.estado,
+                "progresso": self.progresso,
+                "mensagem": self.mensagem,
+                "historico": list(self.historico),
+                "erro": self.erro,
+                "segundos": fim - (self.iniciada_em or fim),
+            }
+
+    def aguardar(self, timeout=None):
+        """Espera até ``timeout`` segundos; devolve True se a tarefa terminou."""
+        return bool(wait([self._futuro], timeout=timeout).done)
+
+    def resultado(self, timeout=None):
+        """Resultado da função (relança a exceção se o treino falhou)."""
+        return self._futuro.result(timeout)
+
+    def _executar(self, funcao, args, kwargs):
+        with self._trava:
+            self.estado, self.iniciada_em, self.mensagem = EXECUTANDO, time.time(), "Iniciando"
+        try:
+            resultado = funcao(*args, progresso=self.reportar, **kwargs)
+        except BaseException as erro:
+            with self._trava:
+                self.estado, self.erro, self.terminada_em = FALHOU, f"{type(erro).__name__}: {erro}", time.time()
+            raise
+        with self._trava:
+            self.estado, self.progresso, self.mensagem, self.terminada_em = CONCLUIDA, 1.0, "Concluído", time.time()
+        return resultado
+
+
+class FilaTarefas:
+    """Pool de threads que executa tarefas identificadas por chave, sem duplicatas."""
+
+    def __init__(self, trabalhadores=TRABALHADORES_PADRAO, max_terminadas=16):
+        self._executor = ThreadPoolExecutor(max_workers=trabalhadores, thread_name_prefix="brent-treino")
+        self._tarefas = OrderedDict()
+        # Reentrante: o callback de término roda na hora se a tarefa já terminou dentro de ``submeter``
+        self._trava = threading.RLock()
+        self.max_terminadas = max_terminadas
+
+    def submeter(self, chave, funcao, *args, nome=None, **kwargs):
+        """Agenda ``funcao(*args, progresso=..., **kwargs)`` ou devolve a tarefa que já tem essa chave."""
+        with self._trava:
+            tarefa = self._tarefas.get(chave)
+            if tarefa is not None:
+                self._tarefas.move_to_end(chave)
+                return tarefa
+            tarefa = Tarefa(chave, nome or getattr(funcao, "__name__", str(chave)))
+            contexto = contextvars.copy_context()
+            tarefa._futuro = self._executor.submit(contexto.run, tarefa._executar, funcao, args, kwargs)
+            tarefa._futuro.add_done_callback(lambda _: self._descartar_excedentes())
+            self._tarefas[chave] = tarefa
+            return tarefa
+
+    def obter(self, chave):
+        with self._trava:
+            return self._tarefas.get(chave)
+
+    def descartar(self, chave):
+        """Esquece uma tarefa terminada (ex.: para tentar de novo um treino que falhou)."""
+        with self._trava:
+            tarefa = self._tarefas.get(chave)
+            if tarefa is not None and tarefa.terminada:
+                del self._tarefas[chave]
+
+    def tarefas(self):
+        with self._trava:
+            return list(self._tarefas.values())
+
+    def _descartar_excedentes(self):
+        """Mantém só as ``max_terminadas`` tarefas terminadas usadas mais recentemente."""
+        with self._trava:
+            terminadas = [chave for chave, tarefa in self._tarefas.items() if tarefa.terminada]
+            for chave in terminadas[:max(0, len(terminadas) - self.max_terminadas)]:
+                del self._tarefas[chave]
+
+    def encerrar(self, aguardar=True):
+        self._executor.shutdown(wait=aguardar, cancel_futures=not aguardar)
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from brent import backtest
+
+
+def test_dobras_expansiva():
+    assert backtest.dobras(100, treino_inicial=50, horizonte=10, passo=20) == [(0, 50, 60), (0, 70, 80), (0, 90, 100)]
+
+
+def test_dobras_deslizante_mantem_o_tamanho_do_treino():
+    assert backtest.dobras(100, 50, 10, 20, modo="deslizante") == [(0, 50, 60), (20, 70, 80), (40, 90, 100)]
+
+
+@pytest.mark.parametrize("modo", backtest.MODOS)
+def test_teste_comeca_depois_do_treino_e_cabe_na_serie(modo):
+    n, treino_inicial, horizonte, passo = 1000, 252, 21, 63
+    cortes = backtest.dobras(n, treino_inicial, horizonte, passo, modo)
+    assert len(cortes) == len(range(treino_inicial, n - horizonte + 1, passo))
+    for (inicio, fim_treino, fim_teste), (_, proximo_fim, _) in zip(cortes, cortes[1:] + [(0, 0, 0)]):
+        assert 0 <= inicio < fim_treino < fim_teste <= n
+        assert fim_teste - fim_treino == horizonte
+        assert fim_treino - inicio == (fim_treino if modo == "expansiva" else treino_inicial)
+        if proximo_fim:
+            assert proximo_fim - fim_treino == passo
+
+
+def test_dobras_vazias_e_modo_invalido():
+    assert backtest.dobras(100, 95, 10, 5) == []
+    with pytest.raises(ValueError):
+        backtest.dobras(100, 50, 10, 5, modo="anual")
+
+
+def test_executar_registra_as_dobras_no_processo_atual():
+    datas = pd.bdate_range("2020-01-01", periods=160).to_numpy()
+    precos = 70 + np.cumsum(np.random.default_rng(0).normal(size=160))
+    df, tempos = backtest.executar(datas, precos, modelos=("arima",), treino_inicial=100, horizonte=10, passo=25,
+                                   processos=1)
+    assert list(df["dobra"]) == [0, 1, 2]
+    assert list(df["n_treino"]) == [100, 125, 150]
+    assert list(df["origem"]) == [datas[99], datas[124], datas[149]]
+    assert (df["horizonte"] == 10).all() and (df["rmse"] >= df["mae"]).all()
+    assert set(tempos) == {"arima"}
@@ -0,0 +1,96 @@
+import json
+
+import pytest
+
+from brent import busca_lstm
+
+MEDIANA = {**busca_lstm.CONFIG_PADRAO, "poda": "mediana", "aquecimento": 2, "minimo": 3}
+HALVING = {**busca_lstm.CONFIG_PADRAO, "poda": "halving", "aquecimento": 2, "eta": 3}
+
+
+@pytest.fixture
+def banco(tmp_path):
+    return str(tmp_path / busca_lstm.ARQUIVO_ESTUDOS)
+
+
+def estudo_sintetico(banco, perdas, estudo="teste"):
+    """Uma tentativa por lista de losses de validação (um por época); devolve os ids."""
+    ids = [id_ for id_, _ in busca_lstm.criar_tentativas(banco, estudo, len(perdas))]
+    with busca_lstm.conectar(banco) as conexao:
+        for id_, perdas_tentativa in zip(ids, perdas):
+            conexao.executemany("INSERT INTO intermediarios VALUES (?, ?, ?)",
+                                [(id_, epoca, valor) for epoca, valor in enumerate(perdas_tentativa, start=1)])
+    return ids
+
+
+def podar(banco, tentativa, epoca, config):
+    with busca_lstm.conectar(banco) as conexao:
+        return busca_lstm.deve_podar(conexao, tentativa, epoca, config)
+
+
+def test_mediana(banco):
+    outras = [[0.5, 0.3, 0.2], [0.6, 0.4, 0.3], [0.7, 0.5, 0.4]]
+    pior, melhor, *_ = estudo_sintetico(banco, [[0.9, 0.8, 0.7], [0.4, 0.2, 0.1], *outras])
+    assert not podar(banco, pior, 1, MEDIANA)  # Ainda no aquecimento
+    assert podar(banco, pior, 2, MEDIANA) and podar(banco, pior, 3, MEDIANA)
+    assert not podar(banco, melhor, 2, MEDIANA)
+    assert not podar(banco, pior, 2, {**MEDIANA, "poda": "nenhuma"})
+    assert not podar(banco, pior, 2, {**MEDIANA, "minimo": 5})  # Poucas tentativas para comparar
+
+
+def test_mediana_usa_o_melhor_loss_ate_a_epoca(banco):
+    # A tentativa piorou na época 3, mas o melhor loss dela (0,25 na época 2) ainda é o menor
+    oscilante, *_ = estudo_sintetico(banco, [[0.5, 0.25, 0.9], [0.6, 0.4, 0.3], [0.7, 0.5, 0.4], [0.8, 0.6, 0.5]])
+    assert not podar(banco, oscilante, 3, MEDIANA)
+
+
+def test_mediana_so_compara_quem_chegou_a_epoca(banco):
+    atual, *_ = estudo_sintetico(banco, [[0.9, 0.8, 0.7], [0.1, 0.1, 0.1], [0.2, 0.2], [0.3, 0.3]])
+    assert not podar(banco, atual, 3, MEDIANA)  # Só uma outra tentativa chegou à época 3
+    assert podar(banco, atual, 2, MEDIANA)
+
+
+def test_halving_nos_degraus(banco):
+    pior, meio, topo = estudo_sintetico(banco, [[0.3] * 6, [0.2] * 6, [0.1] * 6])
+    assert not podar(banco, topo, 2, HALVING)
+    assert podar(banco, meio, 2, HALVING) and podar(banco, pior, 2, HALVING)
+    assert not podar(banco, pior, 3, HALVING) and not podar(banco, pior, 4, HALVING)  # Fora dos degraus 2, 6, 18
+    assert podar(banco, pior, 6, HALVING)
+
+
+def test_halving_com_poucas_tentativas_no_degrau(banco):
+    pior, _ = estudo_sintetico(banco, [[0.9, 0.9], [0.1, 0.1]])
+    assert not podar(banco, pior, 2, HALVING)
+
+
+def test_criar_tentativas_comeca_pela_arquitetura_da_pagina(banco):
+    primeiras = busca_lstm.criar_tentativas(banco, "novo", 3, semente=1)
+    seguintes = busca_lstm.criar_tentativas(banco, "novo", 2, semente=1)
+    assert primeiras[0][1] == busca_lstm.PADRAO
+    todas = [json.dumps(parametros, sort_keys=True) for _, parametros in primeiras + seguintes]
+    assert len(set(todas)) == 5
+    for _, parametros in primeiras[1:] + seguintes:
+        assert all(parametros[nome] in valores for nome, valores in busca_lstm.ESPACO.items())
+    with busca_lstm.conectar(banco) as conexao:
+        numeros = [n for n, in conexao.execute("SELECT numero FROM tentativas WHERE estudo = 'novo' ORDER BY numero")]
+    assert numeros == [0, 1, 2, 3, 4]
+
+
+def test_buscar_recusa_outros_dados_e_poda_desconhecida(banco):
+    with busca_lstm.conectar(banco) as conexao:
+        conexao.execute("INSERT INTO estudos VALUES ('lstm', '', '{}', '{}', 'abc')")
+    with pytest.raises(ValueError, match="outros dados"):
+        busca_lstm.buscar([1.0, 2.0], tentativas=0, banco=banco, hash_dados="def")
+    with pytest.raises(ValueError, match="Poda"):
+        busca_lstm.buscar([1.0, 2.0], tentativas=0, banco=banco, config={"poda": "aleatoria"})
+
+
+def test_melhor_tentativa(banco):
+    ids = estudo_sintetico(banco, [[0.5], [0.2], [0.1], [0.3]])
+    with busca_lstm.conectar(banco) as conexao:
+        conexao.executemany("UPDATE tentativas SET status = ?, val_loss = ?, diretorio = ? WHERE id = ?", [
+            ("concluida", 0.5, "/t0", ids[0]), ("concluida", 0.2, "/t1", ids[1]),
+            ("podada", 0.1, None, ids[2]), ("concluida", 0.3, "/t3", ids[3])])
+    melhor = busca_lstm.melhor_tentativa(banco, "teste")
+    assert (melhor["id"], melhor["val_loss"], melhor["diretorio"]) == (ids[1], 0.2, "/t1")
+    assert busca_lstm.melhor_tentativa(banco, "vazio") is None
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("statsmodels")
+
+from brent import decomposicao  # noqa: E402
+
+
+@pytest.fixture
+def serie():
+    datas = pd.bdate_range("2015-01-01", periods=3 * decomposicao.PERIODO_PREGAO)
+    t = np.arange(len(datas))
+    rng = np.random.default_rng(4)
+    precos = 60 + 0.02 * t + 5 * np.sin(2 * np.pi * t / decomposicao.PERIODO_PREGAO) + rng.normal(scale=0.5, size=len(t))
+    return datas.to_numpy(), precos
+
+
+@pytest.mark.parametrize("metodo", sorted(decomposicao.METODOS))
+@pytest.mark.parametrize("robusto", [False, True])
+def test_componentes_somam_o_observado(serie, metodo, robusto):
+    datas, precos = serie
+    df = decomposicao.decompor_arrays(datas, precos, metodo, robusto=robusto)
+    assert list(df.columns) == ["observado", "tendencia", "sazonalidade", "residuo"]
+    assert len(df) == len(precos) and (df.index == pd.DatetimeIndex(datas)).all()
+    np.testing.assert_allclose(df["tendencia"] + df["sazonalidade"] + df["residuo"], df["observado"], atol=1e-8)
+
+
+def test_classica_sem_nan_nas_bordas(serie):
+    df = decomposicao.decompor_arrays(*serie, metodo="classica")
+    assert not df.isna().any().any()
+
+
+def test_sazonalidade_anual_recuperada(serie):
+    datas, precos = serie
+    df = decomposicao.decompor_arrays(datas, precos)
+    t = np.arange(len(precos))
+    esperado = 5 * np.sin(2 * np.pi * t / decomposicao.PERIODO_PREGAO)
+    assert np.corrcoef(df["sazonalidade"], esperado)[0, 1] > 0.9
+
+
+def test_serie_curta_demais(serie):
+    datas, precos = serie
+    n = 2 * decomposicao.PERIODO_SEMANA - 1
+    with pytest.raises(ValueError, match="pelo menos 10"):
+        decomposicao.decompor_arrays(datas[:n], precos[:n], periodo=decomposicao.PERIODO_SEMANA)
+    with pytest.raises(ValueError):
+        decomposicao.decompor_arrays(datas, precos, metodo="x11")
+
+
+def test_parametros_stl_impares():
+    parametros = decomposicao.parametros_stl(decomposicao.PERIODO_PREGAO)
+    assert parametros["trend"] % 2 == 1 and parametros["low_pass"] % 2 == 1
+    assert parametros["trend"] > decomposicao.PERIODO_PREGAO and parametros["trend_jump"] > 1
@@ -0,0 +1,63 @@
+import warnings
+
+import numpy as np
+import pytest
+from statsmodels.tsa.adfvalues import mackinnonp
+from statsmodels.tsa.stattools import adfuller
+
+from brent.diagnosticos import _phillips_perron, adf_janelas, p_valores_mackinnon
+
+
+def dickey_fuller(x, lags, regressao):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", FutureWarning)
+        return adfuller(x, maxlag=lags, regression=regressao, autolag=None)
+
+
+@pytest.fixture
+def passeio():
+    rng = np.random.default_rng(42)
+    return 60 + np.cumsum(rng.normal(scale=1.5, size=400))
+
+
+@pytest.mark.parametrize("regressao", ["n", "c", "ct"])
+def test_p_valores_iguais_ao_mackinnonp(regressao):
+    estatisticas = np.linspace(-25, 5, 601)
+    esperado = [mackinnonp(t, regressao) for t in estatisticas]
+    np.testing.assert_allclose(p_valores_mackinnon(estatisticas, regressao), esperado, rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize("regressao", ["n", "c"])
+@pytest.mark.parametrize("lags", [0, 1, 4])
+def test_adf_janelas_igual_ao_adfuller(passeio, regressao, lags):
+    janela, passo = 120, 7
+    fins, estatisticas, p_valores = adf_janelas(passeio, janela, passo, lags, regressao)
+    assert len(fins) == len(range(0, len(passeio) - janela + 1, passo))
+    for fim, estatistica, p_valor in zip(fins, estatisticas, p_valores):
+        esperado = dickey_fuller(passeio[fim - janela + 1:fim + 1], lags, regressao)
+        assert estatistica == pytest.approx(esperado[0], rel=0, abs=1e-12)
+        assert p_valor == pytest.approx(esperado[1], rel=0, abs=1e-12)
+
+
+def test_adf_janelas_rejeita_tendencia(passeio):
+    with pytest.raises(ValueError):
+        adf_janelas(passeio, 120, regressao="ct")
+
+
+@pytest.mark.parametrize("regressao", ["n", "c", "ct"])
+def test_phillips_perron_sem_defasagens_e_dickey_fuller(passeio, regressao):
+    # Com 0 defasagens a variância de longo prazo é a dos resíduos e Z_t vira o t do Dickey–Fuller
+    resultado = _phillips_perron(passeio, regressao, lags=0)
+    esperado = dickey_fuller(passeio, 0, regressao)
+    assert resultado["estatistica"] == pytest.approx(esperado[0], rel=0, abs=1e-12)
+    assert resultado["p_valor"] == pytest.approx(esperado[1], rel=0, abs=1e-12)
+
+
+@pytest.mark.parametrize("regressao", ["n", "c", "ct"])
+@pytest.mark.parametrize("lags", [None, 8])
+def test_phillips_perron_igual_ao_arch(passeio, regressao, lags):
+    unitroot = pytest.importorskip("arch.unitroot")
+    resultado = _phillips_perron(passeio, regressao, lags=lags)
+    esperado = unitroot.PhillipsPerron(passeio, trend=regressao, lags=resultado["lags"], test_type="tau")
+    assert resultado["estatistica"] == pytest.approx(esperado.stat, rel=0, abs=1e-9)
+    assert resultado["p_valor"] == pytest.approx(esperado.pvalue, rel=0, abs=1e-9)
@@ -0,0 +1,99 @@
+import http.server
+import os
+import threading
+
+import pytest
+
+pytest.importorskip("requests")
+
+from brent import fontes  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def sem_variaveis(monkeypatch):
+    for variavel in fontes.VARIAVEIS_AMBIENTE.values():
+        monkeypatch.delenv(variavel, raising=False)
+
+
+def test_padrao_e_o_parquet_local():
+    fonte = fontes.criar_fonte({})
+    assert isinstance(fonte, fontes.FonteArquivoLocal) and fonte.caminho == fontes.PARQUET_PADRAO
+
+
+def test_fonte_escolhida_pela_configuracao(tmp_path):
+    arrow = fontes.criar_fonte({"fonte": "arrow", "parquet": str(tmp_path / "b.parquet")})
+    assert isinstance(arrow, fontes.FonteArrowMmap)
+    assert arrow.parquet == str(tmp_path / "b.parquet") and arrow.caminho == str(tmp_path / "b.arrow")
+    http = fontes.criar_fonte({"fonte": "http", "url": "http://exemplo/b.parquet", "destino": str(tmp_path / "c")})
+    assert isinstance(http, fontes.FonteHttpEtag) and http.destino == str(tmp_path / "c")
+    assert fontes.criar_fonte({"parquet": "dados/b.parquet"}).caminho == os.path.join(fontes.RAIZ, "dados", "b.parquet")
+    with pytest.raises(ValueError):
+        fontes.criar_fonte({"fonte": "s3"})
+
+
+def test_variaveis_de_ambiente_sobrescrevem_a_configuracao(tmp_path, monkeypatch):
+    monkeypatch.setenv("BRENT_FONTE", "arrow")
+    monkeypatch.setenv("BRENT_FONTE_ARROW", str(tmp_path / "x.arrow"))
+    fonte = fontes.criar_fonte({"fonte": "local", "arrow": str(tmp_path / "y.arrow")})
+    assert isinstance(fonte, fontes.FonteArrowMmap) and fonte.caminho == str(tmp_path / "x.arrow")
+
+
+def test_configuracao_lida_do_toml(tmp_path):
+    config = tmp_path / "config.toml"
+    config.write_text('[dados]\nfonte = "http"\nurl = "http://exemplo/b.parquet"\n', encoding="utf-8")
+    assert fontes.ler_configuracao(str(config)) == {"fonte": "http", "url": "http://exemplo/b.parquet"}
+    assert fontes.ler_configuracao(str(tmp_path / "nao_existe.toml")) == {}
+
+
+@pytest.fixture
+def servidor():
+    """Servidor HTTP local que entrega o parquet do repositório com ETag e responde 304 quando ela bate."""
+    with open(fontes.PARQUET_PADRAO, "rb") as arquivo:
+        conteudo = arquivo.read()
+    pedidos = []
+
+    class Manipulador(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            pedidos.append(self.headers.get("If-None-Match"))
+            if self.headers.get("If-None-Match") == '"v1"':
+                self.send_response(304)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("ETag", '"v1"')
+            self.send_header("Content-Length", str(len(conteudo)))
+            self.end_headers()
+            self.wfile.write(conteudo)
+
+        def log_message(self, *args):
+            pass
+
+    servidor = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Manipulador)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{servidor.server_port}/b.parquet", pedidos
+    servidor.shutdown()
+    servidor.server_close()
+
+
+def test_http_etag_e_304(servidor, tmp_path):
+    url, pedidos = servidor
+    fonte = fontes.FonteHttpEtag(url, str(tmp_path / "b.parquet"), timeout=5)
+    assert fonte.atualizar()  # Primeiro download
+    assert (tmp_path / "b.parquet.etag").read_text(encoding="utf-8") == '"v1"'
+    assert not fonte.atualizar()  # 304: mantém a cópia local
+    assert pedidos == [None, '"v1"']
+    df = fonte.ler()
+    assert list(df.columns) == ["data", "preco"] and len(df) > 0
+
+
+def test_http_sem_rede_usa_a_copia_local(servidor, tmp_path):
+    url, _ = servidor
+    destino = str(tmp_path / "b.parquet")
+    fontes.FonteHttpEtag(url, destino, timeout=5).atualizar()
+    offline = fontes.FonteHttpEtag("http://127.0.0.1:9/b.parquet", destino, timeout=1)
+    assert not offline.atualizar()
+    assert len(offline.ler()) > 0
+    import requests
+
+    with pytest.raises(requests.RequestException):
+        fontes.FonteHttpEtag("http://127.0.0.1:9/b.parquet", str(tmp_path / "nada.parquet"), timeout=1).atualizar()
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from brent.janelas import criar_janelas, criar_sequencias
+
+
+def sequencias_laco(dados, janela_temporal):
+    """``criar_sequencias`` original da página LSTM, com um ``append`` por linha."""
+    X, y = [], []
+    for i in range(janela_temporal, len(dados)):
+        X.append(dados[i-janela_temporal:i, 0])
+        y.append(dados[i, 0])
+    return np.array(X), np.array(y)
+
+
+@pytest.fixture
+def dados():
+    return np.random.default_rng(0).random((200, 1))
+
+
+@pytest.mark.parametrize("janela", [1, 10, 60])
+def test_igual_ao_laco_da_pagina(dados, janela):
+    X_laco, y_laco = sequencias_laco(dados, janela)
+    X, y = criar_sequencias(dados, janela)
+    assert len(X) == len(y) == len(X_laco) == len(dados) - janela
+    np.testing.assert_array_equal(X, X_laco.reshape((X_laco.shape[0], X_laco.shape[1], 1)))
+    np.testing.assert_array_equal(y, y_laco)
+
+
+def test_views_somente_leitura(dados):
+    X, y = criar_sequencias(dados, 10)
+    assert np.shares_memory(X, dados) and np.shares_memory(y, dados)
+    assert not X.flags.writeable
+
+
+def test_multi_horizonte(dados):
+    serie = dados[:, 0]
+    X, y = criar_janelas(serie, 5, horizontes=(1, 2, 3))
+    assert X.shape == (200 - 5 - 3 + 1, 5, 1) and y.shape == (len(X), 3, 1)
+    for i in (0, 17, len(X) - 1):
+        np.testing.assert_array_equal(X[i, :, 0], serie[i:i + 5])
+        np.testing.assert_array_equal(y[i, :, 0], serie[i + 5:i + 8])
+
+
+def test_horizontes_nao_consecutivos(dados):
+    serie = dados[:, 0]
+    X, y = criar_janelas(serie, 5, horizontes=(1, 5))
+    assert len(X) == 200 - 5 - 5 + 1 and y.shape == (len(X), 2, 1)
+    np.testing.assert_array_equal(y[:, 0, 0], serie[5:5 + len(X)])
+    np.testing.assert_array_equal(y[:, 1, 0], serie[9:9 + len(X)])
+
+
+def test_multivariada(dados):
+    multi = np.column_stack([dados[:, 0], 10 * dados[:, 0], -dados[:, 0]])
+    X, y = criar_janelas(multi, 4, horizontes=(1, 2), alvo=1)
+    assert X.shape == (200 - 4 - 2 + 1, 4, 3) and y.shape == (len(X), 2, 1)
+    np.testing.assert_array_equal(X[3], multi[3:7])
+    np.testing.assert_array_equal(y[3, :, 0], multi[7:9, 1])
+    _, y_lista = criar_janelas(multi, 4, alvo=[0, 2])
+    assert y_lista.shape == (200 - 4, 1, 2)
+    np.testing.assert_array_equal(y_lista[0, 0], multi[4, [0, 2]])
+
+
+def test_serie_curta_demais():
+    with pytest.raises(ValueError):
+        criar_janelas(np.arange(5.0), 5)
+    with pytest.raises(ValueError):
+        criar_janelas(np.arange(50.0), 5, horizontes=(0,))
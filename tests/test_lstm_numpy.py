@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("tensorflow")
+
+from brent import lstm_numpy  # noqa: E402
+from brent import modelo_lstm  # noqa: E402
+from brent.modelo_lstm import construir_modelo  # noqa: E402
+
+
+def modelo_aleatorio(janela, camadas, densa, semente=0):
+    """Modelo pequeno com todos os pesos sorteados, inclusive os bias (o Keras os inicia em 0 e 1)."""
+    modelo = construir_modelo(janela, unidades=8, camadas=camadas, densa=densa)
+    rng = np.random.default_rng(semente)
+    modelo.set_weights([rng.normal(scale=0.5, size=p.shape).astype(np.float32) for p in modelo.get_weights()])
+    return modelo
+
+
+@pytest.fixture
+def janelas():
+    return np.random.default_rng(1).random((300, 12, 1), dtype=np.float32)
+
+
+@pytest.mark.parametrize("camadas, densa", [(1, 0), (2, 4), (3, 0)])
+def test_igual_ao_predict_do_keras(tmp_path, janelas, camadas, densa):
+    modelo = modelo_aleatorio(12, camadas, densa)
+    caminho = lstm_numpy.exportar_pesos(modelo, str(tmp_path / lstm_numpy.ARQUIVO_PESOS))
+    modelo_numpy = lstm_numpy.ModeloNumPy.carregar(caminho)
+    previsoes = modelo_numpy.predict(janelas, batch_size=64)
+    assert previsoes.shape == (300, 1) and previsoes.dtype == np.float32
+    np.testing.assert_allclose(previsoes, modelo.predict(janelas, verbose=0), rtol=0, atol=1e-5)
+    assert lstm_numpy.comparar(modelo, modelo_numpy, janelas) < 1e-5
+
+
+def test_lotes_nao_mudam_o_resultado(tmp_path, janelas):
+    caminho = lstm_numpy.exportar_pesos(modelo_aleatorio(12, 2, 4), str(tmp_path / lstm_numpy.ARQUIVO_PESOS))
+    modelo_numpy = lstm_numpy.ModeloNumPy.carregar(caminho)
+    np.testing.assert_array_equal(modelo_numpy.predict(janelas, batch_size=7)[:5], modelo_numpy(janelas[:5]))
+    assert modelo_numpy.predict(janelas[:0]).shape == (0, 1)
+
+
+def test_recusa_camadas_sem_equivalente(tmp_path):
+    from tensorflow.keras.layers import Dense, Dropout, Input
+    from tensorflow.keras.models import Sequential
+
+    modelo = Sequential([Input((3,)), Dense(4, activation="relu"), Dense(1)])
+    with pytest.raises(ValueError, match="linear"):
+        lstm_numpy.exportar_pesos(modelo, str(tmp_path / "pesos.npz"))
+    modelo = Sequential([Input((3,)), Dense(4), Dropout(0.1), Dense(1)])
+    with pytest.raises(ValueError, match="Dropout"):
+        lstm_numpy.exportar_pesos(modelo, str(tmp_path / "pesos.npz"))
+
+
+def test_artefato_carrega_pelos_dois_motores(tmp_path, janelas):
+    from sklearn.preprocessing import MinMaxScaler
+
+    scaler = MinMaxScaler().fit(np.array([[20.0], [140.0]]))
+    artefato = modelo_lstm.ArtefatoLSTM(modelo_aleatorio(12, 2, 4), scaler, 12,
+                                        {"scaler": modelo_lstm.parametros_do_scaler(scaler), "janela_temporal": 12})
+    modelo_lstm.salvar_artefato(artefato, diretorio=str(tmp_path))
+    assert artefato.metadados["diferenca_numpy"] < 1e-5
+
+    numpy = modelo_lstm.carregar_artefato(diretorio=str(tmp_path), motor="numpy")
+    keras = modelo_lstm.carregar_artefato(diretorio=str(tmp_path), motor="keras")
+    assert isinstance(numpy.modelo, lstm_numpy.ModeloNumPy) and not isinstance(keras.modelo, lstm_numpy.ModeloNumPy)
+    np.testing.assert_allclose(numpy.modelo.predict(janelas), keras.modelo.predict(janelas, verbose=0), atol=1e-5)
+    assert numpy.scaler.data_max_[0] == 140.0 and numpy.versao == 1
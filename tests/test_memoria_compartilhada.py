@@ -0,0 +1,83 @@
+import glob
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from brent import memoria_compartilhada
+from brent.fontes import FonteArquivoLocal, FonteArrowMmap
+from brent.serie import SerieBrent
+
+
+@pytest.fixture
+def df():
+    datas = pd.bdate_range("2020-01-01", periods=300)
+    return pd.DataFrame({"data": datas, "preco": 60 + np.cos(np.arange(300))})
+
+
+def test_publicar_e_anexar(df, tmp_path):
+    serie = SerieBrent.de_dataframe(df)
+    caminho = memoria_compartilhada.publicar(serie, str(tmp_path / "serie-teste.arrow"))
+    anexada = memoria_compartilhada.anexar(caminho)
+    for nome in memoria_compartilhada.COLUNAS:
+        np.testing.assert_array_equal(getattr(anexada, nome), getattr(serie, nome))
+        assert getattr(anexada, nome).dtype == getattr(serie, nome).dtype
+    assert anexada.impressao_digital == serie.impressao_digital
+    # Views do arquivo mapeado, sem cópia e somente leitura
+    assert not anexada.precos.flags.owndata and not anexada.precos.flags.writeable
+    assert len(anexada.intervalo("2020-03-01", "2020-03-31")) == 22
+
+
+def test_anexar_em_outro_processo(df, tmp_path):
+    serie = SerieBrent.de_dataframe(df)
+    caminho = memoria_compartilhada.publicar(serie, str(tmp_path / "serie-teste.arrow"))
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    codigo = (f"import sys; sys.path.insert(0, {raiz!r})\n"
+              "from brent.memoria_compartilhada import anexar\n"
+              f"print(repr(float(anexar({caminho!r}).precos.sum())))")
+    saida = subprocess.run([sys.executable, "-c", codigo], capture_output=True, text=True, check=True).stdout
+    assert float(saida) == float(serie.precos.sum())
+
+
+def test_carregar_serie_publica_uma_vez_e_troca_quando_a_fonte_muda(df, tmp_path):
+    parquet, diretorio = str(tmp_path / "brent.parquet"), str(tmp_path / "shm")
+    df.to_parquet(parquet)
+    fonte = FonteArquivoLocal(parquet)
+    primeira = memoria_compartilhada.carregar_serie(fonte, diretorio)
+    publicados = glob.glob(os.path.join(diretorio, "*.arrow"))
+    assert len(publicados) == 1
+    modificado = os.stat(publicados[0]).st_mtime_ns
+    memoria_compartilhada.carregar_serie(fonte, diretorio)
+    assert os.stat(publicados[0]).st_mtime_ns == modificado
+
+    df.iloc[:200].to_parquet(parquet)
+    segunda = memoria_compartilhada.carregar_serie(fonte, diretorio)
+    assert len(segunda) == 200 and len(primeira) == 300  # A série antiga continua legível
+    assert glob.glob(os.path.join(diretorio, "*.arrow")) != publicados
+    assert len(glob.glob(os.path.join(diretorio, "*.arrow"))) == 1
+
+
+def test_fonte_arrow_publica_uma_vez(df, tmp_path):
+    parquet, diretorio = str(tmp_path / "brent.parquet"), str(tmp_path / "shm")
+    df.to_parquet(parquet)
+    fonte = FonteArrowMmap(parquet=parquet)
+    identidade = memoria_compartilhada.identidade_fonte(fonte)
+    memoria_compartilhada.carregar_serie(fonte, diretorio)
+    assert os.path.exists(fonte.caminho)  # O .arrow gerado na primeira leitura não muda a identidade
+    assert memoria_compartilhada.identidade_fonte(fonte) == identidade
+    publicados = glob.glob(os.path.join(diretorio, "*.arrow"))
+    modificado = os.stat(publicados[0]).st_mtime_ns
+    assert len(memoria_compartilhada.carregar_serie(fonte, diretorio)) == 300
+    assert glob.glob(os.path.join(diretorio, "*.arrow")) == publicados
+    assert os.stat(publicados[0]).st_mtime_ns == modificado
+
+
+def test_habilitada_pela_variavel_de_ambiente(monkeypatch):
+    monkeypatch.setenv("BRENT_MEMORIA_COMPARTILHADA", "0")
+    assert not memoria_compartilhada.habilitada({"memoria_compartilhada": True})
+    monkeypatch.delenv("BRENT_MEMORIA_COMPARTILHADA")
+    assert not memoria_compartilhada.habilitada({"memoria_compartilhada": False})
+    assert memoria_compartilhada.habilitada({})
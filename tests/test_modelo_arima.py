@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from brent import modelo_arima
+from brent.cache import CacheDisco
+
+
+@pytest.fixture
+def ar1():
+    rng = np.random.default_rng(1)
+    x = np.zeros(300)
+    for t in range(1, len(x)):
+        x[t] = 0.6 * x[t - 1] + rng.normal()
+    return 50 + x
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = CacheDisco("arima", raiz=str(tmp_path))
+    monkeypatch.setattr(modelo_arima, "cache_arima", cache)
+    return cache
+
+
+def test_diferencas_necessarias():
+    rng = np.random.default_rng(0)
+    ruido = rng.normal(size=500)
+    assert modelo_arima.diferencas_necessarias(ruido) == 0
+    assert modelo_arima.diferencas_necessarias(np.cumsum(ruido)) == 1
+
+
+def test_vizinhos_respeitam_os_limites():
+    config = {**modelo_arima.CONFIG_PADRAO, "max_p": 2, "max_q": 1}
+    vizinhos = list(modelo_arima._vizinhos((2, 1, 1, 0, 0, 1, 5), config))
+    assert vizinhos
+    for p, d, q, P, D, Q, s in vizinhos:
+        assert 0 <= p <= 2 and 0 <= q <= 1 and 0 <= P <= 1 and 0 <= Q <= 1 and (d, D, s) == (1, 0, 5)
+    assert (1, 1, 1, 0, 0, 1, 5) in vizinhos and (2, 1, 1, 1, 0, 1, 5) in vizinhos
+
+
+def test_poda_candidato_pior_que_o_limite(ar1):
+    assert modelo_arima.ajustar_ordem(ar1, (1, 0, 0, 0, 0, 0, 0))["status"] == "ok"
+    assert modelo_arima.ajustar_ordem(ar1, (0, 0, 0, 0, 0, 0, 0), limite=0.0)["status"] == "podado"
+
+
+@pytest.mark.parametrize("excecao", [IndexError, RuntimeError, np.linalg.LinAlgError])
+def test_erro_no_ajuste_vira_status(ar1, monkeypatch, excecao):
+    def falhar(x, ordem):
+        raise excecao("falhou")
+
+    monkeypatch.setattr(modelo_arima, "construir", falhar)
+    registro = modelo_arima.ajustar_ordem(ar1, (1, 0, 0, 0, 0, 0, 0))
+    assert registro["status"] == "erro" and registro["erro"] == f"{excecao.__name__}: falhou"
+    assert np.isnan(registro["aic"]) and registro["segundos"] >= 0
+
+
+def test_busca_encontra_ar1_e_registra_tentativas(ar1):
+    melhor, tentativas = modelo_arima.buscar_ordem(ar1, {"sazonalidade": 0, "d": 0}, processos=1)
+    p, d, q = melhor["ordem"][:3]
+    assert d == 0 and p + q >= 1
+    assert melhor["aic"] == tentativas["aic"].min()
+    assert len(tentativas) <= modelo_arima.CONFIG_PADRAO["max_modelos"]
+
+
+def test_cache_e_append_sem_reajuste(ar1, cache):
+    datas = pd.bdate_range("2020-01-01", periods=len(ar1)).to_numpy()
+    config = {"sazonalidade": 0, "d": 0, "max_p": 1, "max_q": 1}
+    resultado, busca, info = modelo_arima.ajustar_arima(datas[:280], ar1[:280], config, processos=1)
+    assert info["origem"] == "busca"
+
+    _, _, info = modelo_arima.ajustar_arima(datas[:280], ar1[:280], config, processos=1)
+    assert info["origem"] == "cache"
+
+    novo, busca_novo, info = modelo_arima.ajustar_arima(datas, ar1, config, processos=1)
+    assert info["origem"] == "append"
+    assert tuple(busca_novo["ordem"]) == tuple(busca["ordem"])
+    np.testing.assert_allclose(novo.params, resultado.params)
+    assert novo.nobs == len(ar1)
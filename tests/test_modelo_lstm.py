@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+from sklearn.preprocessing import MinMaxScaler
+
+from brent import modelo_lstm
+from brent.lstm_numpy import ModeloNumPy
+
+
+def modelo_numpy(unidades=6, semente=0):
+    """LSTM de uma camada + Dense com pesos sorteados, sem passar pelo TensorFlow."""
+    rng = np.random.default_rng(semente)
+    sortear = lambda *forma: rng.normal(scale=0.5, size=forma).astype(np.float32)  # noqa: E731
+    return ModeloNumPy([
+        ("LSTM", {"kernel": sortear(1, 4 * unidades), "recorrente": sortear(unidades, 4 * unidades),
+                  "bias": sortear(4 * unidades), "sequencias": np.array(False)}),
+        ("Dense", {"kernel": sortear(unidades, 1), "bias": sortear(1)}),
+    ])
+
+
+@pytest.fixture
+def artefato():
+    scaler = MinMaxScaler().fit(np.array([[20.0], [140.0]]))
+    return modelo_lstm.ArtefatoLSTM(modelo_numpy(), scaler, 15, {"versao": 1}, "teste")
+
+
+@pytest.fixture
+def precos():
+    return 80 + np.cumsum(np.random.default_rng(2).normal(size=260))
+
+
+def recursao_uma_origem(artefato, janela, passos):
+    janela = janela.reshape(1, -1, 1).astype(np.float32)
+    previsoes = []
+    for _ in range(passos):
+        proximo = float(artefato.modelo(janela)[0, 0])
+        previsoes.append(proximo)
+        janela = np.concatenate([janela[:, 1:], [[[proximo]]]], axis=1).astype(np.float32)
+    return artefato.scaler.inverse_transform(np.array(previsoes).reshape(-1, 1)).ravel()
+
+
+def test_lote_igual_a_recursao_por_origem(artefato, precos):
+    escalados = artefato.scaler.transform(precos.reshape(-1, 1)).astype(np.float32)
+    janelas = np.stack([escalados[i:i + 15] for i in range(0, 200, 9)])
+    trajetorias = modelo_lstm.prever_trajetorias(artefato, janelas, 12)
+    assert trajetorias.shape == (len(janelas), 12)
+    for janela, trajetoria in zip(janelas, trajetorias):
+        np.testing.assert_allclose(trajetoria, recursao_uma_origem(artefato, janela, 12), rtol=0, atol=1e-4)
+
+
+def test_prever_recursivo_parte_do_fim_da_serie(artefato, precos):
+    escalados = artefato.scaler.transform(precos[-15:].reshape(-1, 1))
+    np.testing.assert_allclose(modelo_lstm.prever_recursivo(artefato, precos, 7),
+                               recursao_uma_origem(artefato, escalados, 7), rtol=0, atol=1e-4)
+
+
+def test_modelo_com_varias_saidas_avanca_varios_dias(artefato):
+    chamadas = []
+
+    def tres_saidas(janelas, training=False):
+        chamadas.append(janelas.shape)
+        return np.repeat(janelas[:, -1:, 0] + 0.01, 3, axis=1)
+
+    artefato.modelo = tres_saidas
+    trajetorias = modelo_lstm.prever_trajetorias(artefato, np.full((4, 15, 1), 0.5, dtype=np.float32), 7)
+    assert len(chamadas) == 3 and all(forma == (4, 15, 1) for forma in chamadas)
+    esperado = artefato.scaler.inverse_transform(np.array([[0.51] * 3 + [0.52] * 3 + [0.53]]).T).ravel()
+    np.testing.assert_allclose(trajetorias, np.tile(esperado, (4, 1)), atol=1e-4)
+
+
+def test_erros_por_horizonte(artefato, precos):
+    resultado = modelo_lstm.erros_por_horizonte(artefato, precos, 5, passo_origens=2)
+    inicio = int((len(precos) - 15) * modelo_lstm.PROPORCAO_TREINO)
+    origens = range(inicio, len(precos) - 15 - 5 + 1, 2)
+    escalados = artefato.scaler.transform(precos.reshape(-1, 1))
+    erros = np.array([recursao_uma_origem(artefato, escalados[o:o + 15], 5) - precos[o + 15:o + 20] for o in origens])
+    assert resultado["origens"] == len(origens)
+    np.testing.assert_array_equal(resultado["horizonte"], np.arange(1, 6))
+    np.testing.assert_allclose(resultado["rmse"], np.sqrt(np.mean(erros ** 2, axis=0)), atol=1e-3)
+    np.testing.assert_allclose(resultado["mae"], np.mean(np.abs(erros), axis=0), atol=1e-3)
+    assert modelo_lstm.erros_por_horizonte(artefato, precos[:40], 30)["origens"] == 0
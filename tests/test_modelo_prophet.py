@@ -0,0 +1,134 @@
+import copy
+import logging
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("prophet")
+
+from brent import modelo_prophet  # noqa: E402
+from brent.cache import CacheDisco  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def modelo():
+    from prophet import Prophet
+
+    logging.getLogger("cmdstanpy").setLevel(logging.WARNING)
+    datas = pd.bdate_range("2023-01-02", periods=200)
+    y = 80 + 0.05 * np.arange(200) + np.random.default_rng(0).normal(size=200)
+    return Prophet(weekly_seasonality=False, yearly_seasonality=False).fit(pd.DataFrame({"ds": datas, "y": y}))
+
+
+@pytest.fixture
+def futuro():
+    return pd.DataFrame({"ds": pd.bdate_range("2023-01-02", periods=260)})
+
+
+def test_previsao_pontual_igual_ao_predict(modelo, futuro):
+    previsoes = modelo_prophet.prever(modelo, futuro)
+    np.testing.assert_allclose(previsoes["yhat"], modelo.predict(futuro)["yhat"])
+    assert modelo.uncertainty_samples == modelo_prophet.AMOSTRAS_PADRAO  # O modelo original não muda
+
+
+def test_lote_unico_igual_ao_predict_com_amostras(modelo, futuro):
+    np.random.seed(7)
+    previsoes = modelo_prophet.prever(modelo, futuro, amostras=200, linhas_por_lote=len(futuro))
+    np.random.seed(7)
+    referencia = modelo_prophet.prever(modelo, futuro, amostras=0)
+    copia = copy.copy(modelo)
+    copia.uncertainty_samples = 200
+    referencia[modelo_prophet.COLUNAS_INTERVALO] = copia.predict(futuro)[modelo_prophet.COLUNAS_INTERVALO]
+    pd.testing.assert_frame_equal(previsoes, referencia)
+
+
+def test_lotes_cobrem_todas_as_datas(modelo, futuro):
+    np.random.seed(0)
+    previsoes = modelo_prophet.prever(modelo, futuro, amostras=200, linhas_por_lote=70)
+    assert len(previsoes) == len(futuro)
+    assert previsoes[modelo_prophet.COLUNAS_INTERVALO].notna().all().all()
+    assert (previsoes["yhat_lower"] <= previsoes["yhat"]).all() and (previsoes["yhat"] <= previsoes["yhat_upper"]).all()
+
+
+def test_intervalos_em_cache(modelo, futuro, tmp_path, monkeypatch):
+    monkeypatch.setattr(modelo_prophet, "cache_intervalos", CacheDisco("prophet_intervalos", raiz=str(tmp_path)))
+    primeiro = modelo_prophet.intervalos(modelo, "modelo-teste", futuro["ds"], amostras=100)
+    monkeypatch.setattr(modelo_prophet, "prever", lambda *a, **k: pytest.fail("deveria vir do cache"))
+    segundo = modelo_prophet.intervalos(modelo, "modelo-teste", futuro["ds"], amostras=100)
+    pd.testing.assert_frame_equal(primeiro, segundo)
+    assert list(segundo.columns) == ["ds", *modelo_prophet.COLUNAS_INTERVALO]
+
+
+def test_previsao_nas_datas_pedidas_fica_no_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(modelo_prophet, "cache_prophet", CacheDisco("prophet", raiz=str(tmp_path)))
+    datas = pd.bdate_range("2023-01-02", periods=120)
+    df = pd.DataFrame({"ds": datas, "y": 80 + np.sin(np.arange(120) / 5)})
+    train, test = df.iloc[:100], df.iloc[100:]
+    _, previsoes, info = modelo_prophet.ajustar_prophet(train, len(test), datas=test["ds"])
+    assert info["modo"] == "frio"
+    pd.testing.assert_series_equal(previsoes["ds"], df["ds"], check_names=False)
+    _, do_cache, info = modelo_prophet.ajustar_prophet(train, len(test), datas=test["ds"])
+    assert info["modo"] == "cache"
+    pd.testing.assert_frame_equal(do_cache, previsoes)
+    assert (modelo_prophet.chave_modelo(train, len(test), {}, test["ds"])
+            != modelo_prophet.chave_modelo(train, len(test), {}))
+
+
+def test_parametros_iniciais_no_fit(modelo):
+    from prophet import Prophet
+
+    parametros = modelo_prophet.parametros_iniciais(modelo)
+    assert set(parametros) == set(modelo_prophet.PARAMETROS_AQUECIMENTO)
+    assert isinstance(parametros["k"], float) and parametros["delta"].shape == modelo.params["delta"].shape[1:]
+    reajustado = Prophet(weekly_seasonality=False, yearly_seasonality=False).fit(modelo.history[["ds", "y"]],
+                                                                                 init=parametros)
+    for nome in ("k", "m", "sigma_obs"):
+        assert reajustado.params[nome][0, 0] == pytest.approx(modelo.params[nome][0, 0], rel=1e-2, abs=1e-3)
+
+
+@pytest.fixture
+def historico(tmp_path, monkeypatch):
+    monkeypatch.setattr(modelo_prophet, "cache_prophet", CacheDisco("prophet", raiz=str(tmp_path)))
+    datas = pd.bdate_range("2023-01-02", periods=160)
+    return pd.DataFrame({"ds": datas, "y": 80 + 0.05 * np.arange(160) + np.sin(np.arange(160) / 5)})
+
+
+def test_modos_do_ajuste(historico):
+    ajustar = modelo_prophet.ajustar_prophet
+    assert ajustar(historico.iloc[:120], 10)[2]["modo"] == "frio"
+    # Até ``tolerancia_dias`` pregões novos: o modelo do prefixo é reaproveitado sem ajuste
+    modelo, previsoes, info = ajustar(historico.iloc[:123], 10, tolerancia_dias=3)
+    assert info["modo"] == "reaproveitado" and len(modelo.history) == 120
+    assert previsoes["ds"].iloc[-11] == historico["ds"].iloc[122] and len(previsoes) == 133
+    # Mais pregões novos que a tolerância: reajuste a partir dos parâmetros do anterior
+    modelo, _, info = ajustar(historico.iloc[:140], 10, tolerancia_dias=3)
+    assert info["modo"] == "aquecido" and len(modelo.history) == 140
+    assert info["segundos_frio"] is not None
+    # Sem aquecimento, ou com outros hiperparâmetros, o ajuste é a frio
+    assert ajustar(historico.iloc[:150], 10, aquecer=False)[2]["modo"] == "frio"
+    assert ajustar(historico.iloc[:155], 10, {"changepoint_prior_scale": 0.1})[2]["modo"] == "frio"
+
+
+def test_sem_prefixo_igual_o_ajuste_e_frio(historico):
+    modelo_prophet.ajustar_prophet(historico.iloc[:120], 10)
+    revisado = historico.iloc[:130].copy()
+    revisado.loc[5, "y"] += 1  # Um preço antigo corrigido: o treino anterior deixa de ser prefixo
+    assert modelo_prophet.ajustar_prophet(revisado, 10, tolerancia_dias=30)[2]["modo"] == "frio"
+
+
+def test_nova_origem_descarta_so_treinos_que_nao_sao_prefixo(historico):
+    cache = modelo_prophet.cache_prophet
+    modelo_prophet.ajustar_prophet(historico.iloc[:120], 10, origem="v1")
+    # Dados só acrescentados: o modelo anterior continua no cache e aquece o novo ajuste
+    assert modelo_prophet.ajustar_prophet(historico.iloc[:140], 10, origem="v2")[2]["modo"] == "aquecido"
+    assert len(cache.entradas()) == 2
+    # Um preço antigo corrigido: nenhum treino anterior é prefixo dos dados novos
+    revisado = historico.iloc[:140].copy()
+    revisado.loc[5, "y"] += 1
+    modelo_prophet.ajustar_prophet(revisado, 10, origem="v3")
+    assert [cache.metadados(chave)["n_treino"] for chave, _, _ in cache.entradas()] == [140]
+    assert cache.metadados(cache.entradas()[0][0])["hash_treino"] == modelo_prophet.hash_dataframe(revisado)
+    # Sem aquecimento, a nova origem limpa o cache inteiro
+    modelo_prophet.ajustar_prophet(revisado.iloc[:130], 10, origem="v4", aquecer=False)
+    assert len(cache.entradas()) == 1
@@ -0,0 +1,17 @@
+import os
+
+from brent.paralelo import LIMITES_THREADS, criar_pool
+
+
+def ambiente(variaveis):
+    return {variavel: os.environ.get(variavel) for variavel in variaveis}
+
+
+def test_limites_so_nos_processos_filhos(monkeypatch):
+    for variavel in LIMITES_THREADS:
+        monkeypatch.delenv(variavel, raising=False)
+    antes = dict(os.environ)
+    with criar_pool(2, threads=2) as pool:
+        filhos = list(pool.map(ambiente, [LIMITES_THREADS] * 2))
+    assert all(filho == {variavel: "2" for variavel in LIMITES_THREADS} for filho in filhos)
+    assert dict(os.environ) == antes
@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("tensorflow")
+
+from brent import modelo_lstm, pipeline_lstm  # noqa: E402
+from brent.janelas import criar_sequencias  # noqa: E402
+
+
+@pytest.fixture
+def serie():
+    return np.random.default_rng(0).random((200, 1)).astype(np.float32)
+
+
+def lotes(dataset):
+    X, y = zip(*[(X.numpy(), y.numpy()) for X, y in dataset])
+    return np.concatenate(X), np.concatenate(y)
+
+
+def test_janelas_iguais_as_da_pagina(serie):
+    X, y = lotes(pipeline_lstm.criar_dataset(serie, 10, range(30, 150), batch_size=16, cache=""))
+    X_pagina, y_pagina = criar_sequencias(serie, 10)
+    assert X.shape == (120, 10, 1)
+    np.testing.assert_array_equal(X, X_pagina[30:150])
+    np.testing.assert_array_equal(y, y_pagina[30:150])
+
+
+def test_embaralhar_muda_a_ordem_mas_nao_as_janelas(serie):
+    X, y = lotes(pipeline_lstm.criar_dataset(serie, 10, range(0, 100), embaralhar=True, semente=3))
+    X_ordem, y_ordem = lotes(pipeline_lstm.criar_dataset(serie, 10, range(0, 100)))
+    assert not np.array_equal(y, y_ordem)
+    ordem, ordem_original = np.argsort(y), np.argsort(y_ordem)
+    np.testing.assert_array_equal(X[ordem], X_ordem[ordem_original])
+
+
+def test_dividir_origens():
+    treino, validacao = pipeline_lstm.dividir_origens(1000, 0.8, 0.1)
+    assert (treino, validacao) == (range(0, 720), range(720, 800))
+    assert pipeline_lstm.dividir_origens(1000, 0.8, 0.0) == (range(0, 800), range(800, 800))
+
+
+def test_callbacks_treino(tmp_path):
+    parada, = pipeline_lstm.callbacks_treino(paciencia=2)
+    assert parada.patience == 2 and parada.restore_best_weights
+    assert len(pipeline_lstm.callbacks_treino(checkpoint=str(tmp_path / "a" / "melhor.weights.h5"))) == 2
+    assert (tmp_path / "a").is_dir()
+
+
+def test_melhores_pesos_restaurados_sem_parada_antecipada():
+    modelo = modelo_lstm.construir_modelo(10)
+    parada, = pipeline_lstm.callbacks_treino(paciencia=5)
+    parada.set_model(modelo)
+    parada.on_train_begin()
+    melhores = modelo.get_weights()
+    parada.on_epoch_end(0, {"val_loss": 1.0})
+    modelo.set_weights([w + 1 for w in melhores])
+    parada.on_epoch_end(1, {"val_loss": 2.0})  # Pior, mas sem esgotar a paciência
+    parada.on_train_end()
+    assert parada.stopped_epoch == 0
+    for peso, melhor in zip(modelo.get_weights(), melhores):
+        np.testing.assert_array_equal(peso, melhor)
+
+
+def test_treinar_com_validacao_e_checkpoint(tmp_path):
+    precos = 70 + np.cumsum(np.random.default_rng(1).normal(size=300))
+    progresso = []
+    artefato = modelo_lstm.treinar(precos, janela_temporal=10, epochs=3, batch_size=32,
+                                   arquitetura={"unidades": 4, "camadas": 1, "densa": 0},
+                                   checkpoint=str(tmp_path / "melhor.weights.h5"),
+                                   progresso=lambda *a, **metricas: progresso.append(metricas))
+    metadados = artefato.metadados
+    assert (metadados["janelas_treino"], metadados["janelas_validacao"]) == (209, 23)
+    assert 1 <= metadados["epocas_treinadas"] <= 3 and len(progresso) == metadados["epocas_treinadas"]
+    assert metadados["val_loss_melhor"] is not None and metadados["amostras_por_segundo"] > 0
+    assert (tmp_path / "melhor.weights.h5").exists()
+    assert artefato.modelo.predict(np.zeros((2, 10, 1)), verbose=0).shape == (2, 1)
+
+
+@pytest.mark.parametrize("cache", ["", "arquivo"])
+def test_cache_nao_congela_a_ordem_das_epocas(serie, tmp_path, cache):
+    cache = str(tmp_path / "treino") if cache else ""
+    dataset = pipeline_lstm.criar_dataset(serie, 10, range(0, 120), batch_size=16, embaralhar=True, cache=cache,
+                                          semente=5)
+    (X1, y1), (X2, y2) = lotes(dataset), lotes(dataset)
+    assert X1.shape == X2.shape == (120, 10, 1)
+    assert not np.array_equal(y1, y2)  # Nova ordem a cada época
+    np.testing.assert_array_equal(np.sort(y1), np.sort(criar_sequencias(serie, 10)[1][:120]))
+    np.testing.assert_array_equal(X1[np.argsort(y1)], X2[np.argsort(y2)])
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from brent import reducao
+
+
+@pytest.fixture
+def serie_longa():
+    x = pd.bdate_range("1987-05-20", periods=10_000).to_numpy()
+    y = 50 + np.cumsum(np.random.default_rng(2).normal(size=len(x)))
+    y[3_000], y[7_500] = y.max() + 40, y.min() - 30  # Pico e vale isolados, como 2008 e 2020
+    return x, y
+
+
+@pytest.mark.parametrize("metodo", ["lttb", "minmax"])
+@pytest.mark.parametrize("n", [3, 50, 300, 1_400])
+def test_reducao_mantem_extremos_e_orcamento(serie_longa, metodo, n):
+    x, y = serie_longa
+    indices = reducao.reduzir(x, y, n, metodo)
+    assert (np.diff(indices) > 0).all()
+    assert indices[0] == 0 and indices[-1] == len(y) - 1
+    assert {3_000, 7_500} <= set(indices.tolist())
+    assert len(indices) <= n + 2
+
+
+def test_lttb_com_n_pontos(serie_longa):
+    x, y = serie_longa
+    assert len(reducao.lttb_indices(x, y, 500)) == 500
+    np.testing.assert_array_equal(reducao.lttb_indices(x[:100], y[:100], 500), np.arange(100))
+
+
+def test_minmax_guarda_a_envoltoria_de_cada_balde(serie_longa):
+    _, y = serie_longa
+    indices = reducao.minmax_indices(y, 20)
+    for balde in np.array_split(np.arange(len(y)), 10):
+        trecho = set(indices[(indices >= balde[0]) & (indices <= balde[-1])].tolist())
+        assert balde[0] + int(np.argmax(y[balde])) in trecho and balde[0] + int(np.argmin(y[balde])) in trecho
+
+
+def test_metodo_desconhecido(serie_longa):
+    with pytest.raises(ValueError):
+        reducao.reduzir(*serie_longa, 100, metodo="media")
+
+
+@pytest.mark.parametrize("a, b, orcamento, nivel", [
+    (0, 10_000, 300, 512),     # Série inteira: o menor nível com pelo menos 300 pontos
+    (0, 5_000, 300, 1_024),    # Metade da série: 1024 pontos no nível, ~512 dentro do trecho
+    (2_000, 2_800, 300, 4_096),
+])
+def test_piramide_escolhe_o_nivel(serie_longa, a, b, orcamento, nivel):
+    piramide = reducao.Piramide(*serie_longa)
+    indices = piramide.indices(a, b, orcamento)
+    assert list(piramide._niveis) == [nivel]
+    assert indices[0] == a and indices[-1] == b - 1
+    assert a + int(np.argmax(piramide.y[a:b])) in indices and a + int(np.argmin(piramide.y[a:b])) in indices
+    assert orcamento <= len(indices) <= 2 * orcamento + 4
+
+
+def test_piramide_trecho_curto_ou_nivel_grande_demais(serie_longa):
+    piramide = reducao.Piramide(*serie_longa)
+    np.testing.assert_array_equal(piramide.indices(100, 300, 300), np.arange(100, 300))
+    indices = piramide.indices(1_000, 9_000, 7_000)  # Nenhum nível menor que a série: reduz o trecho direto
+    assert piramide._niveis == {} and len(indices) <= 7_002
+    assert indices[0] == 1_000 and indices[-1] == 8_999
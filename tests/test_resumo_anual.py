@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from brent.serie import SerieBrent
+
+
+@pytest.fixture
+def df():
+    datas = pd.bdate_range("2015-03-10", "2020-08-20")
+    rng = np.random.default_rng(3)
+    precos = 60 + np.cumsum(rng.normal(size=len(datas))) + 20 * (datas.year % 2)  # Saltos entre os anos
+    return pd.DataFrame({"data": datas, "preco": precos})
+
+
+@pytest.fixture
+def resumo(df):
+    return SerieBrent.de_dataframe(df).resumo_anual
+
+
+@pytest.mark.parametrize("ano_inicial, ano_final", [(2015, 2020), (2016, 2018), (2017, 2017), (2014, 2016),
+                                                    (2019, 2025)])
+def test_descrever_igual_ao_describe(df, resumo, ano_inicial, ano_final):
+    filtrado = df[(df["data"].dt.year >= ano_inicial) & (df["data"].dt.year <= ano_final)]
+    esperado = filtrado["preco"].describe()
+    obtido = resumo.descrever(ano_inicial, ano_final)
+    assert list(obtido.index) == list(esperado.index)
+    np.testing.assert_allclose(obtido.to_numpy(), esperado.to_numpy(), rtol=1e-12)
+
+
+def test_desvio_com_ddof_1(df, resumo):
+    assert resumo.descrever(2015, 2020)["std"] == pytest.approx(df["preco"].std(ddof=1), rel=1e-12)
+    assert resumo.tabela.loc[2016, "desvio"] == pytest.approx(df.loc[df["data"].dt.year == 2016, "preco"].std(), rel=1e-12)
+
+
+def test_intervalo_vazio(resumo):
+    descricao = resumo.descrever(2030, 2031)
+    assert descricao["count"] == 0 and descricao.iloc[1:].isna().all()
+
+
+def test_boxplot_com_os_quartis_de_cada_ano(df, resumo):
+    estatisticas = resumo.estatisticas_boxplot(2016, 2017)
+    assert [e["label"] for e in estatisticas] == ["2016", "2017"]
+    precos = df.loc[df["data"].dt.year == 2017, "preco"]
+    assert estatisticas[1]["q1"] == pytest.approx(precos.quantile(0.25))
+    assert estatisticas[1]["whislo"] >= precos.min() and estatisticas[1]["whishi"] <= precos.max()
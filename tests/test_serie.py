@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from brent.serie import SerieBrent
+
+
+@pytest.fixture
+def df():
+    datas = pd.bdate_range("2020-01-01", "2021-12-31")
+    precos = 60 + np.cumsum(np.random.default_rng(0).normal(size=len(datas)))
+    # Fora de ordem, como pode vir do parquet
+    return pd.DataFrame({"data": datas, "preco": precos}).sample(frac=1, random_state=1).reset_index(drop=True)
+
+
+@pytest.fixture
+def serie(df):
+    return SerieBrent.de_dataframe(df)
+
+
+def filtro_antigo(df, inicio, fim):
+    """Filtro por máscara booleana que as páginas usavam."""
+    df = df.sort_values("data", kind="stable")
+    return df[(df["data"] >= inicio) & (df["data"] <= fim)]
+
+
+def test_ordenada_e_sem_datas_invalidas(df):
+    df = pd.concat([df, pd.DataFrame({"data": [None], "preco": [1.0]})], ignore_index=True)
+    serie = SerieBrent.de_dataframe(df)
+    assert len(serie) == len(df) - 1
+    assert (np.diff(serie.datas.view(np.int64)) > 0).all()
+
+
+@pytest.mark.parametrize("inicio, fim", [
+    ("2020-03-02", "2020-06-30"),  # Datas presentes na série, inclusive nos dois extremos
+    ("2020-03-01", "2020-06-28"),  # Fins de semana: fora da série
+    ("2019-01-01", "2020-01-01"),  # Começa antes da primeira data
+    ("2021-12-31", "2023-01-01"),  # Só a última data
+    ("2019-01-01", "2023-01-01"),  # Série inteira
+    ("2022-01-01", "2023-01-01"),  # Depois da última data
+    ("2020-06-30", "2020-03-02"),  # Intervalo invertido
+])
+def test_posicoes_iguais_a_mascara(df, serie, inicio, fim):
+    esperado = filtro_antigo(df, pd.Timestamp(inicio), pd.Timestamp(fim))
+    a, b = serie.posicoes(inicio, fim)
+    assert 0 <= a <= b <= len(serie) and b - a == len(esperado)
+    sub = serie.intervalo(inicio, fim)
+    np.testing.assert_array_equal(sub.datas, esperado["data"].to_numpy())
+    np.testing.assert_array_equal(sub.precos, esperado["preco"].to_numpy())
+
+
+def test_posicoes_sem_limites(serie):
+    assert serie.posicoes() == (0, len(serie))
+    assert serie.posicoes(fim=serie.datas[0]) == (0, 1)
+    assert serie.posicoes(inicio=serie.datas[-1]) == (len(serie) - 1, len(serie))
+
+
+def test_arrays_somente_leitura_e_views(serie):
+    sub = serie.intervalo("2020-03-02", "2020-06-30")
+    for array in (serie.datas, serie.precos, serie.anos, sub.datas, sub.precos, sub.meses):
+        assert not array.flags.writeable
+        with pytest.raises(ValueError):
+            array[0] = array[1]
+    assert np.shares_memory(sub.precos, serie.precos)
+    assert sub.impressao_digital == serie.impressao_digital
+
+
+def test_para_dataframe_igual_ao_caminho_antigo(df, serie):
+    antigo = df.sort_values("data", kind="stable").reset_index(drop=True)
+    antigo["ano"] = pd.to_datetime(antigo["data"]).dt.year
+    novo = serie.para_dataframe()
+    pd.testing.assert_frame_equal(novo, antigo, check_dtype=False)
+    assert list(serie.meses[:3]) == list(antigo["data"].dt.month[:3])
+    assert list(serie.dias_semana[:3]) == list(antigo["data"].dt.dayofweek[:3])
@@ -0,0 +1,105 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from brent import api, snapshot
+from brent.serie import SerieBrent
+
+
+@pytest.fixture
+def periodo():
+    datas = pd.bdate_range("2024-01-01", periods=50)
+    precos = 80 + np.sin(np.arange(50))
+    return SerieBrent.de_dataframe(pd.DataFrame({"data": datas, "preco": precos}))
+
+
+def prever_falso(periodo, horizonte):
+    n = int(len(periodo) * snapshot.PROPORCAO_TREINO)
+    linhas = pd.concat([
+        snapshot._linhas("prophet", "teste", periodo.datas[n:], periodo.precos[n:] + 1, periodo.precos[n:],
+                         periodo.precos[n:], periodo.precos[n:] + 2),
+        snapshot._linhas("prophet", "futuro", snapshot.datas_futuras(periodo.datas[-1], horizonte),
+                         np.full(horizonte, 80.0)),
+    ])
+    return linhas, {"nivel_intervalo": 0.8}
+
+
+def prever_com_erro(periodo, horizonte):
+    raise RuntimeError("sem artefato")
+
+
+@pytest.fixture
+def gerado(periodo, monkeypatch, tmp_path):
+    monkeypatch.setattr(snapshot, "MODELOS", {"prophet": prever_falso, "arima": snapshot.MODELOS["arima"],
+                                              "lstm": prever_com_erro})
+    tabela, metadados = snapshot.gerar(periodo, modelos=("prophet", "lstm"), horizonte=5)
+    return tabela, metadados, snapshot.salvar(tabela, metadados, str(tmp_path / "previsoes.parquet"))
+
+
+def test_gerar_registra_metricas_e_erros(gerado):
+    tabela, metadados, _ = gerado
+    assert set(metadados["modelos"]) == {"prophet"} and "lstm" in metadados["erros"]
+    assert metadados["modelos"]["prophet"]["rmse"] == pytest.approx(1.0, abs=1e-6)
+    assert metadados["modelos"]["prophet"]["nivel_intervalo"] == 0.8
+    assert len(snapshot.fatiar(tabela, "prophet", "futuro")) == 5
+    assert all(tabela[coluna].dtype == np.float32 for coluna in snapshot.COLUNAS_VALORES)
+
+
+def test_salvar_e_carregar(gerado):
+    tabela, metadados, caminho = gerado
+    lida, metadados_lidos = snapshot.carregar(caminho)
+    pd.testing.assert_frame_equal(lida, tabela)
+    assert metadados_lidos == json.loads(json.dumps(metadados))
+    assert snapshot.carregar(caminho + ".inexistente") is None
+
+
+def test_fatiar_por_datas(gerado):
+    tabela, _, _ = gerado
+    fatia = snapshot.fatiar(tabela, tipo="teste", inicio="2024-03-01", fim="2024-03-05")
+    assert list(fatia["data"].dt.day) == [1, 4, 5]
+
+
+def test_nenhum_modelo_e_modelo_desconhecido(periodo, monkeypatch):
+    monkeypatch.setattr(snapshot, "MODELOS", {"lstm": prever_com_erro})
+    with pytest.raises(RuntimeError):
+        snapshot.gerar(periodo, modelos=("lstm",))
+    with pytest.raises(ValueError):
+        snapshot.gerar(periodo, modelos=("xgboost",))
+
+
+@pytest.fixture
+def servidor(gerado):
+    servidor = api.criar_servidor(porta=0, caminho=gerado[2], silencioso=True)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{servidor.server_address[1]}"
+    servidor.shutdown()
+    servidor.server_close()
+
+
+def consultar(url, **cabecalhos):
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, headers=cabecalhos)) as resposta:
+            return resposta.status, resposta.headers, resposta.read()
+    except urllib.error.HTTPError as erro:
+        return erro.code, erro.headers, erro.read()
+
+
+def test_api_previsoes_e_etag(servidor):
+    status, cabecalhos, corpo = consultar(f"{servidor}/previsoes?modelo=prophet&tipo=futuro")
+    assert status == 200
+    linhas = json.loads(corpo)["linhas"]
+    assert len(linhas) == 5 and linhas[0]["inferior"] is None
+    assert consultar(f"{servidor}/previsoes", **{"If-None-Match": cabecalhos["ETag"]})[0] == 304
+
+
+def test_api_erros(servidor):
+    assert consultar(f"{servidor}/previsoes?tipo=passado")[0] == 400
+    assert consultar(f"{servidor}/previsoes?modelo=lstm")[0] == 400
+    assert consultar(f"{servidor}/outra")[0] == 404
+    status, _, corpo = consultar(f"{servidor}/saude")
+    assert status == 200 and json.loads(corpo)["modelos"] == ["prophet"]
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from brent import suavizacao
+
+
+def datas_entre(primeiro, ultimo, unidade):
+    """Uma data por ``unidade`` (D, W ou M), de ``primeiro`` a ``ultimo`` inclusive, em datetime64[ns]."""
+    inicio, fim = np.datetime64(primeiro, unidade), np.datetime64(ultimo, unidade)
+    return np.arange(inicio, fim + 1).astype("datetime64[ns]")
+
+
+@pytest.mark.parametrize("unidade, resolucao_exata, resolucao_abaixo", [
+    ("M", "M", "W"),  # 300 meses -> mensal; 299 meses ainda têm mais de 300 semanas
+    ("W", "W", "D"),  # 300 semanas -> semanal; 299 semanas -> diária
+])
+def test_escolher_resolucao_nos_limites(unidade, resolucao_exata, resolucao_abaixo):
+    datas = datas_entre("1990-01-01", "2030-01-01", unidade)
+    assert suavizacao.escolher_resolucao(datas[:300]) == resolucao_exata
+    assert suavizacao.escolher_resolucao(datas[:299]) == resolucao_abaixo
+
+
+def test_escolher_resolucao_curta_ou_vazia():
+    assert suavizacao.escolher_resolucao(datas_entre("2020-01-01", "2020-03-01", "D")) == "D"
+    assert suavizacao.escolher_resolucao(np.array([], dtype="datetime64[ns]")) == "D"
+    assert suavizacao.escolher_resolucao(datas_entre("2020-01-01", "2020-03-01", "D"), saida=8) == "W"
+
+
+def test_agregar_junta_datas_repetidas():
+    datas = np.array(["2020-01-01", "2020-01-01", "2020-01-02"], dtype="datetime64[ns]")
+    x, y = suavizacao.agregar(datas, [1.0, 3.0, 5.0], "D")
+    np.testing.assert_array_equal(y, [2.0, 5.0])
+    assert len(x) == 2
+
+
+@pytest.mark.parametrize("metodo", sorted(suavizacao.SUAVIZADORES))
+def test_poucos_pontos_nao_sao_suavizados(metodo):
+    pytest.importorskip("scipy")
+    pytest.importorskip("statsmodels")
+    datas = datas_entre("2020-01-01", "2020-01-03", "D")
+    saida_datas, valores = suavizacao.suavizar_arrays(datas, [1.0, 2.0, 4.0], metodo)
+    np.testing.assert_array_equal(saida_datas, datas)
+    np.testing.assert_array_equal(valores, [1.0, 2.0, 4.0])
+
+
+@pytest.mark.parametrize("metodo", sorted(suavizacao.SUAVIZADORES))
+def test_suavizar_serie_longa(metodo):
+    pytest.importorskip("scipy")
+    pytest.importorskip("statsmodels")
+    datas = datas_entre("2000-01-01", "2020-12-31", "D")
+    precos = 60 + np.cumsum(np.random.default_rng(0).normal(size=len(datas)))
+    saida_datas, valores = suavizacao.suavizar_arrays(datas, precos, metodo)
+    assert len(saida_datas) == len(valores) >= suavizacao.PONTOS_SAIDA
+    assert len(valores) < len(precos) / 5  # Agregado por semana antes de suavizar
+    assert saida_datas[0] >= datas[0] and saida_datas[-1] <= datas[-1] and np.isfinite(valores).all()
+
+
+def test_suavizador_desconhecido():
+    with pytest.raises(ValueError):
+        suavizacao.suavizar_arrays(datas_entre("2020-01-01", "2020-03-01", "D"), np.ones(61), "kalman")
@@ -0,0 +1,79 @@
+import threading
+import time
+
+import pytest
+
+from brent import rastreamento
+from brent.tarefas import CONCLUIDA, FALHOU, FilaTarefas
+
+
+@pytest.fixture
+def fila():
+    fila = FilaTarefas(trabalhadores=2, max_terminadas=2)
+    yield fila
+    fila.encerrar()
+
+
+def test_mesma_chave_executa_uma_vez(fila):
+    liberar, chamadas = threading.Event(), []
+
+    def treinar(valor, progresso):
+        chamadas.append(valor)
+        liberar.wait(5)
+        return valor * 2
+
+    primeira = fila.submeter("prophet", treinar, 21)
+    segunda = fila.submeter("prophet", treinar, 99)
+    liberar.set()
+    assert segunda is primeira
+    assert primeira.resultado(5) == 42
+    assert fila.submeter("prophet", treinar, 7) is primeira  # Concluída: o resultado é reaproveitado
+    assert chamadas == [21]
+
+
+def test_progresso_e_historico(fila):
+    def treinar(progresso):
+        for epoca in range(1, 4):
+            progresso(epoca / 4, f"Época {epoca}", epoca=epoca, loss=1 / epoca)
+        return "ok"
+
+    tarefa = fila.submeter("lstm", treinar)
+    assert tarefa.resultado(5) == "ok"
+    situacao = tarefa.situacao()
+    assert situacao["estado"] == CONCLUIDA and situacao["progresso"] == 1.0
+    assert [m["epoca"] for m in situacao["historico"]] == [1, 2, 3]
+
+
+def test_falha_fica_registrada_ate_ser_descartada(fila):
+    def treinar(progresso):
+        raise ValueError("sem dados")
+
+    tarefa = fila.submeter("arima", treinar)
+    with pytest.raises(ValueError):
+        tarefa.resultado(5)
+    assert tarefa.situacao()["estado"] == FALHOU and "sem dados" in tarefa.erro
+    assert fila.submeter("arima", treinar) is tarefa
+    fila.descartar("arima")
+    assert fila.submeter("arima", lambda progresso: 1).resultado(5) == 1
+
+
+def test_guarda_so_as_terminadas_mais_recentes(fila):
+    for chave in "abc":
+        fila.submeter(chave, lambda progresso, chave=chave: chave).aguardar(5)
+    # O descarte roda no callback de término, logo depois de a tarefa ficar pronta
+    limite = time.monotonic() + 5
+    while fila.obter("a") is not None and time.monotonic() < limite:
+        time.sleep(0.01)
+    assert fila.obter("a") is None
+    assert [t.chave for t in fila.tarefas()] == ["b", "c"]
+
+
+def test_etapas_entram_no_rastro_de_quem_submeteu(fila):
+    rastro = rastreamento.iniciar()
+
+    def treinar(progresso):
+        with rastreamento.etapa("treino"):
+            pass
+
+    fila.submeter("rastro", treinar).resultado(5)
+    assert "treino" in [linha["etapa"] for linha in rastro.tabela()]